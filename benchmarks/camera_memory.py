@@ -0,0 +1,183 @@
+"""
+Memory benchmark for Camera and Stream objects.
+
+Builds a large inventory of Cameras, each with several Streams, from synthetic QVR Pro camera and
+stream list entries and reports the memory retained per camera, measured with tracemalloc. The same
+inventory is built with LegacyCamera and LegacyStream, the dict-based classes Camera and Stream
+replaced, as a baseline, and the reduction from it is reported.
+
+    python benchmarks/camera_memory.py [cameras] [streams_per_camera]
+"""
+import gc
+import re
+import sys
+import time
+import tracemalloc
+
+from qvrpy import Camera
+
+_RESOLUTION_REGEX: re.Pattern = re.compile('(\\d+)[xX*](\\d+)')
+
+def _checkValue(values: dict, key: str):
+    if key in values:
+        val = values[key]
+        if val != None and (type(val) != str or len(val.strip()) > 0):
+            return val
+    return None
+
+def _checkVideoResolution(values: dict, key: str):
+    val: str = _checkValue(values, key)
+    if val != None and type(val) == str:
+        match = _RESOLUTION_REGEX.fullmatch(val.strip())
+        if match != None:
+            return (int(match.group(1)), int(match.group(2)))
+        raise Exception("Bad Resolution Data: {0}".format(val))
+
+def _checkVideoQuality(values: dict, key: str) -> str:
+    val: str = _checkValue(values, key)
+    if val != None:
+        return val.replace(' ', '')
+
+class LegacyStream:
+    """The dict-based Stream, every field parsed and held in the instance __dict__"""
+
+    def __init__(self, camera, values: dict, username: str = None, password: str = None):
+        self._camera = camera
+        self.__username: str = username
+        self.__password: str = password
+        self.stream: int = values['stream']
+        self.status = _checkValue(values, 'status')
+        self.video_codec: str = _checkValue(values, 'videoCodec')
+        res = _checkVideoResolution(values, 'resolution')
+        self.video_resolution_width: int = res[0]
+        self.video_resolution_height: int = res[1]
+        self.video_quality: str = _checkVideoQuality(values, 'quality')
+        self.frame_rate: int = _checkValue(values, 'frameRate')
+        self.__stream_url: str = None
+        self.__token: str = None
+        self.__protocol = None
+
+    def __str__(self):
+        tempdict = self.__dict__.copy()
+        del tempdict['_camera']
+        del tempdict['_LegacyStream__username']
+        del tempdict['_LegacyStream__password']
+        del tempdict['_LegacyStream__stream_url']
+        del tempdict['_LegacyStream__token']
+        return tempdict.__str__()
+
+class LegacyCamera:
+    """The dict-based Camera, every field parsed and held in the instance __dict__"""
+
+    def __init__(self, instance, camera_values: dict, stream_values: list, username: str = None, password: str = None):
+        self._instance = instance
+        self.channel_index: int = _checkValue(camera_values, 'channel_index')
+        self.name: str = _checkValue(camera_values, 'name')
+        self.umsid: str = _checkValue(camera_values, 'umsid')
+        self.guid: str = _checkValue(camera_values, 'guid')
+        self.brand: str = _checkValue(camera_values, 'brand')
+        self.model: str = _checkValue(camera_values, 'model')
+        self.mac: str = _checkValue(camera_values, 'mac')
+        self.ver: str = _checkValue(camera_values, 'ver')
+        self.ip: str = _checkValue(camera_values, 'ip')
+        self.port: int = _checkValue(camera_values, 'port')
+        self.__username: str = username or _checkValue(camera_values, 'username')
+        self.__password: str = password or _checkValue(camera_values, 'password')
+        self.rtsp_port: int = _checkValue(camera_values, 'rtsp_port')
+        self.http_video_url: str = _checkValue(camera_values, 'http_video_url')
+        self.video_codec: str = _checkValue(camera_values, 'video_codec_setting')
+        res = _checkVideoResolution(camera_values, 'video_resolution_setting')
+        self.video_resolution_width: int = res[0]
+        self.video_resolution_height: int = res[1]
+        self.frame_rate_setting: str = _checkValue(camera_values, 'frame_rate_setting')
+        self.video_quality: str = _checkVideoQuality(camera_values, 'video_quality_setting')
+        self.status = _checkValue(camera_values, 'status')
+        self.rec_state = _checkValue(camera_values, 'rec_state')
+        self.rec_state_err_code: int = _checkValue(camera_values, 'rec_state_err_code')
+        self.frame_rate: str = _checkValue(camera_values, 'frame_rate')
+        self.bit_rate: int = _checkValue(camera_values, 'bit_rate')
+        self.streams: list = []
+        for val in stream_values:
+            self.streams.append(LegacyStream(self, val, self.__username, self.__password))
+
+    def __str__(self):
+        tempdict = self.__dict__.copy()
+        del tempdict['_instance']
+        del tempdict['_LegacyCamera__username']
+        del tempdict['_LegacyCamera__password']
+        tempdict['streams'] = [s.__str__() for s in tempdict['streams']]
+        return tempdict.__str__()
+
+def cameraValues(index: int) -> dict:
+    return {
+        'channel_index' : index,
+        'name' : 'Camera {0}'.format(index),
+        'umsid' : 'UMS{0:06d}'.format(index),
+        'guid' : '{0:08X}-0000-4000-8000-{0:012X}'.format(index),
+        'brand' : 'QNAP',
+        'model' : 'QUSBCam2',
+        'mac' : '24:5E:BE:{0:02X}:{1:02X}:{2:02X}'.format(index >> 16 & 0xFF, index >> 8 & 0xFF, index & 0xFF),
+        'ver' : '1.0.{0}'.format(index % 10),
+        'ip' : '10.{0}.{1}.{2}'.format(index >> 16 & 0xFF, index >> 8 & 0xFF, index & 0xFF),
+        'port' : 80,
+        'rtsp_port' : 554,
+        'http_video_url' : 'http://10.0.0.1/video{0}.mjpg'.format(index),
+        'video_codec_setting' : 'H.264',
+        'video_resolution_setting' : '1920x1080',
+        'frame_rate_setting' : '30',
+        'video_quality_setting' : 'Very High',
+        'status' : 1,
+        'rec_state' : 1,
+        'rec_state_err_code' : 0,
+        'frame_rate' : '30.0',
+        'bit_rate' : 4096,
+        'username' : 'admin',
+        'password' : 'secret'
+        }
+
+def streamValues(stream: int) -> dict:
+    return {
+        'stream' : stream,
+        'status' : 1,
+        'videoCodec' : 'H.264',
+        'resolution' : ['1920x1080', '1280x720', '640x360'][stream % 3],
+        'quality' : 'High',
+        'frameRate' : 30
+        }
+
+def measure(camera_class, camera_values: list, stream_values: list) -> dict:
+    """Build an inventory with camera_class, returning the memory it retains and the time to build and str it"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    started = time.perf_counter()
+    cameras = [camera_class(None, values, stream_values) for values in camera_values]
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    started = time.perf_counter()
+    for camera in cameras:
+        str(camera)
+    serialised = time.perf_counter() - started
+    return {'retained' : retained, 'construct' : elapsed, 'str' : serialised}
+
+def report(label: str, results: dict, camera_count: int) -> None:
+    print('  {0}'.format(label))
+    print('    retained:  {0:.1f} MiB, {1:.0f} bytes per camera'.format(results['retained'] / 1048576, results['retained'] / camera_count))
+    print('    construct: {0:.3f} s, {1:.1f} us per camera'.format(results['construct'], results['construct'] * 1e6 / camera_count))
+    print('    str:       {0:.3f} s, {1:.1f} us per camera'.format(results['str'], results['str'] * 1e6 / camera_count))
+
+def main(camera_count: int = 20000, stream_count: int = 3) -> None:
+    camera_values = [cameraValues(index) for index in range(camera_count)]
+    stream_values = [streamValues(stream) for stream in range(stream_count)]
+    baseline = measure(LegacyCamera, camera_values, stream_values)
+    current = measure(Camera, camera_values, stream_values)
+    print('{0} cameras with {1} streams each'.format(camera_count, stream_count))
+    report('legacy dict-based Camera and Stream', baseline, camera_count)
+    report('slotted Camera and Stream', current, camera_count)
+    saved = baseline['retained'] - current['retained']
+    print('  reduction: {0:.1f} MiB, {1:.0f} bytes per camera ({2:.0%})'.format(saved / 1048576, saved / camera_count, saved / baseline['retained']))
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,87 @@
+"""
+Micro-benchmark for response parsing.
+
+Times parsing of large synthetic camera support, log and camera list responses, formatted with the
+tabs, newlines and malformed empty lists ([}]) QVR Pro returns, comparing the string rewriting
+previously used with the qvrapi parser (with and without orjson), and times mapping the parsed
+camera list into Cameras.
+
+    python benchmarks/parsing.py [repeat]
+"""
+import gc
+import json
+import sys
+import time
+
+from qvrpy import Camera, qvrapi
+
+class CannedResponse:
+    """A successful response carrying a fixed body"""
+
+    def __init__(self, content: bytes):
+        self.status_code: int = 200
+        self.content: bytes = content
+        self.headers: dict = {}
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8')
+
+class CannedTransport:
+    """A transport answering every request with the same response"""
+
+    def __init__(self, content: bytes):
+        self.response: CannedResponse = CannedResponse(content)
+
+    def request(self, method: str, url: str, **kwargs) -> CannedResponse:
+        return self.response
+
+def qvrFormat(document: dict) -> bytes:
+    """Format a document as QVR Pro does, indented with tabs and with empty lists written as [}]"""
+    return json.dumps(document, indent = '\t').replace('[]', '[}]').encode('utf-8')
+
+def supportDocument(brands: int = 400, models: int = 100) -> dict:
+    return {'brands' : [{'text' : 'Brand {0}'.format(brand), 'value' : str(brand), 'models' : [{'text' : 'Model {0}-{1}'.format(brand, model), 'value' : 'UMS{0}{1}'.format(brand, model), 'features' : []} for model in range(models)]} for brand in range(brands)]}
+
+def logsDocument(count: int = 20000) -> dict:
+    return {'total' : count, 'items' : [{'log_id' : index, 'UTC_time_s' : 1700000000 + index, 'log_type' : 3, 'level' : index % 3, 'user' : 'admin', 'source_ip' : '10.0.0.{0}'.format(index % 250), 'source_name' : 'Camera {0}'.format(index % 64), 'channel_id' : index % 64, 'global_channel_id' : index % 64, 'content' : 'Motion detected', 'tags' : []} for index in range(count)]}
+
+def cameraListDocument(count: int = 5000) -> dict:
+    return {'datas' : [{'channel_index' : index, 'name' : 'Camera {0}'.format(index), 'guid' : 'GUID{0:08d}'.format(index), 'umsid' : 'UMS', 'brand' : 'QNAP', 'model' : 'QUSBCam2', 'mac' : '', 'ver' : ' ', 'ip' : '10.0.0.1', 'port' : 80, 'rtsp_port' : 554, 'http_video_url' : '', 'video_codec_setting' : 'H.264', 'video_resolution_setting' : '1920x1080', 'frame_rate_setting' : '30', 'video_quality_setting' : 'Very High', 'status' : 1, 'rec_state' : 1, 'rec_state_err_code' : 0, 'frame_rate' : '30.0', 'bit_rate' : 4096, 'events' : []} for index in range(count)]}
+
+def legacyParse(response) -> dict:
+    return json.loads(response.text.replace('\n','').replace('\t','').replace('[}]','[]'))
+
+def best(repeat: int, function) -> float:
+    """Return the fastest of repeat calls to function, timed with garbage collection disabled as timeit does"""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            started = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - started)
+        finally:
+            gc.enable()
+    return min(timings)
+
+def main(repeat: int = 5) -> None:
+    orjson = qvrapi.orjson
+    for name, document in [('camera support', supportDocument()), ('logs', logsDocument()), ('camera list', cameraListDocument())]:
+        transport = CannedTransport(qvrFormat(document))
+        legacy = best(repeat, lambda: legacyParse(transport.response))
+        qvrapi.orjson = None
+        stdlib = best(repeat, lambda: qvrapi.cameraList('http://nvr', 'sid', transport = transport))
+        qvrapi.orjson = orjson
+        fastest = best(repeat, lambda: qvrapi.cameraList('http://nvr', 'sid', transport = transport))
+        print('{0} ({1:.1f} MiB)'.format(name, len(transport.response.content) / 1048576))
+        print('  string rewrite + json: {0:7.1f} ms'.format(legacy * 1000))
+        print('  qvrapi, json:          {0:7.1f} ms'.format(stdlib * 1000))
+        print('  qvrapi, orjson:        {0:7.1f} ms{1}'.format(fastest * 1000, '' if orjson is not None else ' (orjson not installed)'))
+    camera_list = cameraListDocument()['datas']
+    mapping = best(repeat, lambda: [Camera(None, values, []) for values in camera_list])
+    print('camera mapping ({0} cameras): {1:.1f} ms, {2:.1f} us per camera'.format(len(camera_list), mapping * 1000, mapping * 1e6 / len(camera_list)))
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,397 @@
+"""
+Local QVR Pro simulator.
+
+QVRSimulator serves the QVR Pro endpoints used by qvrapi from a local threaded HTTP server, with a
+configurable number of cameras, snapshot, recording and log sizes, and a latency injected into every
+response, so qvrpy can be exercised, tested and benchmarked without an NVR. It counts the requests
+and connections it receives.
+
+    with QVRSimulator(cameras = 64, latency = 0.005) as simulator:
+        instance = Instance('admin', 'admin', simulator.host, simulator.port)
+
+Run on its own it serves until interrupted:
+
+    python benchmarks/simulator.py [port] [cameras]
+"""
+import calendar
+import json
+import math
+import re
+import socketserver
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import List
+from urllib.parse import parse_qs, urlsplit
+
+_SID: str = 'qvrpy-simulator-sid'
+_LOG_EPOCH: int = 1700000000
+_TIME_REGEX: re.Pattern = re.compile(r'(\d{4})-(\d\d)-(\d\d)[ T](\d\d):(\d\d):(\d\d)(\.\d+)?(?:([+-])(\d\d):?(\d\d)|Z)?')
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+def _parseTime(value: str) -> float:
+    """Parse a log search time, given in epoch seconds or as a date and time taken as UTC without an offset"""
+    if value is None or len(value) == 0:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    match = _TIME_REGEX.fullmatch(value.strip())
+    if match is None:
+        return None
+    year, month, day, hour, minute, second = (int(field) for field in match.group(1, 2, 3, 4, 5, 6))
+    seconds = calendar.timegm((year, month, day, hour, minute, second)) + float(match.group(7) or 0)
+    if match.group(8) is not None:
+        offset = int(match.group(9)) * 3600 + int(match.group(10)) * 60
+        seconds -= offset if match.group(8) == '+' else -offset
+    return seconds
+
+def _qvrFormat(document: dict) -> bytes:
+    """Format a document as QVR Pro does, indented with tabs and with empty lists written as [}]"""
+    return json.dumps(document, indent = '\t').replace('[]', '[}]').encode('utf-8')
+
+class QVRSimulator:
+    """A local stand-in for a QVR Pro server"""
+
+    def __init__(self, cameras: int = 16, streams: int = 2, snapshot_size: int = 64 * 1024, recording_size: int = 8 * 1024 * 1024, logs: int = 100000, supported_models: int = 2000, discovered: int = 8, test_time: float = 0.0, segment_duration: float = 1.0, segment_size: int = 256 * 1024, latency: float = 0.0, host: str = '127.0.0.1', port: int = 0):
+        """Initialise the simulator
+
+        A camera search finds discovered cameras, each of whose tests takes a further test_time seconds
+        and fails for every fourth and seventh camera. Streams opened over HLS serve a live playlist of
+        the last six segments, a new segment_size segment being added every segment_duration seconds.
+        Every response is delayed by latency seconds. A port of 0 selects a free port, available as port
+        once the simulator is started.
+        """
+        self.cameras: int = cameras
+        self.streams: int = streams
+        self.snapshot_size: int = snapshot_size
+        self.recording_size: int = recording_size
+        self.logs: int = logs
+        self.supported_models: int = supported_models
+        self.discovered: int = discovered
+        self.test_time: float = test_time
+        self.segment_duration: float = segment_duration
+        self.segment_size: int = segment_size
+        self.__segment: bytes = b'\x47' * segment_size
+        self.__started: float = time.monotonic()
+        self.latency: float = latency
+        self.host: str = host
+        self.port: int = port
+        self.requests: int = 0
+        self.connections: int = 0
+        self.__lock: threading.Lock = threading.Lock()
+        self.__server: HTTPServer = None
+        self.__thread: threading.Thread = None
+        self.__recording_cameras: set = set(self.guid(index) for index in range(cameras))
+        self.__alarm_cameras: set = set()
+        self.__camera_list: bytes = None
+        self.__camera_support: bytes = None
+        self.__stream_list: bytes = _qvrFormat({'streams' : [self.streamValues(stream) for stream in range(streams)]})
+        self.__snapshot: bytes = b'\xff\xd8' + bytes(max(0, snapshot_size - 4)) + b'\xff\xd9'
+        self.__recording: bytes = bytes(range(256)) * (recording_size // 256) + bytes(recording_size % 256)
+        self.__routes: list = [
+            ('GET', re.compile('/cgi-bin/authLogin.cgi'), self.__authLogin),
+            ('GET', re.compile('/cgi-bin/authLogout.cgi'), self.__empty),
+            ('GET', re.compile('/qvrpro/camera/list'), self.__cameraList),
+            ('GET', re.compile('/qvrpro/camera/capability'), self.__capability),
+            ('GET', re.compile('/qvrpro/camera/support'), self.__cameraSupport),
+            ('GET', re.compile('/qvrpro/camera/search'), self.__cameraSearch),
+            ('GET', re.compile('/qvrpro/camera/test'), self.__cameraTest),
+            ('GET', re.compile('/qvrpro/camera/snapshot/(?P<guid>[^/]+)'), self.__cameraSnapshot),
+            ('PUT', re.compile('/qvrpro/camera/mrec/(?P<guid>[^/]+)/(?P<action>start|stop)'), self.__cameraRecording),
+            ('PUT', re.compile('/qvrpro/camera/alarm/(?P<guid>[^/]+)/(?P<action>start|stop)'), self.__cameraAlarm),
+            ('GET', re.compile('/qvrpro/camera/recordingfile/(?P<guid>[^/]+)/(?P<stream>\\d+)'), self.__recordingFile),
+            ('GET', re.compile('/qvrpro/logs/logs'), self.__logs),
+            ('GET', re.compile('/qvrpro/qshare/StreamingOutput/channel/(?P<guid>[^/]+)/streams'), self.__streamList),
+            ('POST', re.compile('/qvrpro/qshare/StreamingOutput/channel/(?P<guid>[^/]+)/stream/(?P<stream>\\d+)/liveStream'), self.__liveStreamOpen),
+            ('GET', re.compile('/hls/(?P<guid>[^/]+)/(?P<stream>\\d+)/live\\.m3u8'), self.__hlsPlaylist),
+            ('GET', re.compile('/hls/(?P<guid>[^/]+)/(?P<stream>\\d+)/(?P<sequence>\\d+)\\.ts'), self.__hlsSegment),
+            ('DELETE', re.compile('/qvrpro/qshare/StreamingOutput/channel/(?P<guid>[^/]+)/stream/(?P<stream>[^/]+)/liveStream'), self.__liveStreamDelete)
+            ]
+
+    @staticmethod
+    def guid(index: int) -> str:
+        return '{0:08X}-0000-4000-8000-{0:012X}'.format(index)
+
+    def cameraValues(self, index: int) -> dict:
+        """Return the camera list entry of the camera at index"""
+        return {
+            'channel_index' : index,
+            'name' : 'Camera {0}'.format(index),
+            'umsid' : 'QNAP-QUSBCAM2',
+            'guid' : self.guid(index),
+            'brand' : 'QNAP',
+            'model' : 'QUSBCam2',
+            'mac' : '24:5E:BE:00:{0:02X}:{1:02X}'.format(index >> 8 & 0xFF, index & 0xFF),
+            'ver' : '1.0.0',
+            'ip' : '10.0.{0}.{1}'.format(index >> 8 & 0xFF, index & 0xFF),
+            'port' : 80,
+            'rtsp_port' : 554,
+            'http_video_url' : '',
+            'video_codec_setting' : 'H.264',
+            'video_resolution_setting' : '1920x1080',
+            'frame_rate_setting' : '30',
+            'video_quality_setting' : 'Very High',
+            'status' : 'NVR_CAM_CONNECTED',
+            'rec_state' : 'RECORDING' if self.guid(index) in self.__recording_cameras else 'NOT_RECORDING',
+            'rec_state_err_code' : 0,
+            'frame_rate' : '30.0',
+            'bit_rate' : 4096,
+            'events' : []
+            }
+
+    def setCameras(self, cameras: int) -> None:
+        """Change the number of cameras listed, as though cameras were added to or removed from the server"""
+        with self.__lock:
+            self.cameras = cameras
+            self.__camera_list = None
+
+    def streamValues(self, stream: int) -> dict:
+        """Return the stream list entry of a camera's stream"""
+        return {
+            'stream' : stream,
+            'status' : 1,
+            'videoCodec' : 'H.264',
+            'resolution' : ['1920x1080', '1280x720', '640x360'][stream % 3],
+            'quality' : 'High',
+            'frameRate' : 30
+            }
+
+    def supportValues(self) -> List[dict]:
+        """Return the brand list of the supported camera catalog, spreading the models over 50 brands"""
+        brands = []
+        for index in range(self.supported_models):
+            if index % 50 == len(brands):
+                brands.append({'text' : 'Brand{0:02d}'.format(index % 50), 'value' : 'BRAND{0:02d}'.format(index % 50), 'models' : []})
+            brands[index % 50]['models'].append({'text' : 'Model-{0:05d}'.format(index), 'value' : 'BRAND{0:02d}-MODEL{1:05d}'.format(index % 50, index)})
+        return brands
+
+    def searchValues(self, index: int) -> dict:
+        """Return the camera search entry of the discovered camera at index, of a model from the catalog"""
+        model = index % max(1, self.supported_models)
+        return {
+            'umsid' : '',
+            'brand' : 'Brand{0:02d}'.format(model % 50),
+            'model' : 'Model-{0:05d}'.format(model),
+            'mac' : '24:5E:BE:01:{0:02X}:{1:02X}'.format(index >> 8 & 0xFF, index & 0xFF),
+            'ip' : '10.1.{0}.{1}'.format(index >> 8 & 0xFF, index & 0xFF),
+            'port' : 80,
+            'rtsp_port' : 554,
+            'http_video_url' : ''
+            }
+
+    def logValues(self, index: int) -> dict:
+        """Return the log entry at index, logged one second after the previous one"""
+        return {
+            'log_id' : index,
+            'UTC_time_s' : _LOG_EPOCH + index,
+            'log_type' : 3,
+            'level' : index % 3,
+            'user' : 'admin',
+            'source_ip' : '10.0.0.{0}'.format(index % 250),
+            'source_name' : 'Camera {0}'.format(index % max(1, self.cameras)),
+            'channel_id' : index % max(1, self.cameras),
+            'global_channel_id' : index % max(1, self.cameras),
+            'content' : 'Motion detected'
+            }
+
+    def __authLogin(self, params: dict, headers) -> tuple:
+        return (200, 'text/xml', '<QDocRoot version="1.0"><authPassed>1</authPassed><authSid>{0}</authSid></QDocRoot>'.format(_SID).encode('utf-8'), {})
+
+    def __empty(self, params: dict, headers) -> tuple:
+        return (200, 'text/plain', b'', {})
+
+    def __cameraList(self, params: dict, headers) -> tuple:
+        with self.__lock:
+            if self.__camera_list is None:
+                self.__camera_list = _qvrFormat({'datas' : [self.cameraValues(index) for index in range(self.cameras)]})
+            return (200, 'application/json', self.__camera_list, {})
+
+    def __cameraRecording(self, params: dict, headers, guid: str, action: str) -> tuple:
+        with self.__lock:
+            if action == 'start':
+                self.__recording_cameras.add(guid)
+            else:
+                self.__recording_cameras.discard(guid)
+            self.__camera_list = None
+        return (200, 'text/plain', b'', {})
+
+    def __cameraAlarm(self, params: dict, headers, guid: str, action: str) -> tuple:
+        with self.__lock:
+            if action == 'start':
+                self.__alarm_cameras.add(guid)
+            else:
+                self.__alarm_cameras.discard(guid)
+        return (200, 'text/plain', b'', {})
+
+    @property
+    def alarms(self) -> List[str]:
+        """The GUIDs of the cameras whose alarm is started"""
+        with self.__lock:
+            return sorted(self.__alarm_cameras)
+
+    def __capability(self, params: dict, headers) -> tuple:
+        return (200, 'application/json', _qvrFormat({'act' : params.get('act'), 'capability' : []}), {})
+
+    def __cameraSupport(self, params: dict, headers) -> tuple:
+        with self.__lock:
+            if self.__camera_support is None:
+                self.__camera_support = _qvrFormat({'brands' : self.supportValues()})
+            return (200, 'application/json', self.__camera_support, {})
+
+    def __cameraSearch(self, params: dict, headers) -> tuple:
+        return (200, 'application/json', _qvrFormat({'data' : [self.searchValues(index) for index in range(self.discovered)]}), {})
+
+    def __cameraTest(self, params: dict, headers) -> tuple:
+        if self.test_time > 0:
+            time.sleep(self.test_time)
+        index = int(params.get('ipcam_address', '0.0.0.0').split('.')[-1])
+        if index % 4 == 3:
+            return (400, 'application/json', _qvrFormat({'error_code' : '0xB1000019'}), {})
+        if index % 7 == 6:
+            return (400, 'application/json', _qvrFormat({'error_code' : '0xB100001A'}), {})
+        return (200, 'application/json', _qvrFormat({'umsid' : params.get('ipcam_umsid')}), {})
+
+    def __streamList(self, params: dict, headers, guid: str) -> tuple:
+        return (200, 'application/json', self.__stream_list, {})
+
+    def __cameraSnapshot(self, params: dict, headers, guid: str) -> tuple:
+        return (200, 'image/jpeg', self.__snapshot, {})
+
+    def __recordingFile(self, params: dict, headers, guid: str, stream: str) -> tuple:
+        match = re.fullmatch('bytes=(\\d+)-', headers.get('Range') or '')
+        if match is None:
+            return (200, 'video/mp4', self.__recording, {})
+        offset = int(match.group(1))
+        if offset >= len(self.__recording):
+            return (416, 'text/plain', b'', {'Content-Range' : 'bytes */{0}'.format(len(self.__recording))})
+        return (206, 'video/mp4', self.__recording[offset:], {'Content-Range' : 'bytes {0}-{1}/{2}'.format(offset, len(self.__recording) - 1, len(self.__recording))})
+
+    def __logs(self, params: dict, headers) -> tuple:
+        first, last = 0, self.logs - 1
+        start_time = _parseTime(params.get('start_time'))
+        if start_time is not None:
+            first = max(first, math.ceil(start_time - _LOG_EPOCH))
+        end_time = _parseTime(params.get('end_time'))
+        if end_time is not None:
+            last = min(last, math.floor(end_time - _LOG_EPOCH))
+        indexes = range(first, max(first, last + 1))
+        if params.get('dir') == 'DESC':
+            indexes = indexes[::-1]
+        start = int(params.get('start') or 0)
+        page = indexes[start:start + max(0, int(params.get('max_results') or 0))]
+        return (200, 'application/json', _qvrFormat({'total' : len(indexes), 'items' : [self.logValues(index) for index in page]}), {})
+
+    def __liveStreamOpen(self, params: dict, headers, guid: str, stream: str) -> tuple:
+        if params.get('protocol') == 'hls':
+            document = {'resourceUris' : '{0}/hls/{1}/{2}/live.m3u8'.format(self.url, guid, stream), 'streamingToken' : 'token-{0}-{1}'.format(guid, stream)}
+        else:
+            document = {'resourceUris' : 'rtsp://{0}:554/{1}/{2}'.format(self.host, guid, stream), 'streamingToken' : 'token-{0}-{1}'.format(guid, stream)}
+        return (200, 'application/json', _qvrFormat(document), {})
+
+    def __hlsPlaylist(self, params: dict, headers, guid: str, stream: str) -> tuple:
+        latest = int((time.monotonic() - self.__started) / self.segment_duration)
+        lines = ['#EXTM3U', '#EXT-X-VERSION:3', '#EXT-X-TARGETDURATION:{0}'.format(max(1, round(self.segment_duration))), '#EXT-X-MEDIA-SEQUENCE:{0}'.format(max(0, latest - 5))]
+        for sequence in range(max(0, latest - 5), latest + 1):
+            lines.append('#EXTINF:{0:.3f},'.format(self.segment_duration))
+            lines.append('{0}.ts'.format(sequence))
+        return (200, 'application/vnd.apple.mpegurl', '\n'.join(lines).encode('utf-8') + b'\n', {})
+
+    def __hlsSegment(self, params: dict, headers, guid: str, stream: str, sequence: str) -> tuple:
+        return (200, 'video/mp2t', self.__segment, {})
+
+    def __liveStreamDelete(self, params: dict, headers, guid: str, stream: str) -> tuple:
+        return (204, 'text/plain', b'', {})
+
+    def _connected(self) -> None:
+        with self.__lock:
+            self.connections += 1
+
+    def _respond(self, method: str, path: str, headers, body: bytes = b'') -> tuple:
+        """Return the status, content type, body and extra headers of the response to a request
+
+        The fields of a JSON request body are treated as query parameters.
+        """
+        with self.__lock:
+            self.requests += 1
+        if self.latency > 0:
+            time.sleep(self.latency)
+        parts = urlsplit(path)
+        params = {key: values[0] for key, values in parse_qs(parts.query).items()}
+        if body[:1] == b'{':
+            params.update(json.loads(body.decode('utf-8')))
+        for route_method, pattern, handler in self.__routes:
+            match = pattern.fullmatch(parts.path)
+            if match is not None and route_method == method:
+                if handler not in (self.__authLogin, self.__hlsPlaylist, self.__hlsSegment) and params.get('sid') != _SID:
+                    return (401, 'application/json', _qvrFormat({'error_code' : '0xC4000005'}), {})
+                return handler(params, headers, **match.groupdict())
+        return (404, 'text/plain', b'', {})
+
+    def start(self) -> None:
+        """Start serving on a background daemon thread"""
+        simulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                simulator._connected()
+
+            def respond(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                request_body = self.rfile.read(length) if length > 0 else b''
+                status, content_type, body, extra_headers = simulator._respond(self.command, self.path, self.headers, request_body)
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in extra_headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if len(body) > 0:
+                    self.wfile.write(body)
+
+            do_GET = do_POST = do_PUT = do_DELETE = respond
+
+            def log_message(self, format, *args):
+                pass
+
+        self.__server = _ThreadingHTTPServer((self.host, self.port), Handler)
+        self.port = self.__server.server_address[1]
+        self.__thread = threading.Thread(target = self.__server.serve_forever, name = 'qvrpy-simulator', daemon = True)
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """Stop serving"""
+        if self.__server is not None:
+            self.__server.shutdown()
+            self.__server.server_close()
+            self.__thread.join()
+            self.__server = None
+
+    @property
+    def url(self) -> str:
+        return 'http://{0}:{1}'.format(self.host, self.port)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+if __name__ == '__main__':
+    arguments = [int(arg) for arg in sys.argv[1:]]
+    simulator = QVRSimulator(port = arguments[0] if len(arguments) > 0 else 8080, cameras = arguments[1] if len(arguments) > 1 else 16)
+    simulator.start()
+    print('Serving QVR Pro simulator at {0}'.format(simulator.url))
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        simulator.stop()
@@ -0,0 +1,125 @@
+"""
+Benchmark suite.
+
+Runs qvrpy against a local QVRSimulator and reports connect time, snapshot throughput, log paging
+throughput and recording download speed. Results can be saved as JSON and compared against a saved
+baseline, exiting with status 1 where any benchmark regressed by more than the tolerance. Run it
+from the repository root with qvrpy on the path, either installed with pip install -e . or as:
+
+    PYTHONPATH=. python benchmarks/suite.py --cameras 64 --latency 0.005 --save baseline.json
+    PYTHONPATH=. python benchmarks/suite.py --cameras 64 --latency 0.005 --compare baseline.json
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+from qvrpy import Instance
+from qvrpy.enums import QVRLogType
+
+from simulator import QVRSimulator
+
+class _NullWriter:
+    """A file-like object discarding everything written to it"""
+
+    def write(self, data: bytes) -> int:
+        return len(data)
+
+    def seekable(self) -> bool:
+        return False
+
+def _median(repeat: int, function) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+def benchConnect(simulator: QVRSimulator, repeat: int) -> dict:
+    """Log in and load every camera and its streams"""
+    def connect():
+        instance = Instance('admin', 'admin', simulator.host, simulator.port)
+        instance.connect()
+        instance.prefetchStreams()
+        instance.disconnect()
+        instance.transport.close()
+    seconds = _median(repeat, connect)
+    return {'seconds' : seconds, 'cameras_per_second' : simulator.cameras / seconds}
+
+def benchSnapshots(instance: Instance, simulator: QVRSimulator, repeat: int) -> dict:
+    """Fetch a snapshot from every camera concurrently"""
+    guids = [camera.guid for camera in instance.getCameras()]
+    timestamp = datetime.now(timezone.utc)
+    seconds = _median(repeat, lambda: [result.image for result in instance.getSnapshots(guids, timestamp)])
+    return {'seconds' : seconds, 'snapshots_per_second' : len(guids) / seconds, 'megabytes_per_second' : len(guids) * simulator.snapshot_size / seconds / 1048576}
+
+def benchLogs(instance: Instance, simulator: QVRSimulator, repeat: int, page_size: int) -> dict:
+    """Page through every log"""
+    seconds = _median(repeat, lambda: sum(1 for _ in instance.iterLogs(QVRLogType.SURVEILLANCE_EVENTS, page_size = page_size)))
+    return {'seconds' : seconds, 'logs_per_second' : simulator.logs / seconds}
+
+def benchRecording(instance: Instance, simulator: QVRSimulator, repeat: int) -> dict:
+    """Download a recording, streamed to a discarding writer"""
+    camera = next(iter(instance.getCameras()))
+    timestamp = datetime.now(timezone.utc)
+    seconds = _median(repeat, lambda: camera.downloadRecording(_NullWriter(), timestamp, 30, 30, resume = False))
+    return {'seconds' : seconds, 'megabytes_per_second' : simulator.recording_size / seconds / 1048576}
+
+def run(args) -> dict:
+    simulator = QVRSimulator(cameras = args.cameras, streams = args.streams, snapshot_size = args.snapshot_size, recording_size = args.recording_size, logs = args.logs, latency = args.latency)
+    with simulator:
+        results = {'connect' : benchConnect(simulator, args.repeat)}
+        instance = Instance('admin', 'admin', simulator.host, simulator.port)
+        instance.connect()
+        try:
+            results['snapshots'] = benchSnapshots(instance, simulator, args.repeat)
+            results['logs'] = benchLogs(instance, simulator, args.repeat, args.page_size)
+            results['recording'] = benchRecording(instance, simulator, args.repeat)
+        finally:
+            instance.disconnect()
+            instance.transport.close()
+    return results
+
+def compare(results: dict, baseline: dict, tolerance: float) -> bool:
+    """Print the change in each benchmark's time from the baseline, returning whether none regressed"""
+    passed = True
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        change = result['seconds'] / baseline[name]['seconds'] - 1
+        regressed = change > tolerance
+        passed = passed and not regressed
+        print('{0:<10} {1:+7.1%}{2}'.format(name, change, '  REGRESSED' if regressed else ''))
+    return passed
+
+def main(argv = None) -> int:
+    parser = argparse.ArgumentParser(description = 'Benchmark qvrpy against a local QVR Pro simulator')
+    parser.add_argument('--cameras', type = int, default = 64)
+    parser.add_argument('--streams', type = int, default = 2)
+    parser.add_argument('--snapshot-size', type = int, default = 64 * 1024)
+    parser.add_argument('--recording-size', type = int, default = 32 * 1024 * 1024)
+    parser.add_argument('--logs', type = int, default = 50000)
+    parser.add_argument('--page-size', type = int, default = 500)
+    parser.add_argument('--latency', type = float, default = 0.002, help = 'seconds added to every response')
+    parser.add_argument('--repeat', type = int, default = 3)
+    parser.add_argument('--save', help = 'write the results as JSON to this file')
+    parser.add_argument('--compare', help = 'compare the results with a baseline saved with --save')
+    parser.add_argument('--tolerance', type = float, default = 0.1, help = 'the slowdown allowed before a benchmark regresses')
+    args = parser.parse_args(argv)
+    results = run(args)
+    for name, result in results.items():
+        print('{0:<10} {1}'.format(name, ', '.join('{0} {1:.3f}'.format(key, value) for key, value in result.items())))
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent = 4)
+    if args.compare:
+        with open(args.compare) as f:
+            if not compare(results, json.load(f), args.tolerance):
+                return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
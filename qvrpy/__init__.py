@@ -1,5 +1,20 @@
-from .instance import Instance
+from .instance import Instance, SnapshotResult, StatusChanges, ControlResult
 from .camera import Camera
 from .stream import Stream
+from .transport import Transport
+from .qvrapi import QVRError
+from .aio import AsyncInstance, AsyncCamera, AsyncStream, AsyncTransport
+from .cache import SnapshotCache
+from .inventory import InventoryCache
+from .catalog import CameraCatalog, CatalogCache, SupportedModel
+from .onboarding import CameraTestResult, OnboardingRun, OnboardingSummary
+from .hls import HLSConsumer, HLSSegment, HLSStats
+from .archive import LogArchive
+from .export import RecordingSpec, ExportResult, ExportManifest
+from .watcher import StatusWatcher, CameraStatusEvent
+from .fleet import Fleet, FleetResult, FleetSnapshot
+from .sessions import StreamSession, StreamLease, StreamSessionPool
+from .metrics import Instrumentation, RequestMetric
+from .logs import LogRecord, LogQuery, LogCheckpoint, LogIterator, LogTailer, LogHighWaterMark
 
-__ALL__ = [Instance, Camera, Stream]
\ No newline at end of file
+__ALL__ = [Instance, Camera, Stream, Transport, AsyncInstance, AsyncCamera, AsyncStream, AsyncTransport, RecordingSpec, ExportResult, ExportManifest, SnapshotCache, SnapshotResult, StatusChanges, QVRError, StatusWatcher, CameraStatusEvent, LogRecord, LogQuery, LogCheckpoint, LogIterator, LogTailer, LogHighWaterMark, LogArchive, Instrumentation, RequestMetric, Fleet, FleetResult, FleetSnapshot, StreamSession, StreamLease, StreamSessionPool, ControlResult, InventoryCache, CameraCatalog, CatalogCache, SupportedModel, CameraTestResult, OnboardingRun, OnboardingSummary, HLSConsumer, HLSSegment, HLSStats]
\ No newline at end of file
@@ -0,0 +1,320 @@
+"""
+asyncio client for QVR Pro.
+
+AsyncInstance, AsyncCamera and AsyncStream mirror Instance, Camera and Stream, with every method
+that talks to QVR Pro being a coroutine. Requests are made through the same qvrapi functions as the
+synchronous client, over a pooled non-blocking AsyncTransport, so URLs, error handling and response
+parsing are shared between the two.
+
+The asyncio client requires aiohttp, which can be installed with the 'async' extra.
+"""
+import asyncio
+from datetime import datetime
+from typing import Dict, List
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from .camera import _CameraBase
+from .catalog import _formatSupportedCameras
+from .enums import QVRLogLevel, QVRLogType, QVRPTZAction, QVRSortDirection, QVRStreamingProtocol
+from .instance import _formatLogLevels, _formatSortDirection
+from .metrics import Instrumentation
+from .qvrapi import (
+    authLogin as api_authLogin,
+    authLogout as api_authLogout,
+    cameraSearch as api_cameraSearch,
+    cameraList as api_cameraList,
+    streamList as api_streamList,
+    cameraCapability as api_cameraCapability,
+    eventCapability as api_eventCapability,
+    cameraSupport as api_cameraSupport,
+    cameraSnapshot as api_cameraSnapshot,
+    cameraRecordingStart as api_cameraRecordingStart,
+    cameraRecordingStop as api_cameraRecordingStop,
+    cameraAlarmStart as api_cameraAlarmStart,
+    cameraAlarmStop as api_cameraAlarmStop,
+    cameraRecordingFile as api_cameraRecordingFile,
+    cameraPTZStartMove as api_cameraPTZStartMove,
+    cameraPTZStopMove as api_cameraPTZStopMove,
+    cameraPTZ as api_cameraPTZ,
+    logs as api_logs,
+    channelList as api_channelList,
+    liveStreamOpen as api_liveStreamOpen,
+    liveStreamDelete as api_liveStreamDelete,
+    QVRError,
+    )
+from .stream import _StreamBase
+
+_IDEMPOTENT_METHODS = ['GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS']
+_RETRY_STATUSES = [502, 503, 504]
+
+def _queryParams(params: dict) -> dict:
+    """Convert request parameters to the types aiohttp accepts, dropping empty values as requests does"""
+    if params is None:
+        return None
+    query = {}
+    for key, val in params.items():
+        if val is None:
+            continue
+        if isinstance(val, bytes):
+            val = val.decode('utf-8')
+        elif isinstance(val, bool) or not isinstance(val, (str, int, float)):
+            val = str(val)
+        query[key] = val
+    return query
+
+class AsyncResponse:
+    """A fully read response returned by AsyncTransport"""
+
+    def __init__(self, status_code: int, content: bytes, headers: dict, encoding: str):
+        self.status_code: int = status_code
+        self.content: bytes = content
+        self.headers: dict = headers
+        self.encoding: str = encoding
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or 'utf-8', errors = 'replace')
+
+class AsyncTransport:
+    """A pooled, non-blocking HTTP transport for the asyncio client"""
+
+    def __init__(self, pool_size: int = 10, timeout: float = 30.0, retries: int = 3, backoff_factor: float = 0.5, verify: bool = True, instrumentation: Instrumentation = None):
+        """Initialise the AsyncTransport, with the same options as Transport"""
+        if aiohttp is None:
+            raise ImportError('aiohttp is required for the asyncio client, install qvrpy[async]')
+        self.pool_size: int = pool_size
+        self.timeout: float = timeout
+        self.retries: int = retries
+        self.backoff_factor: float = backoff_factor
+        self.verify: bool = verify
+        self.instrumentation: Instrumentation = instrumentation
+        self.__session = None
+
+    def __getSession(self):
+        if self.__session is None or self.__session.closed:
+            connector = aiohttp.TCPConnector(limit = self.pool_size, ssl = None if self.verify else False)
+            self.__session = aiohttp.ClientSession(connector = connector)
+        return self.__session
+
+    async def request(self, method: str, url: str, params: dict = None, json: dict = None, headers: dict = None, timeout: float = None, retry: bool = True) -> AsyncResponse:
+        """Perform a request over the pooled session, retrying idempotent requests with backoff unless retry is False"""
+        session = self.__getSession()
+        client_timeout = aiohttp.ClientTimeout(total = timeout or self.timeout)
+        retries = self.retries if retry and method.upper() in _IDEMPOTENT_METHODS else 0
+        attempt = 0
+        while True:
+            try:
+                async with session.request(method, url, params = _queryParams(params), json = json, headers = headers, timeout = client_timeout) as response:
+                    content = await response.read()
+                    result = AsyncResponse(response.status, content, response.headers, response.charset)
+                if result.status_code not in _RETRY_STATUSES or attempt >= retries:
+                    return result
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt >= retries:
+                    raise
+            await asyncio.sleep(self.backoff_factor * (2 ** attempt))
+            attempt += 1
+
+    async def close(self) -> None:
+        """Close all pooled connections"""
+        if self.__session is not None:
+            await self.__session.close()
+            self.__session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+class AsyncStream(_StreamBase):
+    """A representation of a Camera Stream in QVR Pro, for the asyncio client
+
+    Streams can only be opened directly with openStream, as the asyncio client has no stream pool and
+    HLSConsumer fetches segments over a synchronous Transport.
+    """
+
+    __slots__ = ()
+
+    async def openStream(self, protocol: QVRStreamingProtocol = QVRStreamingProtocol.RTSP) -> str:
+        """Open a Stream using the selected protocol, the protocol defaults to RTSP"""
+        response = await self._camera._instance._call(api_liveStreamOpen, self._camera.guid, self.stream, protocol.value)
+        return self._streamOpened(protocol, response)
+
+    async def closeStream(self) -> None:
+        """Close the open stream"""
+        await self._camera._instance._call(api_liveStreamDelete, self._camera.guid, *self._closeStreamArgs())
+        self._streamClosed()
+
+class AsyncCamera(_CameraBase):
+    """A representation of a Camera for QVR Pro, for the asyncio client
+
+    The stream list is loaded with the Camera, as a property cannot await it. Recordings can only be
+    fetched whole with getRecording, as AsyncTransport reads every response in full.
+    """
+
+    __slots__ = ()
+
+    _stream_class = AsyncStream
+
+    @property
+    def streams(self) -> List[AsyncStream]:
+        """The streams of this Camera, loaded with it"""
+        return self._streams
+
+    async def getSnapShot(self, image_timestamp: datetime):
+        """Return an image for this camera at the given timestamp"""
+        return await self._instance._call(api_cameraSnapshot, self.guid, image_timestamp)
+
+    async def startRecording(self) -> None:
+        """Start recording for this Camera"""
+        await self._instance._call(api_cameraRecordingStart, self.guid)
+
+    async def stopRecording(self) -> None:
+        """Stop recording for this Camera"""
+        await self._instance._call(api_cameraRecordingStop, self.guid)
+
+    async def startAlarm(self) -> None:
+        """Start the Alarm for this Camera"""
+        await self._instance._call(api_cameraAlarmStart, self.guid)
+
+    async def stopAlarm(self) -> None:
+        """Stop the Alarm for this Camera"""
+        await self._instance._call(api_cameraAlarmStop, self.guid)
+
+    async def getRecording(self, time: datetime, pre_period: int, post_period: int, stream: int = 0) -> bytes:
+        """Return the recording for this Camera around the given time, buffered in memory"""
+        return await self._instance._call(api_cameraRecordingFile, self.guid, stream, time, pre_period, post_period)
+
+    async def startPTZMove(self, direction: QVRPTZAction) -> None:
+        """Start a PTZ move for this Camera"""
+        await self._instance._call(api_cameraPTZStartMove, self.guid, direction.value)
+
+    async def stopPTZMove(self, direction: QVRPTZAction) -> None:
+        """Stop a PTZ move for this Camera"""
+        await self._instance._call(api_cameraPTZStopMove, self.guid, direction.value)
+
+    async def doPTZAction(self, action: QVRPTZAction) -> None:
+        """Perform a PTZ action for this Camera"""
+        await self._instance._call(api_cameraPTZ, self.guid, action.value)
+
+class AsyncInstance:
+    """Represents an instance of QVR Pro, for the asyncio client"""
+
+    def __init__(self, username: str, password: str, host: str, port: int, ssl: bool = False, transport: AsyncTransport = None, max_workers: int = 8):
+        """Initialise QVR Instance
+
+        Every API call made by the instance, its Cameras and their Streams goes through transport, which
+        defaults to a new AsyncTransport. max_workers bounds the number of concurrent requests the instance
+        makes when loading camera data.
+        """
+        self.__username: str = username
+        self.__password: str = password
+        self.__cameras: Dict[str, AsyncCamera] = {}
+        self.url = ('https://{0}:{1}' if ssl else 'http://{0}:{1}').format(host, str(port))
+        self.sid = None
+        self.__session_lock: asyncio.Lock = None
+        self.transport: AsyncTransport = transport or AsyncTransport()
+        self.max_workers: int = max_workers
+        self.camera_capability: dict = None
+        self.event_capability: dict = None
+
+    async def _call(self, api_function, *args, **kwargs):
+        """Call a qvrapi function for this instance, over this instance's transport
+
+        Where the session has expired the instance logs in again and the call is retried once, without
+        reloading camera data.
+        """
+        sid = self.sid
+        try:
+            return await api_function(self.url, sid, *args, transport = self.transport, **kwargs)
+        except QVRError as e:
+            if sid is None or not e.auth_failure:
+                raise
+        await self._reauthenticate(sid)
+        return await api_function(self.url, self.sid, *args, transport = self.transport, **kwargs)
+
+    async def __login(self) -> None:
+        self.sid = (await api_authLogin(self.url, self.__username, self.__password, transport = self.transport))['authSid']
+
+    async def _reauthenticate(self, expired_sid: str) -> None:
+        """Log in again, unless another task has already replaced the expired session"""
+        if self.__session_lock is None:
+            self.__session_lock = asyncio.Lock()
+        async with self.__session_lock:
+            if self.sid == expired_sid:
+                await self.__login()
+
+    async def __loadCameras(self):
+        """Load Camera Data from Instance"""
+        self.__cameras = {}
+        semaphore = asyncio.Semaphore(self.max_workers)
+        async def limited(api_function, *args):
+            async with semaphore:
+                return await self._call(api_function, *args)
+        async def loadCameraList():
+            data = (await limited(api_cameraList))['datas']
+            return data, await asyncio.gather(*[limited(api_streamList, camera_values['guid']) for camera_values in data])
+        # Every request is awaited before any error is raised, the camera list's error taking precedence
+        results = await asyncio.gather(loadCameraList(), limited(api_cameraCapability), limited(api_eventCapability), return_exceptions = True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        (data, stream_lists), self.camera_capability, self.event_capability = results
+        for camera_values, stream_list in zip(data, stream_lists):
+            guid = camera_values['guid']
+            self.__cameras[guid] = AsyncCamera(self, camera_values, stream_list['streams'], self.__username, self.__password)
+
+    async def connect(self) -> None:
+        """Establish a connection to the instance and load camera data"""
+        await self.__login()
+        await self.__loadCameras()
+
+    async def disconnect(self) -> None:
+        """Disconnect from the instance and remove camera data"""
+        await api_authLogout(self.url, self.sid, transport = self.transport)
+        self.sid = None
+        self.__cameras = None
+
+    async def doCameraSearch(self) -> List[AsyncCamera]:
+        """Have the instance search the network for new cameras"""
+        data = (await self._call(api_cameraSearch))['data']
+        cameras: List[AsyncCamera] = []
+        for val in data:
+            cameras.append(AsyncCamera(self, val, []))
+        return cameras
+
+    async def getCameras(self) -> List[AsyncCamera]:
+        """Get a list of Cameras connected to the instance"""
+        if len(self.__cameras) == 0:
+            await self.__loadCameras()
+        return self.__cameras.values()
+
+    def getCamera(self, guid: str) -> AsyncCamera:
+        """Get a single Camera by GUID"""
+        return self.__cameras[guid]
+
+    async def getSupportedCameras(self) -> dict:
+        """Get a dictionary of Brands and supported camera models for this instance"""
+        return _formatSupportedCameras((await self._call(api_cameraSupport))['brands'])
+
+    async def getLogs(self, log_type: QVRLogType, level: List[QVRLogLevel], user: str, source_ip: str, source_name: str, channel_id: List[int], global_channel_id: List[int], start_time: datetime, end_time: datetime, start_index: int, max_results: int, sort_field: str, sort_direction: QVRSortDirection) -> dict:
+        """Return logs matching the specified criteria"""
+        return await self._call(api_logs, log_type.value, _formatLogLevels(level), user, source_ip, source_name, str(channel_id), str(global_channel_id), start_time, end_time, start_index, max_results, sort_field, _formatSortDirection(sort_direction))
+
+    async def getChannelList(self) -> dict:
+        return await self._call(api_channelList)
+
+    async def __aenter__(self):
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *args):
+        try:
+            await self.disconnect()
+        finally:
+            await self.transport.close()
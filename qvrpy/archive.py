@@ -0,0 +1,138 @@
+"""
+Local log archive.
+
+A LogArchive keeps QVR Pro logs in an SQLite database indexed by time, log type, level, channel and
+source IP. It records which time ranges of each log type it holds in full, so that log searches over
+archived history are answered locally and only the un-archived remainder is fetched from QVR Pro.
+"""
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import List, Tuple
+
+from .enums import QVRSortDirection
+from .logs import LogIterator, LogQuery, LogRecord, _recordKey, _utc
+
+_SCHEMA: str = '''
+CREATE TABLE IF NOT EXISTS logs (
+    log_type INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    time REAL NOT NULL,
+    level INTEGER,
+    user TEXT,
+    source_ip TEXT,
+    source_name TEXT,
+    channel_id INTEGER,
+    global_channel_id INTEGER,
+    log_values TEXT NOT NULL,
+    PRIMARY KEY (log_type, key)
+);
+CREATE INDEX IF NOT EXISTS logs_time ON logs (log_type, time);
+CREATE INDEX IF NOT EXISTS logs_level ON logs (log_type, level, time);
+CREATE INDEX IF NOT EXISTS logs_channel ON logs (log_type, channel_id, time);
+CREATE INDEX IF NOT EXISTS logs_source_ip ON logs (log_type, source_ip, time);
+CREATE TABLE IF NOT EXISTS coverage (
+    log_type INTEGER NOT NULL,
+    start REAL NOT NULL,
+    end REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS coverage_range ON coverage (log_type, start);
+'''
+
+def _timestamp(value: datetime) -> float:
+    return _utc(value).timestamp()
+
+def _enumValue(value):
+    return value.value if value is not None else None
+
+class LogArchive:
+    """An SQLite store of QVR Pro logs, used by Instance.getLogs to answer searches over archived time ranges
+
+    Logs newer than settle_time seconds are fetched and stored but their range is not marked as archived,
+    as QVR Pro may still be writing logs for it.
+    """
+
+    def __init__(self, path: str = ':memory:', settle_time: float = 60.0, page_size: int = 1000):
+        self.path: str = path
+        self.settle_time: float = settle_time
+        self.page_size: int = page_size
+        self.__lock: threading.Lock = threading.Lock()
+        self.__db: sqlite3.Connection = sqlite3.connect(path, check_same_thread = False)
+        self.__db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self.__lock:
+            self.__db.close()
+
+    def store(self, log_type: int, records: List[LogRecord]) -> None:
+        """Store log records of the given log type, replacing any already archived"""
+        rows = []
+        for record in records:
+            if record.time is None:
+                continue
+            rows.append((log_type, str(_recordKey(record)), record.time.timestamp(), _enumValue(record.level), record.user, record.source_ip, record.source_name, record.channel_id, record.global_channel_id, json.dumps(record.values)))
+        with self.__lock, self.__db:
+            self.__db.executemany('INSERT OR REPLACE INTO logs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+
+    def markArchived(self, log_type: int, start: float, end: float) -> None:
+        """Record that every log of the given type between the start and end timestamps is archived"""
+        with self.__lock, self.__db:
+            overlapping = self.__db.execute('SELECT rowid, start, end FROM coverage WHERE log_type = ? AND start <= ? AND end >= ?', (log_type, end, start)).fetchall()
+            for _, other_start, other_end in overlapping:
+                start = min(start, other_start)
+                end = max(end, other_end)
+            self.__db.executemany('DELETE FROM coverage WHERE rowid = ?', [(rowid,) for rowid, _, _ in overlapping])
+            self.__db.execute('INSERT INTO coverage VALUES (?, ?, ?)', (log_type, start, end))
+
+    def archivedUntil(self, log_type: int, start: float) -> float:
+        """Return the end of the archived range containing the start timestamp, or None where it is not archived"""
+        with self.__lock:
+            row = self.__db.execute('SELECT end FROM coverage WHERE log_type = ? AND start <= ? AND end >= ? ORDER BY end DESC LIMIT 1', (log_type, start, start)).fetchone()
+        return row[0] if row is not None else None
+
+    def archive(self, instance, log_type, start_time: datetime, end_time: datetime) -> None:
+        """Fetch and store every log of the given type in the time range that is not already archived"""
+        start = _timestamp(start_time)
+        end = _timestamp(end_time)
+        archived_until = self.archivedUntil(log_type.value, start)
+        if archived_until is not None and archived_until >= end:
+            return
+        fetch_start = datetime.fromtimestamp(archived_until, timezone.utc) if archived_until is not None else start_time
+        query = LogQuery(log_type, start_time = fetch_start, end_time = end_time, sort_direction = QVRSortDirection.ASCENDING)
+        records = []
+        for record in LogIterator(instance, query, self.page_size, remote = True):
+            records.append(record)
+            if len(records) >= self.page_size:
+                self.store(log_type.value, records)
+                records = []
+        self.store(log_type.value, records)
+        settled = min(end, time.time() - self.settle_time)
+        if settled > _timestamp(fetch_start):
+            self.markArchived(log_type.value, _timestamp(fetch_start), settled)
+
+    def query(self, query: LogQuery, start_index: int, max_results: int) -> Tuple[int, List[dict]]:
+        """Return the total number of archived logs matching query, and a page of their values"""
+        conditions = ['log_type = ?', 'time >= ?', 'time <= ?']
+        params = [query.log_type.value, _timestamp(query.start_time), _timestamp(query.end_time)]
+        for column, values in [('level', [level.value for level in query.level or []]), ('channel_id', query.channel_id or []), ('global_channel_id', query.global_channel_id or [])]:
+            if len(values) > 0:
+                conditions.append('{0} IN ({1})'.format(column, ', '.join('?' * len(values))))
+                params.extend(values)
+        for column, value in [('user', query.user), ('source_ip', query.source_ip), ('source_name', query.source_name)]:
+            if value is not None:
+                conditions.append('{0} = ?'.format(column))
+                params.append(value)
+        where = ' AND '.join(conditions)
+        direction = 'DESC' if query.sort_direction == QVRSortDirection.DESCENDING else 'ASC'
+        with self.__lock:
+            total = self.__db.execute('SELECT COUNT(*) FROM logs WHERE ' + where, params).fetchone()[0]
+            rows = self.__db.execute('SELECT log_values FROM logs WHERE {0} ORDER BY time {1}, key {1} LIMIT ? OFFSET ?'.format(where, direction), params + [max_results, start_index]).fetchall()
+        return total, [json.loads(row[0]) for row in rows]
+
+    def getLogs(self, instance, query: LogQuery, start_index: int, max_results: int) -> dict:
+        """Answer a log search from the archive, first fetching any part of its time range not yet archived"""
+        self.archive(instance, query.log_type, query.start_time, query.end_time)
+        total, items = self.query(query, start_index, max_results)
+        return {'total' : total, 'items' : items}
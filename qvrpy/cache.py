@@ -0,0 +1,122 @@
+"""
+Snapshot cache.
+
+Caches snapshot images by camera GUID and timestamp, rounded to a configurable resolution, so that
+repeated requests for the same image within the cache lifetime are answered without contacting
+QVR Pro, and concurrent requests for an image not yet cached share a single request.
+"""
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Tuple
+
+class _Pending:
+    """A snapshot request in flight, shared by every caller asking for the same key"""
+
+    def __init__(self):
+        self.done: threading.Event = threading.Event()
+        self.value: bytes = None
+        self.error: Exception = None
+
+class SnapshotCache:
+    """A thread-safe TTL and size-bounded LRU cache of snapshot images"""
+
+    def __init__(self, ttl: float = 5.0, max_bytes: int = 64 * 1024 * 1024, resolution: float = 1.0):
+        """Initialise the cache
+
+        Images are kept for ttl seconds, timestamps are rounded down to resolution seconds to form the
+        cache key, and once the cached images exceed max_bytes the least recently used are evicted.
+        """
+        self.ttl: float = ttl
+        self.max_bytes: int = max_bytes
+        self.resolution: float = resolution
+        self.hits: int = 0
+        self.misses: int = 0
+        self.coalesced: int = 0
+        self.evictions: int = 0
+        self.__size: int = 0
+        self.__entries: OrderedDict = OrderedDict()
+        self.__pending: dict = {}
+        self.__lock: threading.Lock = threading.Lock()
+
+    def key(self, guid: str, image_timestamp: datetime) -> Tuple[str, int]:
+        """Return the cache key for a camera's image at the given timestamp"""
+        return (guid, int(image_timestamp.timestamp() // self.resolution))
+
+    def __evict(self) -> None:
+        while self.__size > self.max_bytes and len(self.__entries) > 0:
+            _, (value, _) = self.__entries.popitem(last = False)
+            self.__size -= len(value)
+            self.evictions += 1
+
+    def __store(self, key: Tuple[str, int], value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        self.__entries[key] = (value, time.monotonic() + self.ttl)
+        self.__size += len(value)
+        self.__evict()
+
+    def get(self, guid: str, image_timestamp: datetime, fetch: Callable[[], bytes]) -> bytes:
+        """Return the cached image, or call fetch to retrieve it, sharing the call with concurrent callers"""
+        key = self.key(guid, image_timestamp)
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                if entry[1] > time.monotonic():
+                    self.__entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                del self.__entries[key]
+                self.__size -= len(entry[0])
+            pending = self.__pending.get(key)
+            if pending is not None:
+                self.coalesced += 1
+                owner = False
+            else:
+                pending = _Pending()
+                self.__pending[key] = pending
+                self.misses += 1
+                owner = True
+        if not owner:
+            pending.done.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.value
+        try:
+            pending.value = fetch()
+        except Exception as e:
+            pending.error = e
+            raise
+        finally:
+            with self.__lock:
+                del self.__pending[key]
+                if pending.error is None:
+                    self.__store(key, pending.value)
+            pending.done.set()
+        return pending.value
+
+    def clear(self) -> None:
+        """Remove every cached image"""
+        with self.__lock:
+            self.__entries.clear()
+            self.__size = 0
+
+    @property
+    def size(self) -> int:
+        """The number of bytes of images currently cached"""
+        return self.__size
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def stats(self) -> dict:
+        """Return the cache counters"""
+        return {
+            'hits' : self.hits,
+            'misses' : self.misses,
+            'coalesced' : self.coalesced,
+            'evictions' : self.evictions,
+            'entries' : len(self.__entries),
+            'bytes' : self.__size
+            }
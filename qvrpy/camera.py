@@ -1,126 +1,209 @@
+import threading
 from datetime import datetime
-import re
-from typing import List, Sequence
+from typing import Callable, Dict, Iterator, List, Tuple
 
-from .enums import QVRPTZAction
+from .download import DEFAULT_CHUNK_SIZE, DownloadProgress, downloadTo, iterResponse
+from .enums import QVRCamStatus, QVRPTZAction, QVRRecordingStatus
 from .qvrapi import (
-    cameraSnapshot as api_cameraSnapshot,
     cameraRecordingStart as api_cameraRecordingStart,
     cameraRecordingStop as api_cameraRecordingStop,
     cameraAlarmStart as api_cameraAlarmStart,
     cameraAlarmStop as api_cameraAlarmStop,
     cameraRecordingFile as api_cameraRecordingFile,
+    cameraRecordingFileStream as api_cameraRecordingFileStream,
     cameraPTZStartMove as api_cameraPTZStartMove,
     cameraPTZStopMove as api_cameraPTZStopMove,
     cameraPTZ as api_cameraPTZ,
     streamList as api_streamList,
     )
-from .stream import Stream
-
-_RESOLUTION_REGEX: re.Pattern = re.compile('(\d+)[xX*](\d+)')
-
-def _checkValue(values: dict, key: str):
-    if key in values:
-        val = values[key]
-        if val != None and (type(val) != str or len(val.strip()) > 0):
-            return val
-    return None
-
-def _checkVideoResolution(values: dict, key: str) -> Sequence[int]:
-    val: str = _checkValue(values, key)
-    if val != None and type(val) == str:
-       match = _RESOLUTION_REGEX.fullmatch(val.strip())
-       if match != None:
-           return (int(match.group(1)), int(match.group(2)))
-       else:
-           raise Exception("Bad Resolution Data: {0}".format(val))
-
-def _checkVideoQuality(values: dict, key: str) -> str:
-    val: str = _checkValue(values, key)
-    if val != None:
-        return val.replace(' ', '')
-
-class Camera:
-    """A representation of a Camera for QVR Pro"""
-
-    def __init__(self, instance, camera_values: dict, stream_values: List[dict], username: str = None, password: str = None):
+from .stream import Stream, _LazyField, _StreamBase, _checkValue, _cleanValue, _parseVideoQuality, _resolutionHeight, _resolutionWidth, _storeHeight, _storeWidth
+
+# Stream lists are loaded under one of a fixed set of locks chosen by GUID, rather than a lock per Camera
+_STREAM_LOCKS: Tuple[threading.Lock, ...] = tuple(threading.Lock() for _ in range(64))
+
+class _CameraBase:
+    """The state of a Camera in QVR Pro, shared by Camera and the asyncio client's AsyncCamera
+
+    Cameras are slotted to keep large inventories compact. Attributes that are rarely read are kept as
+    returned by QVR Pro and parsed only when read. Subclasses provide streams, the Camera's stream list.
+    """
+
+    __slots__ = ('_instance', '_raw', '_streams', '__username', '__password', 'channel_index', 'name', 'guid', 'status', 'rec_state', 'rec_state_err_code', 'frame_rate', 'bit_rate')
+
+    _stream_class = _StreamBase
+
+    _EAGER_KEYS: Tuple[Tuple[str, str], ...] = (
+        ('channel_index', 'channel_index'),
+        ('name', 'name'),
+        ('guid', 'guid'),
+        ('status', 'status'),
+        ('rec_state', 'rec_state'),
+        ('rec_state_err_code', 'rec_state_err_code'),
+        ('frame_rate', 'frame_rate'),
+        ('bit_rate', 'bit_rate')
+        )
+    _RAW_KEYS: Tuple[str, ...] = ('umsid', 'brand', 'model', 'mac', 'ver', 'ip', 'port', 'rtsp_port', 'http_video_url', 'video_codec_setting', 'video_resolution_setting', 'frame_rate_setting', 'video_quality_setting')
+    _LAZY_FIELDS: Tuple[str, ...] = ('umsid', 'brand', 'model', 'mac', 'ver', 'ip', 'port', 'rtsp_port', 'http_video_url', 'video_codec', 'video_resolution_width', 'video_resolution_height', 'frame_rate_setting', 'video_quality')
+    _FIELDS: Tuple[str, ...] = ('channel_index', 'name', 'umsid', 'guid', 'brand', 'model', 'mac', 'ver', 'ip', 'port', 'rtsp_port', 'http_video_url', 'video_codec', 'video_resolution_width', 'video_resolution_height', 'frame_rate_setting', 'video_quality', 'status', 'rec_state', 'rec_state_err_code', 'frame_rate', 'bit_rate')
+
+    channel_index: int
+    name: str
+    umsid: str = _LazyField(0)
+    guid: str
+    brand: str = _LazyField(1)
+    model: str = _LazyField(2)
+    mac: str = _LazyField(3)
+    ver: str = _LazyField(4)
+    ip: str = _LazyField(5)
+    port: int = _LazyField(6)
+    rtsp_port: int = _LazyField(7)
+    http_video_url: str = _LazyField(8)
+    video_codec: str = _LazyField(9)
+    video_resolution_width: int = _LazyField(10, _resolutionWidth, _storeWidth)
+    video_resolution_height: int = _LazyField(10, _resolutionHeight, _storeHeight)
+    frame_rate_setting: str = _LazyField(11)
+    video_quality: str = _LazyField(12, _parseVideoQuality)
+    status: QVRCamStatus
+    rec_state: QVRRecordingStatus
+    rec_state_err_code: int
+    frame_rate: str
+    bit_rate: int
+
+    def __init__(self, instance, camera_values: dict, stream_values: List[dict] = None, username: str = None, password: str = None):
         self._instance = instance
-        self.channel_index: int = _checkValue(camera_values, 'channel_index')
-        self.name: str = _checkValue(camera_values, 'name')
-        self.umsid: str = _checkValue(camera_values, 'umsid')
-        self.guid: str = _checkValue(camera_values, 'guid')
-        self.brand: str = _checkValue(camera_values, 'brand')
-        self.model: str = _checkValue(camera_values, 'model')
-        self.mac: str = _checkValue(camera_values, 'mac')
-        self.ver: str = _checkValue(camera_values, 'ver')
-        self.ip: str = _checkValue(camera_values, 'ip')
-        self.port: int = _checkValue(camera_values, 'port')
         self.__username: str = username or _checkValue(camera_values, 'username')
         self.__password: str = password or _checkValue(camera_values, 'password')
-        self.rtsp_port: int = _checkValue(camera_values, 'rtsp_port')
-        self.http_video_url: str = _checkValue(camera_values, 'http_video_url')
-        self.video_codec: str = _checkValue(camera_values, 'video_codec_setting')
-        res = _checkVideoResolution(camera_values, 'video_resolution_setting')
-        self.video_resolution_width: int = res[0]
-        self.video_resolution_height: int = res[1]
-        self.frame_rate_setting: str = _checkValue(camera_values, 'frame_rate_setting')
-        self.video_quality: str = _checkVideoQuality(camera_values, 'video_quality_setting')
-        self.status: QVRCamStatus = _checkValue(camera_values, 'status')
-        self.rec_state: QVRRecordingStatus = _checkValue(camera_values, 'rec_state')
-        self.rec_state_err_code: int = _checkValue(camera_values, 'rec_state_err_code')
-        self.frame_rate: str = _checkValue(camera_values, 'frame_rate')
-        self.bit_rate: int = _checkValue(camera_values, 'bit_rate')
-        self.streams: List[Stream] = []
-        for val in stream_values:
-            self.streams.append(Stream(self, val, self.__username, self.__password))
+        self._update(camera_values)
+        self._streams: List[Stream] = None
+        if stream_values is not None:
+            self._setStreams(stream_values)
+
+    def _credentials(self) -> tuple:
+        return (self.__username, self.__password)
+
+    def _setStreams(self, stream_values: List[dict]) -> None:
+        """Replace this Camera's streams with ones created from a stream list"""
+        self._streams = [self._stream_class(self, val) for val in stream_values]
+
+    @property
+    def streams_loaded(self) -> bool:
+        return self._streams is not None
+
+    def _values(self) -> dict:
+        """Return the camera list entry this Camera was created from, without credentials"""
+        values = {key: getattr(self, name) for name, key in self._EAGER_KEYS}
+        values.update(zip(self._RAW_KEYS, self._raw))
+        return values
+
+    def _update(self, camera_values: dict) -> Dict[str, tuple]:
+        """Update this Camera from a camera list entry, returning the changed attributes as (old, new) pairs"""
+        changes = {}
+        get = camera_values.get
+        for name, key in self._EAGER_KEYS:
+            val = _cleanValue(get(key))
+            old = getattr(self, name, None)
+            if old != val:
+                changes[name] = (old, val)
+            setattr(self, name, val)
+        raw = tuple(map(get, self._RAW_KEYS))
+        old_raw = getattr(self, '_raw', None)
+        self._raw = raw
+        if old_raw is not None and old_raw != raw:
+            cls = type(self)
+            for name in self._LAZY_FIELDS:
+                field = getattr(cls, name)
+                old = field.parse(old_raw[field.index])
+                val = field.parse(raw[field.index])
+                if old != val:
+                    changes[name] = (old, val)
+        return changes
+
+    def getStream(self, stream_id: int = 0) -> _StreamBase:
+        """Get a stream matching the provided ID, where no ID is provided this will be Stream #0"""
+        return self.streams[stream_id]
+
+    def getStreamList(self) -> List[_StreamBase]:
+        """Get all streams for this Camera"""
+        return self.streams
+
+    def toDict(self) -> dict:
+        """Return the public attributes of this Camera, with its streams as dicts where they are loaded"""
+        values = {name: getattr(self, name) for name in self._FIELDS}
+        values['streams'] = [stream.toDict() for stream in self._streams] if self._streams is not None else None
+        return values
+
+    def __str__(self):
+        return self.toDict().__str__()
+
+class Camera(_CameraBase):
+    """A representation of a Camera for QVR Pro
+
+    The stream list is fetched on first use unless it is given when the Camera is created.
+    """
+
+    __slots__ = ()
+
+    _stream_class = Stream
+
+    @property
+    def streams(self) -> List[Stream]:
+        """The streams of this Camera, fetched from QVR Pro on first use"""
+        streams = self._streams
+        if streams is None:
+            with _STREAM_LOCKS[hash(self.guid) % len(_STREAM_LOCKS)]:
+                if self._streams is None:
+                    self._setStreams(self._instance._call(api_streamList, self.guid)['streams'])
+                streams = self._streams
+        return streams
 
     def getSnapShot(self, image_timestamp: datetime):
         """Return an image for this camera at the given timestamp"""
-        return api_cameraSnapshot(self._instance.url, self._instance.sid, self.guid, image_timestamp)
+        return self._instance.getSnapShot(self.guid, image_timestamp)
 
     def startRecording(self) -> None:
         """Start recording for this Camera"""
-        api_cameraRecordingStart(self._instance.url, self._instance.sid, self.guid)
+        self._instance._call(api_cameraRecordingStart, self.guid)
 
     def stopRecording(self) -> None:
         """Stop recording for this Camera"""
-        api_cameraRecordingStop(self._instance.url, self._instance.sid, self.guid)
+        self._instance._call(api_cameraRecordingStop, self.guid)
 
     def startAlarm(self) -> None:
         """Start the Alarm for this Camera"""
-        api_cameraAlarmStart(self._instance.url, self._instance.sid, self.guid)
+        self._instance._call(api_cameraAlarmStart, self.guid)
 
     def stopAlarm(self) -> None:
         """Stop the Alarm for this Camera"""
-        api_cameraAlarmStop(self._instance.url, self._instance.sid, self.guid)
+        self._instance._call(api_cameraAlarmStop, self.guid)
         
+    def getRecording(self, time: datetime, pre_period: int, post_period: int, stream: int = 0) -> bytes:
+        """Return the recording for this Camera around the given time, buffered in memory"""
+        return self._instance._call(api_cameraRecordingFile, self.guid, stream, time, pre_period, post_period)
+
+    def iterRecording(self, time: datetime, pre_period: int, post_period: int, stream: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE, offset: int = 0) -> Iterator[bytes]:
+        """Yield the recording for this Camera around the given time in chunks, starting at the given byte offset"""
+        response = self._instance._call(api_cameraRecordingFileStream, self.guid, stream, time, pre_period, post_period, offset)
+        return iterResponse(response, chunk_size)
+
+    def downloadRecording(self, destination, time: datetime, pre_period: int, post_period: int, stream: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE, resume: bool = True, retries: int = 3, progress: Callable[[DownloadProgress], None] = None) -> int:
+        """Write the recording for this Camera around the given time to a file path or file-like object
+
+        Only one chunk is held in memory at a time. A partially downloaded file at destination is resumed
+        when resume is set, as are interrupted connections, and progress is called with a DownloadProgress
+        after every chunk. Returns the size of the downloaded recording in bytes.
+        """
+        def openResponse(offset: int):
+            return self._instance._call(api_cameraRecordingFileStream, self.guid, stream, time, pre_period, post_period, offset)
+        return downloadTo(openResponse, destination, resume = resume, chunk_size = chunk_size, retries = retries, progress = progress)
+
     def startPTZMove(self, direction: QVRPTZAction) -> None:
         """Start a PTZ move for this Camera"""
-        api_cameraPTZStartMove(self._instance.url, self._instance.sid, self.guid, direction.value)
+        self._instance._call(api_cameraPTZStartMove, self.guid, direction.value)
         
     def stopPTZMove(self, direction: QVRPTZAction) -> None:
         """Stop a PTZ move for this Camera"""
-        api_cameraPTZStopMove(self._instance.url, self._instance.sid, self.guid, direction.value)
+        self._instance._call(api_cameraPTZStopMove, self.guid, direction.value)
 
     def doPTZAction(self, action: QVRPTZAction) -> None:
         """Perform a PTZ action for this Camera"""
-        api_cameraPTZ(self._instance.url, self._instance.sid, self.guid, action.value)
-
-    def getStream(self, stream_id: int = 0) -> Stream:
-        """Get a stream matching the provided ID, where no ID is provided this will be Stream #0"""
-        return self.streams[stream_id]
-
-    def getStreamList(self) -> List[Stream]:
-        """Get all streams for this Camera"""
-        return self.streams
-
-    def __str__(self):
-        tempdict = self.__dict__.copy()
-        del tempdict['_instance']
-        del tempdict['_Camera__username']
-        del tempdict['_Camera__password']
-        templist = []
-        for s in tempdict['streams']:
-            templist.append(s.__str__())
-        tempdict['streams'] = templist
-        return tempdict.__str__()
\ No newline at end of file
+        self._instance._call(api_cameraPTZ, self.guid, action.value)
@@ -0,0 +1,167 @@
+"""
+Supported camera catalog.
+
+QVR Pro lists every camera brand and model it supports, with the umsid used to add each, in a
+catalog that can run to several megabytes. A CameraCatalog indexes that list once, for constant time
+lookup of a brand and model's umsid and case-insensitive prefix search over models, and a
+CatalogCache keeps each instance's catalog for a configurable lifetime, in memory and optionally on
+disk, so that it is downloaded only when it has expired.
+"""
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, NamedTuple, Tuple
+
+from .inventory import _writeJSON
+
+_FORMAT_VERSION: int = 1
+
+def _formatSupportedCameras(brands: List[dict]) -> List[dict]:
+    """Rename the fields of a camera support response to brand, model and umsid"""
+    for brand in brands:
+        brand['brand'] = brand['text']
+        models = brand['models']
+        del brand['models']
+        del brand['text']
+        del brand['value']
+        for model in models:
+            model['model'] = model['text']
+            model['umsid'] = model['value']
+            del model['text']
+            del model['value']
+        brand['models'] = models
+    return brands
+
+class SupportedModel(NamedTuple):
+    """A camera model supported by QVR Pro"""
+    brand: str
+    model: str
+    umsid: str
+
+class CameraCatalog:
+    """An index of the camera brands and models supported by a QVR Pro instance"""
+
+    def __init__(self, brands: List[dict], fetched: float = None):
+        """Index a camera support response's brand list, as fetched at the given time"""
+        self.fetched: float = fetched if fetched is not None else time.time()
+        self.__brands: List[dict] = brands
+        self.__brand_models: Dict[str, List[SupportedModel]] = {}
+        self.__models: Dict[Tuple[str, str], SupportedModel] = {}
+        self.__umsids: Dict[str, SupportedModel] = {}
+        for brand in brands:
+            models = self.__brand_models.setdefault(brand['text'], [])
+            for model in brand['models']:
+                supported = SupportedModel(brand['text'], model['text'], model['value'])
+                models.append(supported)
+                self.__models[(supported.brand.casefold(), supported.model.casefold())] = supported
+                self.__umsids.setdefault(supported.umsid, supported)
+        ordered = sorted(self.__models.items(), key = lambda item: (item[0][1], item[0][0]))
+        self.__search_keys: List[str] = [key[1] for key, _ in ordered]
+        self.__search_models: List[SupportedModel] = [supported for _, supported in ordered]
+
+    @property
+    def brands(self) -> List[str]:
+        return list(self.__brand_models)
+
+    def models(self, brand: str) -> List[SupportedModel]:
+        """Return the supported models of a brand, as listed by QVR Pro"""
+        return list(self.__brand_models.get(brand, []))
+
+    def get(self, brand: str, model: str) -> SupportedModel:
+        """Return the supported model matching brand and model regardless of case, or None where there is none"""
+        return self.__models.get((brand.casefold(), model.casefold()))
+
+    def umsid(self, brand: str, model: str) -> str:
+        """Return the umsid of a brand and model regardless of case, or None where it is not supported"""
+        supported = self.__models.get((brand.casefold(), model.casefold()))
+        return supported.umsid if supported is not None else None
+
+    def getByUmsid(self, umsid: str) -> SupportedModel:
+        return self.__umsids.get(umsid)
+
+    def search(self, prefix: str, brand: str = None, limit: int = None) -> List[SupportedModel]:
+        """Return the models starting with prefix regardless of case, in model order, optionally of one brand only"""
+        prefix = prefix.casefold()
+        start = bisect_left(self.__search_keys, prefix)
+        end = bisect_left(self.__search_keys, prefix + '\U0010ffff', start)
+        matches = self.__search_models[start:end]
+        if brand is not None:
+            brand = brand.casefold()
+            matches = [supported for supported in matches if supported.brand.casefold() == brand]
+        return matches[:limit] if limit is not None else matches
+
+    def toList(self) -> List[dict]:
+        """Return the catalog in the form given by Instance.getSupportedCameras"""
+        return _formatSupportedCameras(copy.deepcopy(self.__brands))
+
+    def _brands(self) -> List[dict]:
+        return self.__brands
+
+    def __len__(self) -> int:
+        return len(self.__models)
+
+class CatalogCache:
+    """Keeps the camera catalog of each QVR Pro instance URL for max_age seconds"""
+
+    def __init__(self, max_age: float = 86400.0, directory: str = None):
+        """Initialise the cache, also keeping catalogs as files in directory where it is given"""
+        self.max_age: float = max_age
+        self.directory: str = directory
+        self.__catalogs: Dict[str, CameraCatalog] = {}
+        self.__lock: threading.Lock = threading.Lock()
+
+    def path(self, url: str) -> str:
+        """Return the path of the file holding the catalog of the instance at url"""
+        return os.path.join(self.directory, 'qvrpy-catalog-{0}.json'.format(hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]))
+
+    def __expired(self, catalog: CameraCatalog) -> bool:
+        return self.max_age is not None and time.time() - catalog.fetched > self.max_age
+
+    def __load(self, url: str) -> CameraCatalog:
+        try:
+            with open(self.path(url), 'r', encoding = 'utf-8') as f:
+                document = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if type(document) != dict or document.get('version') != _FORMAT_VERSION or document.get('url') != url:
+            return None
+        return CameraCatalog(document['brands'], document.get('fetched', 0))
+
+    def get(self, url: str) -> CameraCatalog:
+        """Return the catalog of the instance at url, or None where none has been kept for max_age seconds"""
+        with self.__lock:
+            catalog = self.__catalogs.get(url)
+        if catalog is None and self.directory is not None:
+            catalog = self.__load(url)
+            if catalog is not None:
+                with self.__lock:
+                    self.__catalogs[url] = catalog
+        if catalog is None or self.__expired(catalog):
+            return None
+        return catalog
+
+    def put(self, url: str, catalog: CameraCatalog) -> None:
+        """Keep the catalog of the instance at url, writing it to disk where the cache has a directory"""
+        with self.__lock:
+            self.__catalogs[url] = catalog
+        if self.directory is not None:
+            _writeJSON(self.path(url), {
+                'version' : _FORMAT_VERSION,
+                'url' : url,
+                'fetched' : catalog.fetched,
+                'brands' : catalog._brands()
+                })
+
+    def clear(self, url: str) -> None:
+        """Discard the catalog kept for the instance at url"""
+        with self.__lock:
+            self.__catalogs.pop(url, None)
+        if self.directory is not None:
+            try:
+                os.remove(self.path(url))
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,139 @@
+"""
+Streaming downloads of recording files.
+
+Recordings are copied from the response to their destination one chunk at a time, so memory use is
+bounded by the chunk size regardless of the length of the clip, and interrupted downloads are resumed
+with HTTP Range requests from the last byte written.
+"""
+import os
+import re
+import threading
+import time
+from typing import Callable, Iterator, NamedTuple
+
+import requests
+
+DEFAULT_CHUNK_SIZE: int = 64 * 1024
+
+_CONTENT_RANGE_REGEX: re.Pattern = re.compile(r'bytes\s+(\d+)-(\d+)/(\d+|\*)')
+_INTERRUPTED_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.Timeout,
+    ConnectionError,
+    )
+
+class DownloadProgress(NamedTuple):
+    """Progress of a download, passed to progress callbacks after every chunk"""
+    bytes_received: int
+    total_bytes: int
+    bytes_per_second: float
+    elapsed: float
+
+class BandwidthLimiter:
+    """A token bucket limiting the combined rate of every download it throttles
+
+    Instances are callable with a number of bytes about to be transferred, blocking the calling thread
+    for as long as is needed to keep the overall rate within bytes_per_second.
+    """
+
+    def __init__(self, bytes_per_second: int):
+        self.bytes_per_second: int = bytes_per_second
+        self.__allowance: float = bytes_per_second
+        self.__updated: float = time.monotonic()
+        self.__lock: threading.Lock = threading.Lock()
+
+    def __call__(self, size: int) -> None:
+        with self.__lock:
+            now = time.monotonic()
+            self.__allowance = min(self.bytes_per_second, self.__allowance + (now - self.__updated) * self.bytes_per_second)
+            self.__updated = now
+            self.__allowance -= size
+            wait = -self.__allowance / self.bytes_per_second
+        if wait > 0:
+            time.sleep(wait)
+
+def _totalBytes(response, offset: int) -> int:
+    """Return the full size of the file being downloaded, or None where it is not known"""
+    content_range = response.headers.get('Content-Range')
+    if content_range is not None:
+        match = _CONTENT_RANGE_REGEX.match(content_range)
+        if match is not None and match.group(3) != '*':
+            return int(match.group(3))
+    content_length = response.headers.get('Content-Length')
+    if content_length is not None:
+        return offset + int(content_length)
+    return None
+
+def iterResponse(response, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield the body of a streamed response in chunks, closing it once exhausted"""
+    try:
+        for chunk in response.iter_content(chunk_size):
+            if chunk:
+                yield chunk
+    finally:
+        response.close()
+
+def download(open_response: Callable[[int], object], fileobj, offset: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE, retries: int = 3, progress: Callable[[DownloadProgress], None] = None, throttle: Callable[[int], None] = None) -> int:
+    """Copy a streamed response into fileobj, returning the number of bytes in the downloaded file
+
+    open_response is called with the byte offset to start from and must return a streamed response
+    (status 206 where the range was honoured). When the connection drops, the download is resumed from
+    the last byte written up to retries times. throttle, where given, is called with the size of every
+    chunk before it is written and may block to limit bandwidth.
+    """
+    start_position = fileobj.tell() if fileobj.seekable() else None
+    received = offset
+    transferred = 0
+    started = time.monotonic()
+    attempt = 0
+    while True:
+        response = None
+        try:
+            response = open_response(received)
+            if received > 0 and response.status_code == 416:
+                # The requested range starts at the end of the file, so it is already complete
+                return received
+            if received > 0 and response.status_code != 206:
+                # The server ignored the range, so the file is being sent from the start
+                if start_position is None:
+                    raise Exception('Unable to resume download: the server does not support range requests')
+                fileobj.seek(start_position - offset)
+                fileobj.truncate()
+                received = 0
+            total = _totalBytes(response, received)
+            for chunk in response.iter_content(chunk_size):
+                if not chunk:
+                    continue
+                if throttle is not None:
+                    throttle(len(chunk))
+                fileobj.write(chunk)
+                received += len(chunk)
+                transferred += len(chunk)
+                if progress is not None:
+                    elapsed = time.monotonic() - started
+                    progress(DownloadProgress(received, total, transferred / elapsed if elapsed > 0 else 0.0, elapsed))
+            if total is None or received >= total:
+                return received
+            raise ConnectionError('Download ended after {0} of {1} bytes'.format(received, total))
+        except _INTERRUPTED_ERRORS:
+            if attempt >= retries:
+                raise
+            attempt += 1
+        finally:
+            if response is not None:
+                response.close()
+
+def downloadTo(open_response: Callable[[int], object], destination, resume: bool = True, **kwargs) -> int:
+    """Download to a file path or a writable binary file-like object
+
+    Where destination is a path to an existing file and resume is set, the download continues from
+    the end of the file.
+    """
+    if hasattr(destination, 'write'):
+        return download(open_response, destination, **kwargs)
+    offset = 0
+    if resume and os.path.exists(destination):
+        offset = os.path.getsize(destination)
+    with open(destination, 'ab' if offset > 0 else 'wb') as fileobj:
+        return download(open_response, fileobj, offset = offset, **kwargs)
@@ -60,4 +60,10 @@ class QVRStreamingProtocol(Enum):
     """Enumerated values for streaming protocols"""
     HLS = 'hls'
     RTMP = 'rtmp'
-    RTSP = 'rtsp'
\ No newline at end of file
+    RTSP = 'rtsp'
+
+class QVRCameraChange(Enum):
+    """Enumerated values for the kinds of camera change reported by status watchers"""
+    ADDED = 'added'
+    REMOVED = 'removed'
+    CHANGED = 'changed'
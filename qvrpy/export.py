@@ -0,0 +1,91 @@
+"""
+Bulk export of recordings.
+
+Exports download many recording clips concurrently over an Instance's pooled transport, streaming
+each to its own file under an export directory, and summarise the outcome in a manifest.
+"""
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import List, NamedTuple
+
+from .download import DEFAULT_CHUNK_SIZE, BandwidthLimiter, downloadTo
+from .qvrapi import cameraRecordingFileStream as api_cameraRecordingFileStream
+
+class RecordingSpec(NamedTuple):
+    """A recording to export: the clip around time for a camera's stream"""
+    guid: str
+    time: datetime
+    pre_period: int
+    post_period: int
+    stream: int = 0
+    filename: str = None
+
+    def defaultFilename(self) -> str:
+        return '{0}_{1}_{2}_{3}_{4}.mp4'.format(self.guid, self.stream, self.time.strftime('%Y%m%dT%H%M%S'), self.pre_period, self.post_period)
+
+class ExportResult(NamedTuple):
+    """The outcome of exporting a single recording"""
+    spec: RecordingSpec
+    path: str
+    size: int
+    duration: float
+    error: Exception = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+class ExportManifest(NamedTuple):
+    """The outcome of an export job, with results in the order their specs were given"""
+    results: List[ExportResult]
+    duration: float
+
+    @property
+    def succeeded(self) -> List[ExportResult]:
+        return [result for result in self.results if result.succeeded]
+
+    @property
+    def failed(self) -> List[ExportResult]:
+        return [result for result in self.results if not result.succeeded]
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(result.size for result in self.results)
+
+def _exportRecording(instance, spec: RecordingSpec, path: str, **kwargs) -> ExportResult:
+    def openResponse(offset: int):
+        return instance._call(api_cameraRecordingFileStream, spec.guid, spec.stream, spec.time, spec.pre_period, spec.post_period, offset)
+    started = time.monotonic()
+    try:
+        size = downloadTo(openResponse, path, **kwargs)
+        return ExportResult(spec, path, size, time.monotonic() - started)
+    except Exception as e:
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        if size == 0 and os.path.exists(path):
+            os.remove(path)
+        return ExportResult(spec, path, size, time.monotonic() - started, e)
+
+def exportRecordings(instance, specs: List[RecordingSpec], directory: str, max_workers: int, max_bytes_per_second: int = None, chunk_size: int = DEFAULT_CHUNK_SIZE, retries: int = 3, resume: bool = True) -> ExportManifest:
+    """Export recordings concurrently to files in directory, returning a manifest of the results
+
+    Raises a ValueError, before anything is downloaded, where two specs would be written to the same file.
+    """
+    paths = [os.path.join(directory, spec.filename or spec.defaultFilename()) for spec in specs]
+    duplicates = sorted(path for path, count in Counter(paths).items() if count > 1)
+    if len(duplicates) > 0:
+        raise ValueError('Recordings exported to the same file: {0}'.format(', '.join(duplicates)))
+    os.makedirs(directory, exist_ok = True)
+    throttle = BandwidthLimiter(max_bytes_per_second) if max_bytes_per_second else None
+    started = time.monotonic()
+    results: List[ExportResult] = [None] * len(specs)
+    with ThreadPoolExecutor(max_workers = max_workers) as executor:
+        futures = {}
+        for index, (spec, path) in enumerate(zip(specs, paths)):
+            future = executor.submit(_exportRecording, instance, spec, path, resume = resume, chunk_size = chunk_size, retries = retries, throttle = throttle)
+            futures[future] = index
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+    return ExportManifest(results, time.monotonic() - started)
@@ -0,0 +1,199 @@
+"""
+Multi-NVR fleet client.
+
+A Fleet manages the Instances of many QVR Pro servers, connecting them in parallel and fanning
+operations out across them concurrently. Each operation reports a result per host, so that one
+unreachable NVR does not fail the whole fleet, and cameras are merged into a single view keyed by
+(host, guid).
+"""
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, NamedTuple, Tuple
+from urllib.parse import urlsplit
+
+from .camera import Camera
+from .instance import Instance
+from .logs import LogQuery
+
+class FleetResult(NamedTuple):
+    """The outcome of an operation on one host of a Fleet: its return value, or the error it raised"""
+    host: str
+    value: object
+    error: Exception = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+class FleetSnapshot(NamedTuple):
+    """The image, or the error raised fetching it, for one camera of Fleet.getSnapshots"""
+    host: str
+    guid: str
+    image: bytes
+    error: Exception
+
+class Fleet:
+    """Manages the Instances of many QVR Pro servers, running operations on them concurrently"""
+
+    def __init__(self, instances: List[Instance] = None, max_workers: int = 16, per_host_workers: int = 4):
+        """Initialise the fleet
+
+        At most max_workers hosts are operated on at once, and operations making many requests to a host,
+        such as snapshot grids, make at most per_host_workers requests to it at once.
+        """
+        self.max_workers: int = max_workers
+        self.per_host_workers: int = per_host_workers
+        self.__instances: Dict[str, Instance] = {}
+        self.__connected: set = set()
+        self.__lock: threading.Lock = threading.Lock()
+        for instance in instances or []:
+            self.add(instance)
+
+    def add(self, instance: Instance, host: str = None) -> str:
+        """Add an Instance to the fleet under host, which defaults to the host and port of its URL"""
+        host = host or urlsplit(instance.url).netloc
+        with self.__lock:
+            if host in self.__instances:
+                raise ValueError('Host already in fleet: {0}'.format(host))
+            self.__instances[host] = instance
+        return host
+
+    def remove(self, host: str) -> Instance:
+        """Remove a host from the fleet, returning its Instance"""
+        with self.__lock:
+            self.__connected.discard(host)
+            return self.__instances.pop(host)
+
+    @property
+    def hosts(self) -> List[str]:
+        return list(self.__instances)
+
+    @property
+    def connected(self) -> List[str]:
+        """The hosts whose last connect succeeded"""
+        return [host for host in self.__instances if host in self.__connected]
+
+    def getInstance(self, host: str) -> Instance:
+        return self.__instances[host]
+
+    def run(self, operation: Callable[[Instance], object], hosts: List[str] = None) -> Dict[str, FleetResult]:
+        """Call operation with the Instance of each host concurrently, returning a FleetResult per host
+
+        Where hosts is None, every connected host is included. Exceptions raised by operation are
+        returned in the host's FleetResult rather than raised.
+        """
+        if hosts is None:
+            hosts = self.connected
+        results = {}
+        if len(hosts) == 0:
+            return results
+        with ThreadPoolExecutor(max_workers = min(self.max_workers, len(hosts))) as executor:
+            futures = {host: executor.submit(operation, self.__instances[host]) for host in hosts}
+            for host, future in futures.items():
+                try:
+                    results[host] = FleetResult(host, future.result())
+                except Exception as e:
+                    results[host] = FleetResult(host, None, e)
+        return results
+
+    def connect(self, hosts: List[str] = None) -> Dict[str, FleetResult]:
+        """Connect to every host (or the given hosts) in parallel"""
+        results = self.run(lambda instance: instance.connect(), hosts if hosts is not None else self.hosts)
+        with self.__lock:
+            for host, result in results.items():
+                if result.succeeded:
+                    self.__connected.add(host)
+                else:
+                    self.__connected.discard(host)
+        return results
+
+    def disconnect(self) -> Dict[str, FleetResult]:
+        """Disconnect from every connected host in parallel"""
+        results = self.run(lambda instance: instance.disconnect())
+        with self.__lock:
+            self.__connected.clear()
+        return results
+
+    def getCameras(self) -> Dict[Tuple[str, str], Camera]:
+        """Get the Cameras of every connected host, keyed by (host, guid)"""
+        cameras = {}
+        for host in self.connected:
+            for camera in self.__instances[host].getCameras():
+                cameras[(host, camera.guid)] = camera
+        return cameras
+
+    def getCamera(self, host: str, guid: str) -> Camera:
+        """Get a single Camera by host and GUID"""
+        return self.__instances[host].getCamera(guid)
+
+    def refreshStatus(self) -> Dict[str, FleetResult]:
+        """Refresh the camera status of every connected host concurrently, with a StatusChanges result per host"""
+        return self.run(lambda instance: instance.refreshStatus())
+
+    def getSnapshots(self, image_timestamp: datetime, cameras: List[Tuple[str, str]] = None, timeout: float = None) -> Iterator[FleetSnapshot]:
+        """Fetch images for many cameras across the fleet, yielding a FleetSnapshot for each as soon as it completes
+
+        cameras lists the (host, guid) pairs to fetch, defaulting to every camera of every connected host.
+        Hosts are fetched from concurrently, each with at most per_host_workers requests at once. A failing
+        camera or host yields results carrying the error rather than ending the iteration, a host failing
+        part way through yielding errors only for the cameras it has not yet yielded. Hosts stop fetching
+        once the caller stops iterating.
+        """
+        guids: Dict[str, List[str]] = {}
+        if cameras is None:
+            cameras = list(self.getCameras())
+        for host, guid in cameras:
+            guids.setdefault(host, []).append(guid)
+        if len(guids) == 0:
+            return
+        results = queue.Queue()
+        done = object()
+        stopped = threading.Event()
+        def fetch(host: str):
+            yielded = set()
+            snapshots = None
+            try:
+                snapshots = self.__instances[host].getSnapshots(guids[host], image_timestamp, self.per_host_workers, timeout)
+                for result in snapshots:
+                    if stopped.is_set():
+                        break
+                    yielded.add(result.guid)
+                    results.put(FleetSnapshot(host, result.guid, result.image, result.error))
+            except Exception as e:
+                for guid in guids[host]:
+                    if guid not in yielded:
+                        results.put(FleetSnapshot(host, guid, None, e))
+            finally:
+                if snapshots is not None:
+                    snapshots.close()
+                results.put(done)
+        executor = ThreadPoolExecutor(max_workers = min(self.max_workers, len(guids)))
+        futures = []
+        try:
+            for host in guids:
+                futures.append(executor.submit(fetch, host))
+            remaining = len(guids)
+            while remaining > 0:
+                result = results.get()
+                if result is done:
+                    remaining -= 1
+                else:
+                    yield result
+        finally:
+            # Where the caller stopped early, hosts not yet started are skipped and the rest stop at their next image
+            stopped.set()
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait = False)
+
+    def getLogs(self, query: LogQuery, start_index: int = 0, max_results: int = 500) -> Dict[str, FleetResult]:
+        """Search the logs of every connected host concurrently, with a page of results per host"""
+        return self.run(lambda instance: query.getLogs(instance, start_index, max_results))
+
+    def __iter__(self) -> Iterator[Instance]:
+        return iter(list(self.__instances.values()))
+
+    def __len__(self) -> int:
+        return len(self.__instances)
@@ -0,0 +1,278 @@
+"""
+HLS live stream consumer.
+
+Opening a Stream with QVRStreamingProtocol.HLS returns the URL of a live playlist. An HLSConsumer
+follows that playlist and fetches each new segment concurrently over the transport's pooled
+connections. It delivers the segments in order. At most queue_size segments are fetched ahead of
+the reader, so a slow reader holds back prefetching instead of growing memory. Segments can be
+iterated or recorded to a file. The consumer reports its lag behind the live edge and its
+throughput.
+"""
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from queue import Queue
+from typing import Iterator, List, NamedTuple, Tuple
+from urllib.parse import urljoin
+
+from .qvrapi import QVRError
+from .transport import Transport
+
+class HLSSegment(NamedTuple):
+    """A media segment of a live HLS stream"""
+    sequence: int
+    url: str
+    duration: float
+    data: bytes
+
+class HLSStats(NamedTuple):
+    """The progress of an HLSConsumer
+
+    lag is the duration of the media listed in the latest playlist that has not yet been delivered.
+    skipped counts segments that left the playlist before they could be fetched. errors counts
+    failed playlist and segment fetches.
+    """
+    segments: int
+    bytes_received: int
+    skipped: int
+    errors: int
+    lag: float
+    bytes_per_second: float
+    elapsed: float
+
+class _Playlist(NamedTuple):
+    target_duration: float
+    segments: List[Tuple[int, str, float]]
+    variants: List[str]
+    ended: bool
+
+def _parsePlaylist(text: str, url: str) -> _Playlist:
+    """Parse an HLS playlist, resolving segment and variant URIs against the playlist URL"""
+    sequence = 0
+    target_duration = None
+    duration = None
+    segments = []
+    variants = []
+    ended = False
+    variant = False
+    for line in text.splitlines():
+        line = line.strip()
+        if len(line) == 0:
+            continue
+        if line.startswith('#EXT-X-MEDIA-SEQUENCE:'):
+            sequence = int(line.split(':', 1)[1])
+        elif line.startswith('#EXT-X-TARGETDURATION:'):
+            target_duration = float(line.split(':', 1)[1])
+        elif line.startswith('#EXTINF:'):
+            duration = float(line.split(':', 1)[1].split(',', 1)[0])
+        elif line.startswith('#EXT-X-STREAM-INF'):
+            variant = True
+        elif line.startswith('#EXT-X-ENDLIST'):
+            ended = True
+        elif not line.startswith('#'):
+            if variant:
+                variants.append(urljoin(url, line))
+                variant = False
+            else:
+                segments.append((sequence + len(segments), urljoin(url, line), duration or 0.0))
+                duration = None
+    return _Playlist(target_duration, segments, variants, ended)
+
+_END = object()
+
+class HLSConsumer:
+    """Follows a live HLS playlist, prefetching its segments concurrently and delivering them in order
+
+    The consumer starts when it is first iterated or recorded, or when start is called. It ends when
+    the playlist ends, when it is stopped, or when fetching the playlist fails more than retries
+    times in a row. In the last case, iteration raises the error once the segments already fetched
+    are delivered. Segments that fail to download are counted and skipped. The consumer is stopped
+    when iteration ends, including when the reader stops iterating early.
+    """
+
+    def __init__(self, transport: Transport, url: str, max_workers: int = 4, queue_size: int = 8, poll_interval: float = None, retries: int = 3, lease = None):
+        """Initialise the consumer
+
+        At most max_workers segments are fetched at once, which should not exceed the transport's pool
+        size. At most queue_size segments are held ahead of the reader. The playlist is reloaded every
+        poll_interval seconds, or every half target duration where poll_interval is None. A StreamLease
+        holding the stream open may be given, and it is released when the consumer stops.
+        """
+        self.transport: Transport = transport
+        self.url: str = url
+        self.max_workers: int = max_workers
+        self.queue_size: int = max(queue_size, max_workers)
+        self.poll_interval: float = poll_interval
+        self.retries: int = retries
+        self.error: Exception = None
+        self.last_error: Exception = None
+        self.__lease = lease
+        self.__pending: Queue = Queue()
+        self.__slots: threading.Semaphore = threading.Semaphore(self.queue_size)
+        self.__stopped: threading.Event = threading.Event()
+        self.__lock: threading.Lock = threading.Lock()
+        self.__executor: ThreadPoolExecutor = None
+        self.__thread: threading.Thread = None
+        self.__started: float = None
+        self.__segments: int = 0
+        self.__bytes_received: int = 0
+        self.__skipped: int = 0
+        self.__errors: int = 0
+        self.__delivered: int = None
+        self.__window: List[Tuple[int, float]] = []
+
+    def __get(self, url: str):
+        response = self.transport.request('GET', url)
+        if response.status_code != 200:
+            raise QVRError('HTTP Status Code {0}'.format(response.status_code), response.status_code)
+        return response
+
+    def __fetchSegment(self, url: str) -> bytes:
+        if self.__stopped.is_set():
+            raise CancelledError()
+        return self.__get(url).content
+
+    def __failed(self, error: Exception) -> None:
+        with self.__lock:
+            self.__errors += 1
+            self.last_error = error
+
+    def __follow(self) -> None:
+        """Reload the playlist until it ends or the consumer stops, queueing a fetch for every new segment"""
+        next_sequence = None
+        failures = 0
+        try:
+            while not self.__stopped.is_set():
+                try:
+                    playlist = _parsePlaylist(self.__get(self.url).text, self.url)
+                    failures = 0
+                except Exception as e:
+                    self.__failed(e)
+                    failures += 1
+                    if failures > self.retries:
+                        self.error = e
+                        return
+                    self.__stopped.wait(self.poll_interval or 1.0)
+                    continue
+                if len(playlist.variants) > 0:
+                    self.url = playlist.variants[0]
+                    continue
+                with self.__lock:
+                    self.__window = [(sequence, duration) for sequence, _, duration in playlist.segments]
+                stalled = False
+                for sequence, url, duration in playlist.segments:
+                    if next_sequence is not None and sequence < next_sequence:
+                        continue
+                    if not self.__slots.acquire(blocking = False):
+                        # The reader is behind, so wait for it and reload the playlist, which is now stale
+                        while not self.__slots.acquire(timeout = 0.1):
+                            if self.__stopped.is_set():
+                                return
+                        self.__slots.release()
+                        stalled = True
+                        break
+                    if next_sequence is not None and sequence > next_sequence:
+                        with self.__lock:
+                            self.__skipped += sequence - next_sequence
+                    try:
+                        future = self.__executor.submit(self.__fetchSegment, url)
+                    except RuntimeError:
+                        self.__slots.release()
+                        return
+                    self.__pending.put(((sequence, url, duration), future))
+                    next_sequence = sequence + 1
+                if stalled:
+                    continue
+                if playlist.ended:
+                    return
+                self.__stopped.wait(self.poll_interval or (playlist.target_duration or 2.0) / 2)
+        finally:
+            self.__pending.put(_END)
+
+    def start(self) -> None:
+        """Start following the playlist on a background thread"""
+        with self.__lock:
+            if self.__thread is not None:
+                return
+            self.__started = time.monotonic()
+            self.__executor = ThreadPoolExecutor(max_workers = self.max_workers)
+            self.__thread = threading.Thread(target = self.__follow, name = 'qvrpy-hls', daemon = True)
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """Stop following the playlist, cancelling the segment fetches not yet started, and release the lease"""
+        self.__stopped.set()
+        if self.__executor is not None:
+            self.__executor.shutdown(wait = False)
+        if self.__lease is not None:
+            self.__lease.release()
+
+    def __iter__(self) -> Iterator[HLSSegment]:
+        self.start()
+        try:
+            while True:
+                item = self.__pending.get()
+                if item is _END:
+                    self.__pending.put(_END)
+                    if self.error is not None:
+                        raise self.error
+                    return
+                (sequence, url, duration), future = item
+                try:
+                    data = future.result()
+                except CancelledError:
+                    continue
+                except Exception as e:
+                    self.__failed(e)
+                    continue
+                finally:
+                    self.__slots.release()
+                if self.__stopped.is_set():
+                    return
+                with self.__lock:
+                    self.__segments += 1
+                    self.__bytes_received += len(data)
+                    self.__delivered = sequence
+                yield HLSSegment(sequence, url, duration, data)
+        finally:
+            self.stop()
+
+    def record(self, destination, max_segments: int = None, max_duration: float = None) -> int:
+        """Append the stream's segments to a file path or file-like object, returning the bytes written
+
+        Recording continues until max_segments segments or max_duration seconds of media have been
+        written, where given, and otherwise until the consumer ends. The consumer is stopped when
+        recording ends.
+        """
+        f = open(destination, 'ab') if isinstance(destination, str) else destination
+        written = 0
+        segments = 0
+        duration = 0.0
+        try:
+            for segment in self:
+                f.write(segment.data)
+                written += len(segment.data)
+                segments += 1
+                duration += segment.duration
+                if (max_segments is not None and segments >= max_segments) or (max_duration is not None and duration >= max_duration):
+                    break
+        finally:
+            self.stop()
+            if f is not destination:
+                f.close()
+        return written
+
+    def stats(self) -> HLSStats:
+        """Return the consumer's progress so far"""
+        with self.__lock:
+            elapsed = time.monotonic() - self.__started if self.__started is not None else 0.0
+            delivered = self.__delivered if self.__delivered is not None else -1
+            lag = sum(duration for sequence, duration in self.__window if sequence > delivered)
+            return HLSStats(self.__segments, self.__bytes_received, self.__skipped, self.__errors, lag, self.__bytes_received / elapsed if elapsed > 0 else 0.0, elapsed)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
@@ -1,8 +1,18 @@
-from datetime import datetime
-from typing import Dict, List
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterator, List, NamedTuple
 
+from .archive import LogArchive
+from .cache import SnapshotCache
 from .camera import Camera
-from .enums import QVRLogLevel, QVRLogType, QVRSortDirection
+from .catalog import CameraCatalog, CatalogCache
+from .enums import QVRLogLevel, QVRLogType, QVRRecordingStatus, QVRSortDirection, QVRStreamingProtocol
+from .export import ExportManifest, RecordingSpec, exportRecordings
+from .inventory import InventoryCache
+from .logs import LogCheckpoint, LogIterator, LogQuery, LogRecord, LogTailer
+from .onboarding import OnboardingRun
 from .qvrapi import (
     authLogin as api_authLogin,
     authLogout as api_authLogout,
@@ -15,84 +25,513 @@ from .qvrapi import (
     eventCapability as api_eventCapability,
     cameraSupport as api_cameraSupport,
     cameraSnapshot as api_cameraSnapshot,
+    cameraRecordingStart as api_cameraRecordingStart,
+    cameraRecordingStop as api_cameraRecordingStop,
+    cameraAlarmStart as api_cameraAlarmStart,
+    cameraAlarmStop as api_cameraAlarmStop,
     logs as api_logs,
     channelList as api_channelList,
+    QVRError,
     )
+from .sessions import StreamLease, StreamSessionPool
+from .transport import Transport
+from .watcher import CameraStatusEvent, StatusWatcher, _typedValue
+
+def _formatLogLevels(level: List[QVRLogLevel]) -> str:
+    levels = []
+    for l in level or []:
+        levels.append(l.value)
+    return str(levels)
+
+def _formatSortDirection(sort_direction: QVRSortDirection) -> str:
+    return sort_direction.value if sort_direction is not None else None
+
+class SnapshotResult(NamedTuple):
+    """The image, or the error raised fetching it, for one camera of Instance.getSnapshots"""
+    guid: str
+    image: bytes
+    error: Exception
+
+class StatusChanges(NamedTuple):
+    """The differences applied to an Instance's cameras by Instance.refreshStatus"""
+    added: List[Camera]
+    removed: List[Camera]
+    changed: Dict[str, Dict[str, tuple]]
+
+_STREAM_FIELDS: List[str] = ['video_codec', 'video_resolution_width', 'video_resolution_height']
+
+class ControlResult(NamedTuple):
+    """The outcome of a recording or alarm command for one camera of a batch
+
+    Where verification was requested, rec_state is the camera's recording state listed afterwards and
+    verified whether it matches the command; both are None otherwise, and where the camera list could
+    not be fetched to verify, in which case error is the error fetching it unless the command failed.
+    """
+    guid: str
+    error: Exception = None
+    rec_state: QVRRecordingStatus = None
+    verified: bool = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None and self.verified is not False
 
 class Instance:
     """Represents an instance of QVR Pro - effectively this is the core client"""
 
-    def __init__(self, username: str, password: str, host: str, port: int, ssl: bool = False):
-        """Initialise QVR Instance"""
+    def __init__(self, username: str, password: str, host: str, port: int, ssl: bool = False, transport: Transport = None, max_workers: int = 8, snapshot_cache: SnapshotCache = None, log_archive: LogArchive = None, inventory_cache: InventoryCache = None, catalog_cache: CatalogCache = None):
+        """Initialise QVR Instance
+
+        Every API call made by the instance, its Cameras and their Streams goes through transport, which
+        defaults to a new pooled keep-alive Transport. max_workers bounds the number of concurrent requests
+        the instance makes when loading camera data, and should not exceed the transport's pool size.
+        Snapshots are cached in snapshot_cache, and logs archived in log_archive, where they are given.
+        Where inventory_cache is given, camera data is saved to it and restored from it on connect. The
+        supported camera catalog is kept in catalog_cache, which defaults to a new in-memory CatalogCache.
+        """
         self.__username: str = username
         self.__password: str = password
         self.__cameras: Dict[str, Camera] = {}
         self.url = ('https://{0}:{1}' if ssl else 'http://{0}:{1}').format(host, str(port))
         self.sid = None
+        self.__session_lock: threading.Lock = threading.Lock()
+        self.transport: Transport = transport or Transport()
+        self.max_workers: int = max_workers
+        self.__camera_capability: dict = None
+        self.__event_capability: dict = None
+        self.__capability_lock: threading.Lock = threading.Lock()
+        self.snapshot_cache: SnapshotCache = snapshot_cache
+        self.log_archive: LogArchive = log_archive
+        self.__watcher: StatusWatcher = None
+        self.__log_tailer: LogTailer = None
+        self.__stream_pool: StreamSessionPool = None
+        self.inventory_cache: InventoryCache = inventory_cache
+        self.inventory_validation: Future = None
+        self.catalog_cache: CatalogCache = catalog_cache or CatalogCache()
+        self.__catalog_lock: threading.Lock = threading.Lock()
+
+    def _call(self, api_function, *args, **kwargs):
+        """Call a qvrapi function for this instance, over this instance's transport
+
+        Where the session has expired the instance logs in again and the call is retried once, without
+        reloading camera data.
+        """
+        sid = self.sid
+        try:
+            return api_function(self.url, sid, *args, transport = self.transport, **kwargs)
+        except QVRError as e:
+            if sid is None or not e.auth_failure:
+                raise
+        self._reauthenticate(sid)
+        return api_function(self.url, self.sid, *args, transport = self.transport, **kwargs)
+
+    def __login(self) -> None:
+        self.sid = api_authLogin(self.url, self.__username, self.__password, transport = self.transport)['authSid']
+
+    def _reauthenticate(self, expired_sid: str) -> None:
+        """Log in again, unless another thread has already replaced the expired session"""
+        with self.__session_lock:
+            if self.sid == expired_sid:
+                self.__login()
+
+    @property
+    def camera_capability(self) -> dict:
+        """The camera capabilities of the instance, fetched on first use"""
+        if self.__camera_capability is None:
+            with self.__capability_lock:
+                if self.__camera_capability is None:
+                    self.__camera_capability = self._call(api_cameraCapability)
+        return self.__camera_capability
+
+    @camera_capability.setter
+    def camera_capability(self, value: dict) -> None:
+        self.__camera_capability = value
+
+    @property
+    def event_capability(self) -> dict:
+        """The event capabilities of the instance, fetched on first use"""
+        if self.__event_capability is None:
+            with self.__capability_lock:
+                if self.__event_capability is None:
+                    self.__event_capability = self._call(api_eventCapability)
+        return self.__event_capability
+
+    @event_capability.setter
+    def event_capability(self, value: dict) -> None:
+        self.__event_capability = value
 
     def __loadCameras(self):
-        """Load Camera Data from Instance"""
-        self.__cameras = {}
-        data = api_cameraList(self.url, self.sid)['datas']
-        for camera_values in data:
+        """Load Camera Data from Instance, leaving stream lists to be fetched on first use"""
+        cameras = {}
+        for camera_values in self._call(api_cameraList)['datas']:
+            cameras[camera_values['guid']] = Camera(self, camera_values, None, self.__username, self.__password)
+        self.__cameras = cameras
+
+    def prefetchStreams(self, guids: List[str] = None) -> Dict[str, Exception]:
+        """Fetch the stream lists of many cameras concurrently, rather than one by one on first use
+
+        guids defaults to every camera. Cameras whose streams are already loaded are skipped, and the
+        inventory cache, where there is one, is saved with the streams fetched. Returns the errors raised
+        fetching stream lists, by GUID.
+        """
+        cameras = [self.__cameras[guid] for guid in guids] if guids is not None else list(self.__cameras.values())
+        cameras = [camera for camera in cameras if not camera.streams_loaded]
+        errors = {}
+        if len(cameras) == 0:
+            return errors
+        with ThreadPoolExecutor(max_workers = min(self.max_workers, len(cameras))) as executor:
+            futures = {camera.guid: executor.submit(lambda camera: camera.streams, camera) for camera in cameras}
+            for guid, future in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    errors[guid] = e
+        if self.inventory_cache is not None:
+            self.__saveInventory()
+        return errors
+
+    def __loadInventory(self, inventory: dict) -> None:
+        """Load Camera Data from a cached inventory"""
+        cameras = {}
+        for camera_values in inventory['cameras']:
             guid = camera_values['guid']
-            stream_values = api_streamList(self.url, self.sid, guid)['streams']
-            self.__cameras[guid] = Camera(self, camera_values, stream_values, self.__username, self.__password)
-        data = api_cameraCapability(self.url, self.sid)
-        data = api_eventCapability(self.url, self.sid)
+            cameras[guid] = Camera(self, camera_values, inventory['streams'].get(guid), self.__username, self.__password)
+        self.__cameras = cameras
+        self.__camera_capability = inventory['camera_capability']
+        self.__event_capability = inventory['event_capability']
+
+    def __saveInventory(self) -> None:
+        self.inventory_cache.save(self.url, list(self.__cameras.values()), self.__camera_capability, self.__event_capability)
+
+    def __validateInventoryInBackground(self) -> None:
+        future = Future()
+        future.set_running_or_notify_cancel()
+        def validate():
+            try:
+                future.set_result(self.validateInventory())
+            except Exception as e:
+                future.set_exception(e)
+        self.inventory_validation = future
+        threading.Thread(target = validate, name = 'qvrpy-inventory-validation', daemon = True).start()
 
     def connect(self) -> None:
-        """Establish a connection to the instance and load camera data"""
-        self.sid = api_authLogin(self.url, self.__username, self.__password)['authSid']
+        """Establish a connection to the instance and load camera data
+
+        Where the instance has an inventory cache holding its camera data, the cached data is loaded and
+        validated against QVR Pro in the background, with inventory_validation holding the outcome.
+        """
+        with self.__session_lock:
+            self.__login()
+        if self.inventory_cache is not None:
+            inventory = self.inventory_cache.load(self.url)
+            if inventory is not None:
+                self.__loadInventory(inventory)
+                self.__validateInventoryInBackground()
+                return
         self.__loadCameras()
+        if self.inventory_cache is not None:
+            self.__saveInventory()
+
+    def validateInventory(self) -> StatusChanges:
+        """Bring camera data loaded from the inventory cache up to date with a single camera list request
+
+        Stream lists already loaded are refetched only for cameras whose codec or resolution has changed,
+        and the updated inventory is saved. Returns the changes made, as refreshStatus does.
+        """
+        changes = self.refreshStatus()
+        stale = [guid for guid, fields in changes.changed.items() if self.__cameras[guid].streams_loaded and any(field in fields for field in _STREAM_FIELDS)]
+        if len(stale) > 0:
+            with ThreadPoolExecutor(max_workers = self.max_workers) as executor:
+                stream_lists = {guid: executor.submit(self._call, api_streamList, guid) for guid in stale}
+                for guid, stream_list in stream_lists.items():
+                    self.__cameras[guid]._setStreams(stream_list.result()['streams'])
+        if self.inventory_cache is not None:
+            self.__saveInventory()
+        return changes
 
     def disconnect(self) -> None:
         """Disconnect from the instance and remove camera data"""
-        api_authLogout(self.url, self.sid)
+        if self.__watcher is not None:
+            self.__watcher.stop()
+        if self.__stream_pool is not None:
+            self.__stream_pool.closeAll()
+            self.__stream_pool = None
+        api_authLogout(self.url, self.sid, transport = self.transport)
         self.sid = None
         self.__cameras = None
 
-    def doCameraSearch(self) -> List[Camera]:
-        """Have the instance search the network for new cameras"""
-        data = api_cameraSearch(self.url, self.sid)['data']
+    def doCameraSearch(self, username: str = None, password: str = None) -> List[Camera]:
+        """Have the instance search the network for new cameras
+
+        The Cameras found have no streams, and are given username and password as their credentials
+        where these are provided.
+        """
+        data = self._call(api_cameraSearch)['data']
         cameras: List[Camera] = []
         for val in data:
-            cameras.append(Camera(self, val))
+            cameras.append(Camera(self, val, [], username, password))
         return cameras
 
+    def testCamera(self, camera: Camera, channel_id: int = None, timeout: float = None) -> dict:
+        """Have the instance test its connection to a camera found by doCameraSearch, raising a QVRError where it fails
+
+        Where the camera has no umsid, it is resolved from the camera's brand and model with the
+        instance's camera catalog, raising a ValueError where the model is not supported. The test is
+        sent once, so a timeout ends it rather than starting the camera's probe again.
+        """
+        umsid = camera.umsid or self.getCameraCatalog().umsid(camera.brand or '', camera.model or '')
+        if umsid is None:
+            raise ValueError('Unsupported camera model: {0} {1}'.format(camera.brand, camera.model))
+        username, password = camera._credentials()
+        return self._call(api_cameraTest, umsid, camera.ip, camera.port, username, password, camera.rtsp_port, camera.http_video_url, channel_id, timeout = timeout)
+
+    def onboardCameras(self, username: str = None, password: str = None, max_workers: int = 4, timeout: float = None) -> OnboardingRun:
+        """Search the network for new cameras, returning an OnboardingRun testing each one found concurrently
+
+        username and password are the credentials the cameras are tested with. At most max_workers
+        cameras are tested at once, each for at most timeout seconds where it is given.
+        """
+        return OnboardingRun(self, self.doCameraSearch(username, password), max_workers, timeout)
+
     def getCameras(self) -> List[Camera]:
         """Get a list of Cameras connected to the instance"""
         if len(self.__cameras) == 0:
             self.__loadCameras()
         return self.__cameras.values()
 
+    def refreshStatus(self) -> StatusChanges:
+        """Refresh the status of the instance's cameras with a single camera list request
+
+        Existing Camera objects are updated in place, Cameras are created for new GUIDs, and Cameras no
+        longer listed are removed. Returns the changes made, with changed attributes given per GUID as
+        (old, new) pairs. Raises a QVRError once the instance has been disconnected.
+        """
+        if self.__cameras is None:
+            raise QVRError('Not connected: the instance has been disconnected')
+        data = self._call(api_cameraList)['datas']
+        cameras = self.__cameras
+        if cameras is None:
+            # The instance was disconnected while the camera list was being requested
+            raise QVRError('Not connected: the instance has been disconnected')
+        cameras = dict(cameras)
+        listed = set()
+        new_values = []
+        changed = {}
+        for camera_values in data:
+            guid = camera_values['guid']
+            listed.add(guid)
+            if guid in cameras:
+                changes = cameras[guid]._update(camera_values)
+                if len(changes) > 0:
+                    changed[guid] = changes
+            else:
+                new_values.append(camera_values)
+        added = []
+        for camera_values in new_values:
+            camera = Camera(self, camera_values, None, self.__username, self.__password)
+            cameras[camera.guid] = camera
+            added.append(camera)
+        removed = [cameras.pop(guid) for guid in list(cameras) if guid not in listed]
+        self.__cameras = cameras
+        return StatusChanges(added, removed, changed)
+
+    def getWatcher(self, interval: float = 10.0, max_interval: float = 300.0) -> StatusWatcher:
+        """Get the instance's StatusWatcher, creating it with the given polling intervals if needed"""
+        if self.__watcher is None:
+            self.__watcher = StatusWatcher(self, interval, max_interval)
+        return self.__watcher
+
+    def watch(self, callback: Callable[[CameraStatusEvent], None], on_error: Callable[[Exception], None] = None) -> StatusWatcher:
+        """Subscribe to camera status changes, starting the instance's shared StatusWatcher"""
+        watcher = self.getWatcher()
+        watcher.subscribe(callback, on_error)
+        watcher.start()
+        return watcher
+
     def getCamera(self, guid: str) -> Camera:
         """Get a single Camera by GUID"""
         return self.__cameras[guid]
 
+    def getStreamPool(self, idle_timeout: float = 30.0) -> StreamSessionPool:
+        """Get the instance's StreamSessionPool, creating it with the given idle timeout if needed"""
+        if self.__stream_pool is None:
+            self.__stream_pool = StreamSessionPool(self, idle_timeout)
+        return self.__stream_pool
+
+    def openStream(self, guid: str, stream: int = 0, protocol: QVRStreamingProtocol = QVRStreamingProtocol.RTSP) -> StreamLease:
+        """Return a lease on a camera's stream, sharing an already open session where there is one
+
+        Release the lease (or use it in a with block) when done; the session is closed once no lease on it
+        has been held for the stream pool's idle timeout, and in any case on disconnect.
+        """
+        return self.getStreamPool().acquire(self.getCamera(guid).getStream(stream), protocol)
+
+    def getSnapShot(self, guid: str, image_timestamp: datetime, timeout: float = None) -> bytes:
+        """Return an image for the camera with the given GUID at the given timestamp, using the snapshot cache where enabled
+
+        Where timeout is given, it applies to each socket operation and the request is not retried once sent.
+        """
+        if self.snapshot_cache is None:
+            return self._call(api_cameraSnapshot, guid, image_timestamp, timeout = timeout)
+        return self.snapshot_cache.get(guid, image_timestamp, lambda: self._call(api_cameraSnapshot, guid, image_timestamp, timeout = timeout))
+
+    def getSnapshots(self, guids: List[str], image_timestamp: datetime, max_workers: int = None, timeout: float = None) -> Iterator[SnapshotResult]:
+        """Fetch images for many cameras concurrently, yielding a SnapshotResult for each as soon as it completes
+
+        At most max_workers requests (defaulting to the instance's max_workers) are made at once. Where
+        timeout is given, a camera whose image has not been received within timeout seconds in total of
+        its request starting yields a result carrying a TimeoutError. A failing camera yields a result
+        carrying its error rather than ending the iteration. Where guids is None, every loaded camera is
+        included.
+        """
+        if guids is None:
+            guids = [camera.guid for camera in self.getCameras()]
+        started: Dict[int, float] = {}
+        def fetch(index: int, guid: str) -> bytes:
+            started[index] = time.monotonic()
+            return self.getSnapShot(guid, image_timestamp, timeout)
+        executor = ThreadPoolExecutor(max_workers = max_workers or self.max_workers)
+        futures = {executor.submit(fetch, index, guid): (index, guid) for index, guid in enumerate(guids)}
+        pending = set(futures)
+        try:
+            while len(pending) > 0:
+                wait_time = None
+                if timeout is not None:
+                    deadlines = [started[futures[future][0]] + timeout for future in pending if futures[future][0] in started]
+                    wait_time = max(0.0, min(deadlines) - time.monotonic()) if len(deadlines) > 0 else timeout
+                done, pending = wait(pending, wait_time, FIRST_COMPLETED)
+                for future in done:
+                    guid = futures[future][1]
+                    try:
+                        yield SnapshotResult(guid, future.result(), None)
+                    except Exception as e:
+                        yield SnapshotResult(guid, None, e)
+                if timeout is not None:
+                    now = time.monotonic()
+                    for future in [future for future in pending if now - started.get(futures[future][0], now) >= timeout]:
+                        pending.discard(future)
+                        yield SnapshotResult(futures[future][1], None, TimeoutError('No image received within {0} seconds'.format(timeout)))
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait = False)
+
+    def exportRecordings(self, specs: List[RecordingSpec], directory: str, max_workers: int = None, max_bytes_per_second: int = None, retries: int = 3) -> ExportManifest:
+        """Download many recordings concurrently into directory
+
+        At most max_workers recordings (defaulting to the instance's max_workers) are downloaded at once,
+        with their combined rate capped at max_bytes_per_second where given. Each recording is written to
+        disk as it is received, and failures are reported in the returned manifest rather than raised.
+        """
+        return exportRecordings(self, specs, directory, max_workers or self.max_workers, max_bytes_per_second, retries = retries)
+
+    def __control(self, api_function, guids: List[str], max_workers: int, expected_state: QVRRecordingStatus = None) -> Dict[str, ControlResult]:
+        """Call a camera control function for many cameras concurrently, verifying rec_state where expected_state is given"""
+        if guids is None:
+            guids = [camera.guid for camera in self.getCameras()]
+        errors = {}
+        with ThreadPoolExecutor(max_workers = max_workers or self.max_workers) as executor:
+            futures = {guid: executor.submit(self._call, api_function, guid) for guid in guids}
+            for guid, future in futures.items():
+                try:
+                    future.result()
+                    errors[guid] = None
+                except Exception as e:
+                    errors[guid] = e
+        if expected_state is None:
+            return {guid: ControlResult(guid, error) for guid, error in errors.items()}
+        try:
+            self.refreshStatus()
+        except Exception as e:
+            return {guid: ControlResult(guid, error or e) for guid, error in errors.items()}
+        results = {}
+        for guid, error in errors.items():
+            camera = self.__cameras.get(guid)
+            rec_state = _typedValue('rec_state', camera.rec_state) if camera is not None else None
+            results[guid] = ControlResult(guid, error, rec_state, rec_state == expected_state)
+        return results
+
+    def startRecording(self, guids: List[str] = None, verify: bool = False, max_workers: int = None) -> Dict[str, ControlResult]:
+        """Start recording for many cameras (all cameras where guids is None) concurrently
+
+        At most max_workers requests (defaulting to the instance's max_workers) are made at once. Failures
+        are reported in the ControlResult for each GUID rather than raised. Where verify is set, the camera
+        list is fetched once afterwards to confirm each camera's rec_state; an error fetching it is reported
+        in every ControlResult too.
+        """
+        return self.__control(api_cameraRecordingStart, guids, max_workers, QVRRecordingStatus.RECORDING if verify else None)
+
+    def stopRecording(self, guids: List[str] = None, verify: bool = False, max_workers: int = None) -> Dict[str, ControlResult]:
+        """Stop recording for many cameras concurrently, as startRecording does"""
+        return self.__control(api_cameraRecordingStop, guids, max_workers, QVRRecordingStatus.NOT_RECORDING if verify else None)
+
+    def startAlarm(self, guids: List[str] = None, max_workers: int = None) -> Dict[str, ControlResult]:
+        """Start the alarm for many cameras (all cameras where guids is None) concurrently, with a ControlResult per GUID"""
+        return self.__control(api_cameraAlarmStart, guids, max_workers)
+
+    def stopAlarm(self, guids: List[str] = None, max_workers: int = None) -> Dict[str, ControlResult]:
+        """Stop the alarm for many cameras concurrently, with a ControlResult per GUID"""
+        return self.__control(api_cameraAlarmStop, guids, max_workers)
+
+    def getCameraCatalog(self, refresh: bool = False) -> CameraCatalog:
+        """Get the indexed catalog of camera models supported by this instance
+
+        The catalog is downloaded only where the catalog cache holds none that is still current, or where
+        refresh is set, and concurrent callers share a single download.
+        """
+        catalog = None if refresh else self.catalog_cache.get(self.url)
+        if catalog is None:
+            with self.__catalog_lock:
+                catalog = None if refresh else self.catalog_cache.get(self.url)
+                if catalog is None:
+                    catalog = CameraCatalog(self._call(api_cameraSupport)['brands'])
+                    self.catalog_cache.put(self.url, catalog)
+        return catalog
+
     def getSupportedCameras(self) -> dict:
-        """Get a dictionary of Brands and supported camera models for this instance"""
-        brands = api_cameraSupport(self.url, self.sid)['brands']
-        for brand in brands:
-            brand['brand'] = brand['text']
-            models = brand['models']
-            del brand['models']
-            del brand['text']
-            del brand['value']
-            for model in models:
-                model['model'] = model['text']
-                model['umsid'] = model['value']
-                del model['text']
-                del model['value']
-            brand['models'] = models
-        return brands
+        """Get a dictionary of Brands and supported camera models for this instance, from its camera catalog"""
+        return self.getCameraCatalog().toList()
 
     def getLogs(self, log_type: QVRLogType, level: List[QVRLogLevel], user: str, source_ip: str, source_name: str, channel_id: List[int], global_channel_id: List[int], start_time: datetime, end_time: datetime, start_index: int, max_results: int, sort_field: str, sort_direction: QVRSortDirection) -> dict:
-        """Return logs matching the specified criteria"""
-        levels = []
-        for l in level:
-            levels.append(l.value)
-        return api_logs(self.url, self.sid, log_type.value, str(levels), user, source_ip, source_name, str(channel_id), str(global_channel_id), start_time, end_time, start_index, max_results, sort_field, sort_direction)
+        """Return logs matching the specified criteria
+
+        Where the instance has a log archive, searches over a time range sorted by time are answered from
+        the archive, with only the part of the range not yet archived fetched from QVR Pro.
+        """
+        query = LogQuery(log_type, level, user, source_ip, source_name, channel_id, global_channel_id, start_time, end_time, sort_field, sort_direction)
+        if self.log_archive is not None and start_time is not None and end_time is not None and sort_field is None:
+            return self.log_archive.getLogs(self, query, start_index, max_results)
+        return self._fetchLogs(query, start_index, max_results)
+
+    def _fetchLogs(self, query: LogQuery, start_index: int, max_results: int) -> dict:
+        """Return logs matching the query from QVR Pro"""
+        return self._call(api_logs, query.log_type.value, _formatLogLevels(query.level), query.user, query.source_ip, query.source_name, str(query.channel_id or []), str(query.global_channel_id or []), query.start_time, query.end_time, start_index, max_results, query.sort_field, _formatSortDirection(query.sort_direction))
+
+    def iterLogs(self, log_type: QVRLogType, level: List[QVRLogLevel] = None, user: str = None, source_ip: str = None, source_name: str = None, channel_id: List[int] = None, global_channel_id: List[int] = None, start_time: datetime = None, end_time: datetime = None, sort_field: str = None, sort_direction: QVRSortDirection = None, page_size: int = 500, checkpoint: LogCheckpoint = None) -> LogIterator:
+        """Iterate over every log matching the specified criteria, paging through getLogs automatically
+
+        Records are yielded one at a time with the next page prefetched in the background. The returned
+        LogIterator's checkpoint can be passed to a later call to resume from where iteration stopped.
+        Naive start_time and end_time values are taken as UTC.
+        """
+        query = LogQuery(log_type, level, user, source_ip, source_name, channel_id, global_channel_id, start_time, end_time, sort_field, sort_direction)
+        return LogIterator(self, query, page_size, checkpoint)
+
+    def getLogTailer(self, shard_duration: timedelta = timedelta(hours = 1), max_shards: int = 8, page_size: int = 500) -> LogTailer:
+        """Get the instance's LogTailer, creating it with the given sharding options if needed"""
+        if self.__log_tailer is None:
+            self.__log_tailer = LogTailer(self, shard_duration, max_shards, page_size)
+        return self.__log_tailer
+
+    def tailLogs(self, log_type: QVRLogType, level: List[QVRLogLevel] = None, user: str = None, source_ip: str = None, source_name: str = None, channel_id: List[int] = None, global_channel_id: List[int] = None, start_time: datetime = None, end_time: datetime = None, sort_direction: QVRSortDirection = QVRSortDirection.ASCENDING) -> List[LogRecord]:
+        """Return the logs of the given type that have not been returned by a previous call
+
+        The first call for a log type fetches from start_time, and later calls from the newest log already
+        returned. Large ranges are split into time shards fetched concurrently, and the logs are returned
+        in time order per sort_direction without duplicates.
+        """
+        query = LogQuery(log_type, level, user, source_ip, source_name, channel_id, global_channel_id, start_time, end_time, None, sort_direction)
+        return self.getLogTailer().tail(query)
 
     def getChannelList(self) -> dict:
-        return api_channelList(self.url, self.sid)
\ No newline at end of file
+        return self._call(api_channelList)
\ No newline at end of file
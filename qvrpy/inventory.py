@@ -0,0 +1,75 @@
+"""
+On-disk camera inventory cache.
+
+An InventoryCache keeps each QVR Pro instance's camera list, the stream lists loaded so far and its
+capabilities in a JSON file named after the instance URL, so that Instance.connect can restore the
+inventory after login without refetching it, and validate it afterwards with a single camera list request.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import List
+
+from .camera import Camera
+
+_FORMAT_VERSION: int = 1
+
+def _writeJSON(path: str, document) -> None:
+    """Write a document as JSON to path, replacing any existing file atomically"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok = True)
+    descriptor, temp_path = tempfile.mkstemp(dir = directory, prefix = '.qvrpy-', suffix = '.tmp')
+    try:
+        with os.fdopen(descriptor, 'w', encoding = 'utf-8') as f:
+            json.dump(document, f)
+        os.replace(temp_path, path)
+    except Exception:
+        os.remove(temp_path)
+        raise
+
+class InventoryCache:
+    """A directory of cached camera inventories, one file per QVR Pro instance URL"""
+
+    def __init__(self, directory: str, max_age: float = None):
+        """Initialise the cache, ignoring inventories saved more than max_age seconds ago where given"""
+        self.directory: str = directory
+        self.max_age: float = max_age
+
+    def path(self, url: str) -> str:
+        """Return the path of the file holding the inventory of the instance at url"""
+        return os.path.join(self.directory, 'qvrpy-{0}.json'.format(hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]))
+
+    def load(self, url: str) -> dict:
+        """Return the inventory saved for the instance at url, or None where there is no usable inventory"""
+        try:
+            with open(self.path(url), 'r', encoding = 'utf-8') as f:
+                inventory = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if type(inventory) != dict or inventory.get('version') != _FORMAT_VERSION or inventory.get('url') != url:
+            return None
+        if self.max_age is not None and time.time() - inventory.get('saved', 0) > self.max_age:
+            return None
+        return inventory
+
+    def save(self, url: str, cameras: List[Camera], camera_capability: dict, event_capability: dict) -> None:
+        """Save the inventory of the instance at url, replacing the file atomically"""
+        inventory = {
+            'version' : _FORMAT_VERSION,
+            'url' : url,
+            'saved' : time.time(),
+            'cameras' : [camera._values() for camera in cameras],
+            'streams' : {camera.guid: [stream._values() for stream in camera.streams] for camera in cameras if camera.streams_loaded},
+            'camera_capability' : camera_capability,
+            'event_capability' : event_capability
+            }
+        _writeJSON(self.path(url), inventory)
+
+    def clear(self, url: str) -> None:
+        """Remove the inventory saved for the instance at url"""
+        try:
+            os.remove(self.path(url))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,319 @@
+"""
+Log records, paginated log iteration and incremental log tailing.
+
+A LogIterator pages through Instance.getLogs automatically, fetching the next page in the background
+while the current one is consumed, and yields one LogRecord at a time so that memory use stays
+constant however many logs match. A LogTailer remembers how far each log type has been read and
+fetches only newer logs, splitting large time ranges into shards fetched concurrently and merged as
+their records arrive.
+"""
+import heapq
+import json
+import math
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, NamedTuple
+
+from .enums import QVRLogLevel, QVRLogType, QVRSortDirection
+
+_PAGE_ENTRY_KEYS: List[str] = ['items', 'logs', 'datas', 'data']
+_TIME_FORMATS: List[str] = ['%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M:%SZ', '%Y/%m/%d %H:%M:%S']
+_SHARD_DONE: object = object()
+
+def _checkValue(values: dict, key: str):
+    val = values.get(key)
+    if type(val) == str and (len(val) == 0 or val.isspace()):
+        return None
+    return val
+
+def _checkEnum(values: dict, key: str, enum):
+    val = _checkValue(values, key)
+    try:
+        return enum(int(val)) if val is not None else None
+    except ValueError:
+        return None
+
+def _checkTime(values: dict, *keys: str) -> datetime:
+    """Parse the first present time value, given either in epoch seconds or as a date and time string in UTC"""
+    for key in keys:
+        val = _checkValue(values, key)
+        if val is None:
+            continue
+        try:
+            return datetime.fromtimestamp(float(val), timezone.utc)
+        except ValueError:
+            pass
+        for time_format in _TIME_FORMATS:
+            try:
+                return datetime.strptime(str(val).strip(), time_format).replace(tzinfo = timezone.utc)
+            except ValueError:
+                pass
+    return None
+
+def _pageEntries(page: dict) -> List[dict]:
+    """Return the log entries of a page of results"""
+    for key in _PAGE_ENTRY_KEYS:
+        if type(page.get(key)) == list:
+            return page[key]
+    return []
+
+class LogQuery(NamedTuple):
+    """The criteria of a log search, as accepted by Instance.getLogs
+
+    A level, channel_id or global_channel_id of None matches every level or channel. Naive start and end
+    times are taken as UTC, as are log times given without a timezone.
+    """
+    log_type: QVRLogType
+    level: List[QVRLogLevel] = None
+    user: str = None
+    source_ip: str = None
+    source_name: str = None
+    channel_id: List[int] = None
+    global_channel_id: List[int] = None
+    start_time: datetime = None
+    end_time: datetime = None
+    sort_field: str = None
+    sort_direction: QVRSortDirection = None
+
+    def getLogs(self, instance, start_index: int, max_results: int) -> dict:
+        """Fetch a page of logs matching this query from the instance"""
+        return instance.getLogs(self.log_type, self.level, self.user, self.source_ip, self.source_name, self.channel_id, self.global_channel_id, self.start_time, self.end_time, start_index, max_results, self.sort_field, self.sort_direction)
+
+class LogCheckpoint(NamedTuple):
+    """The position reached by a LogIterator, from which a later iteration can resume
+
+    index is the number of logs yielded, and time and log_id identify the last of them.
+    """
+    index: int = 0
+    time: datetime = None
+    log_id: object = None
+
+class LogRecord:
+    """A single QVR Pro log entry"""
+
+    def __init__(self, values: dict):
+        self.values: dict = values
+        self.log_id = _checkValue(values, 'log_id')
+        if self.log_id is None:
+            self.log_id = _checkValue(values, 'id')
+        self.time: datetime = _checkTime(values, 'UTC_time_s', 'UTC_time', 'time')
+        self.level: QVRLogLevel = _checkEnum(values, 'level', QVRLogLevel)
+        self.log_type: QVRLogType = _checkEnum(values, 'log_type', QVRLogType)
+        self.user: str = _checkValue(values, 'user')
+        self.source_ip: str = _checkValue(values, 'source_ip')
+        self.source_name: str = _checkValue(values, 'source_name')
+        self.channel_id: int = _checkValue(values, 'channel_id')
+        self.global_channel_id: int = _checkValue(values, 'global_channel_id')
+        self.message: str = _checkValue(values, 'content') or _checkValue(values, 'message')
+
+    def __str__(self):
+        return self.values.__str__()
+
+class LogIterator:
+    """Iterates over every log matching a query, one LogRecord at a time
+
+    Pages of page_size logs are requested from start_index onwards (or from a checkpoint), with the next
+    page fetched in the background while the current one is consumed. checkpoint always holds the
+    position after the last record yielded.
+
+    Resuming from a checkpoint starts at its index. Where newer logs have since pushed the records
+    already yielded past that index, as when sorting newest first, the checkpoint's record is looked
+    for by log_id (and time) in the first page, and it and the records before it are skipped. Logs
+    without an id are resumed by index alone.
+    """
+
+    def __init__(self, instance, query: LogQuery, page_size: int = 500, checkpoint: LogCheckpoint = None, remote: bool = False):
+        """Initialise the iterator, which where remote is set always fetches from QVR Pro, bypassing any log archive"""
+        self._instance = instance
+        self.query: LogQuery = query
+        self.page_size: int = page_size
+        self.checkpoint: LogCheckpoint = checkpoint or LogCheckpoint()
+        self.remote: bool = remote
+        self.total: int = None
+
+    def __fetch(self, start_index: int) -> dict:
+        if self.remote:
+            return self._instance._fetchLogs(self.query, start_index, self.page_size)
+        return self.query.getLogs(self._instance, start_index, self.page_size)
+
+    def __resumePosition(self, entries: List[dict]) -> int:
+        """Return the position in the first page after the checkpoint's record, or 0 where it is not there"""
+        for position, values in enumerate(entries):
+            record = LogRecord(values)
+            if record.log_id == self.checkpoint.log_id and (self.checkpoint.time is None or record.time == self.checkpoint.time):
+                return position + 1
+        return 0
+
+    def __iter__(self) -> Iterator[LogRecord]:
+        index = self.checkpoint.index
+        resuming = index > 0 and self.checkpoint.log_id is not None
+        with ThreadPoolExecutor(max_workers = 1) as executor:
+            pending = executor.submit(self.__fetch, index)
+            while pending is not None:
+                page = pending.result()
+                entries = _pageEntries(page)
+                if 'total' in page:
+                    self.total = int(page['total'])
+                next_index = index + len(entries)
+                more = len(entries) >= self.page_size and (self.total is None or next_index < self.total)
+                pending = executor.submit(self.__fetch, next_index) if more else None
+                if resuming:
+                    skipped = self.__resumePosition(entries)
+                    entries = entries[skipped:]
+                    index += skipped
+                    resuming = False
+                try:
+                    for values in entries:
+                        record = LogRecord(values)
+                        index += 1
+                        self.checkpoint = LogCheckpoint(index, record.time, record.log_id)
+                        yield record
+                except GeneratorExit:
+                    if pending is not None:
+                        pending.cancel()
+                    raise
+
+
+def _recordKey(record: LogRecord):
+    """Return a key identifying a log record, used to suppress duplicates"""
+    if record.log_id is not None:
+        return record.log_id
+    return json.dumps(record.values, sort_keys = True, default = str)
+
+def _utc(value: datetime) -> datetime:
+    """Return a datetime as aware UTC, taking naive values as UTC as _checkTime does"""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo = timezone.utc)
+    return value.astimezone(timezone.utc)
+
+def _recordTime(record: LogRecord) -> float:
+    return record.time.timestamp() if record.time is not None else 0.0
+
+def _shardRange(start_time: datetime, end_time: datetime, shard_duration: timedelta, max_shards: int) -> List[tuple]:
+    """Split a time range into up to max_shards equal, contiguous shards of about shard_duration"""
+    count = max(1, min(max_shards, math.ceil((end_time - start_time) / shard_duration)))
+    step = (end_time - start_time) / count
+    bounds = [start_time + step * i for i in range(count)] + [end_time]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def _putRecord(records: queue.Queue, item, stopped: threading.Event) -> bool:
+    """Put an item on a shard's queue, waiting for space until stopped, and return whether it was put"""
+    while not stopped.is_set():
+        try:
+            records.put(item, timeout = 0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+def _drainRecords(records: queue.Queue) -> Iterator[LogRecord]:
+    """Yield the records put on a shard's queue until the shard is done, raising the error it ended with"""
+    while True:
+        item = records.get()
+        if item is _SHARD_DONE:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
+class LogHighWaterMark(NamedTuple):
+    """The time of the newest log read by a LogTailer, with the keys of the logs read at that time"""
+    time: datetime
+    keys: frozenset = frozenset()
+
+class LogTailer:
+    """Fetches only the logs newer than those already read, tracked separately for each QVRLogType
+
+    Ranges longer than shard_duration are split into up to max_shards shards, fetched concurrently and
+    merged back in time order as they arrive, each shard buffering at most page_size records ahead of
+    the merge on top of the page its LogIterator prefetches. Logs on shard boundaries, and logs at the
+    high-water mark that were returned by the previous fetch, are suppressed so each log is returned
+    once.
+    """
+
+    def __init__(self, instance, shard_duration: timedelta = timedelta(hours = 1), max_shards: int = 8, page_size: int = 500):
+        self._instance = instance
+        self.shard_duration: timedelta = shard_duration
+        self.max_shards: int = max_shards
+        self.page_size: int = page_size
+        self.high_water_marks: Dict[QVRLogType, LogHighWaterMark] = {}
+        self.__lock: threading.Lock = threading.Lock()
+
+    def __fetchShard(self, query: LogQuery, records: queue.Queue, stopped: threading.Event) -> None:
+        """Put every log matching query on records, then _SHARD_DONE or the error raised, until stopped"""
+        iterator = iter(LogIterator(self._instance, query, self.page_size))
+        try:
+            for record in iterator:
+                if not _putRecord(records, record, stopped):
+                    return
+        except Exception as e:
+            _putRecord(records, e, stopped)
+            return
+        finally:
+            iterator.close()
+        _putRecord(records, _SHARD_DONE, stopped)
+
+    def fetch(self, query: LogQuery) -> Iterator[LogRecord]:
+        """Fetch every log matching query, sharding its time range, in time order without duplicates
+
+        Logs are returned newest first where the query's sort direction is DESCENDING and oldest first
+        otherwise. Shards are merged by time, so the query must not sort on another field.
+        """
+        query = query._replace(sort_direction = query.sort_direction or QVRSortDirection.ASCENDING)
+        descending = query.sort_direction == QVRSortDirection.DESCENDING
+        if query.start_time is None or query.end_time is None:
+            queries = [query]
+        else:
+            ranges = _shardRange(_utc(query.start_time), _utc(query.end_time), self.shard_duration, self.max_shards)
+            queries = [query._replace(start_time = start, end_time = end) for start, end in ranges]
+        stopped = threading.Event()
+        shards = [queue.Queue(self.page_size) for _ in queries]
+        executor = ThreadPoolExecutor(max_workers = len(queries))
+        try:
+            for shard_query, records in zip(queries, shards):
+                executor.submit(self.__fetchShard, shard_query, records, stopped)
+            seen_time = None
+            seen_keys = set()
+            for record in heapq.merge(*[_drainRecords(records) for records in shards], key = _recordTime, reverse = descending):
+                record_time = _recordTime(record)
+                if record_time != seen_time:
+                    seen_time = record_time
+                    seen_keys = set()
+                key = _recordKey(record)
+                if key not in seen_keys:
+                    seen_keys.add(key)
+                    yield record
+        finally:
+            # Shards still fetching, as when the caller stops early, give up at their next record
+            stopped.set()
+            executor.shutdown(wait = False)
+
+    def tail(self, query: LogQuery) -> List[LogRecord]:
+        """Return the logs matching query that are newer than the high-water mark for its log type
+
+        The query's start_time is used only when no logs of its type have been read yet, and its end_time
+        defaults to now. The high-water mark is advanced past the returned logs.
+        """
+        with self.__lock:
+            mark = self.high_water_marks.get(query.log_type)
+        start_time = _utc(mark.time if mark is not None else query.start_time)
+        end_time = _utc(query.end_time) or datetime.now(timezone.utc)
+        records = []
+        for record in self.fetch(query._replace(start_time = start_time, end_time = end_time)):
+            if mark is not None and record.time is not None and (_recordTime(record) < mark.time.timestamp() or (_recordTime(record) == mark.time.timestamp() and _recordKey(record) in mark.keys)):
+                continue
+            records.append(record)
+        timed = [record for record in records if record.time is not None]
+        if len(timed) > 0:
+            newest = max(_recordTime(record) for record in timed)
+            newest_records = [record for record in timed if _recordTime(record) == newest]
+            keys = frozenset(_recordKey(record) for record in newest_records)
+            if mark is not None and newest == mark.time.timestamp():
+                keys = keys | mark.keys
+            with self.__lock:
+                self.high_water_marks[query.log_type] = LogHighWaterMark(newest_records[0].time, keys)
+        return records
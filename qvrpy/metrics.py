@@ -0,0 +1,158 @@
+"""
+Request instrumentation.
+
+An Instrumentation attached to a Transport or AsyncTransport is given a RequestMetric for every call
+made through the qvrapi functions, and keeps per-endpoint call counts, latency histograms, bytes
+received, HTTP status counts and QVR Pro error code counts. These can be read as a dict, exported in
+the Prometheus text format, or observed as they happen by subscribing a callback.
+
+Transports without instrumentation skip all of this, so it costs nothing when disabled.
+"""
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, List, NamedTuple, Sequence
+
+DEFAULT_BUCKETS: Sequence[float] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class RequestMetric(NamedTuple):
+    """A single call to a QVR Pro endpoint
+
+    status_code is None where no response was received, in which case exception holds the error
+    raised by the transport. error_code is the QVR Pro error code of a failed call, where one was given.
+    For streamed responses, duration is the time until the response headers were received and
+    bytes_received is taken from the Content-Length header.
+    """
+    endpoint: str
+    method: str
+    status_code: int
+    error_code: str
+    duration: float
+    bytes_received: int
+    exception: Exception = None
+
+class EndpointStats:
+    """The totals of every call recorded for one endpoint"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.count: int = 0
+        self.failures: int = 0
+        self.duration_sum: float = 0.0
+        self.duration_max: float = 0.0
+        self.bytes_received: int = 0
+        self.bucket_counts: List[int] = [0] * (len(buckets) + 1)
+        self.status_codes: Dict[str, int] = {}
+        self.error_codes: Dict[str, int] = {}
+
+    def add(self, metric: RequestMetric, buckets: Sequence[float]) -> None:
+        self.count += 1
+        if metric.exception is not None:
+            self.failures += 1
+        self.duration_sum += metric.duration
+        self.duration_max = max(self.duration_max, metric.duration)
+        self.bytes_received += metric.bytes_received or 0
+        self.bucket_counts[bisect_left(buckets, metric.duration)] += 1
+        status = str(metric.status_code) if metric.status_code is not None else 'none'
+        self.status_codes[status] = self.status_codes.get(status, 0) + 1
+        if metric.error_code is not None:
+            self.error_codes[metric.error_code] = self.error_codes.get(metric.error_code, 0) + 1
+
+    def toDict(self) -> dict:
+        return {
+            'count' : self.count,
+            'failures' : self.failures,
+            'duration_sum' : self.duration_sum,
+            'duration_max' : self.duration_max,
+            'bytes_received' : self.bytes_received,
+            'bucket_counts' : list(self.bucket_counts),
+            'status_codes' : dict(self.status_codes),
+            'error_codes' : dict(self.error_codes)
+            }
+
+def _labels(**labels: str) -> str:
+    return '{' + ','.join('{0}="{1}"'.format(key, str(val).replace('\\', '\\\\').replace('"', '\\"')) for key, val in labels.items()) + '}'
+
+class Instrumentation:
+    """Collects RequestMetrics by endpoint and passes each to every subscribed callback
+
+    Any object with a compatible record(metric) method may be attached to a transport in its place.
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        """Initialise the instrumentation, with latency histogram bucket upper bounds in seconds"""
+        self.buckets: Sequence[float] = tuple(sorted(buckets))
+        self.__endpoints: Dict[str, EndpointStats] = {}
+        self.__callbacks: List[Callable[[RequestMetric], None]] = []
+        self.__lock: threading.Lock = threading.Lock()
+        self.last_callback_error: Exception = None
+
+    def subscribe(self, callback: Callable[[RequestMetric], None]) -> None:
+        """Call callback with every metric recorded, on the thread that made the request"""
+        with self.__lock:
+            self.__callbacks.append(callback)
+
+    def unsubscribe(self, callback: Callable[[RequestMetric], None]) -> None:
+        with self.__lock:
+            if callback in self.__callbacks:
+                self.__callbacks.remove(callback)
+
+    def record(self, metric: RequestMetric) -> None:
+        """Add a metric to the totals of its endpoint and pass it to the subscribed callbacks
+
+        An exception raised by a callback is kept as last_callback_error rather than raised, so that it
+        does not replace the result of the request being measured.
+        """
+        with self.__lock:
+            stats = self.__endpoints.get(metric.endpoint)
+            if stats is None:
+                stats = self.__endpoints[metric.endpoint] = EndpointStats(self.buckets)
+            stats.add(metric, self.buckets)
+            callbacks = list(self.__callbacks)
+        for callback in callbacks:
+            try:
+                callback(metric)
+            except Exception as e:
+                self.last_callback_error = e
+
+    def reset(self) -> None:
+        """Discard every total recorded"""
+        with self.__lock:
+            self.__endpoints = {}
+
+    def stats(self) -> Dict[str, dict]:
+        """Return the totals recorded for each endpoint"""
+        with self.__lock:
+            return {endpoint: stats.toDict() for endpoint, stats in self.__endpoints.items()}
+
+    def prometheus(self, prefix: str = 'qvrpy') -> str:
+        """Return the totals in the Prometheus text exposition format"""
+        stats = self.stats()
+        lines = [
+            '# HELP {0}_requests_total Requests made to QVR Pro by endpoint and HTTP status.'.format(prefix),
+            '# TYPE {0}_requests_total counter'.format(prefix)
+            ]
+        for endpoint, values in sorted(stats.items()):
+            for status, count in sorted(values['status_codes'].items()):
+                lines.append('{0}_requests_total{1} {2}'.format(prefix, _labels(endpoint = endpoint, status = status), count))
+        lines.append('# HELP {0}_request_failures_total Requests to QVR Pro that received no response.'.format(prefix))
+        lines.append('# TYPE {0}_request_failures_total counter'.format(prefix))
+        for endpoint, values in sorted(stats.items()):
+            lines.append('{0}_request_failures_total{1} {2}'.format(prefix, _labels(endpoint = endpoint), values['failures']))
+        lines.append('# HELP {0}_errors_total QVR Pro error codes returned by endpoint.'.format(prefix))
+        lines.append('# TYPE {0}_errors_total counter'.format(prefix))
+        for endpoint, values in sorted(stats.items()):
+            for error_code, count in sorted(values['error_codes'].items()):
+                lines.append('{0}_errors_total{1} {2}'.format(prefix, _labels(endpoint = endpoint, error_code = error_code), count))
+        lines.append('# HELP {0}_response_bytes_total Bytes received from QVR Pro by endpoint.'.format(prefix))
+        lines.append('# TYPE {0}_response_bytes_total counter'.format(prefix))
+        for endpoint, values in sorted(stats.items()):
+            lines.append('{0}_response_bytes_total{1} {2}'.format(prefix, _labels(endpoint = endpoint), values['bytes_received']))
+        lines.append('# HELP {0}_request_duration_seconds Latency of requests to QVR Pro by endpoint.'.format(prefix))
+        lines.append('# TYPE {0}_request_duration_seconds histogram'.format(prefix))
+        for endpoint, values in sorted(stats.items()):
+            cumulative = 0
+            for bound, count in zip(list(self.buckets) + ['+Inf'], values['bucket_counts']):
+                cumulative += count
+                lines.append('{0}_request_duration_seconds_bucket{1} {2}'.format(prefix, _labels(endpoint = endpoint, le = bound), cumulative))
+            lines.append('{0}_request_duration_seconds_sum{1} {2}'.format(prefix, _labels(endpoint = endpoint), values['duration_sum']))
+            lines.append('{0}_request_duration_seconds_count{1} {2}'.format(prefix, _labels(endpoint = endpoint), values['count']))
+        return '\n'.join(lines) + '\n'
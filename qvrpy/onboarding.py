@@ -0,0 +1,108 @@
+"""
+Camera onboarding.
+
+Onboarding a site means searching the network for cameras and testing QVR Pro's connection to each
+one found, and a camera test can spend many seconds probing RTSP. An OnboardingRun tests every
+camera found by a search concurrently, with a bounded number of tests in flight, yields each
+camera's CameraTestResult as soon as its test finishes, and summarises the run once it is complete.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, NamedTuple
+
+from .camera import Camera
+from .qvrapi import errorDescription
+
+class CameraTestResult(NamedTuple):
+    """The outcome of QVR Pro's connection test of one camera found by a search"""
+    camera: Camera
+    response: dict
+    error: Exception
+    duration: float
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+    @property
+    def error_code(self) -> str:
+        """The QVR Pro error code the test failed with, where one was given"""
+        return getattr(self.error, 'error_code', None)
+
+    @property
+    def description(self) -> str:
+        """The description of the error the test failed with, decoded from its QVR Pro error code where known"""
+        if self.error is None:
+            return None
+        return errorDescription(self.error_code) or str(self.error)
+
+class OnboardingSummary(NamedTuple):
+    """The totals of a completed OnboardingRun, with failures counted by error description"""
+    discovered: int
+    passed: List[CameraTestResult]
+    failed: List[CameraTestResult]
+    errors: Dict[str, int]
+    duration: float
+
+class OnboardingRun:
+    """A concurrent connection test of every camera found by a search
+
+    The tests start when the run is first iterated or summarised. Iterating yields a CameraTestResult
+    per camera in the order the tests finish, and stopping iteration early cancels the tests not yet
+    started. Cameras of a model QVR Pro does not support fail without being tested.
+    """
+
+    def __init__(self, instance, cameras: List[Camera], max_workers: int = 4, timeout: float = None):
+        """Initialise the run, testing at most max_workers cameras at once, each for at most timeout seconds"""
+        self._instance = instance
+        self.cameras: List[Camera] = cameras
+        self.max_workers: int = max_workers
+        self.timeout: float = timeout
+        self.results: List[CameraTestResult] = []
+        self.started: float = None
+        self.finished: float = None
+        self.__lock: threading.Lock = threading.Lock()
+
+    def __test(self, camera: Camera) -> CameraTestResult:
+        started = time.monotonic()
+        try:
+            response = self._instance.testCamera(camera, timeout = self.timeout)
+            return CameraTestResult(camera, response, None, time.monotonic() - started)
+        except Exception as e:
+            return CameraTestResult(camera, None, e, time.monotonic() - started)
+
+    def __iter__(self) -> Iterator[CameraTestResult]:
+        with self.__lock:
+            if self.started is not None:
+                raise RuntimeError('Onboarding run already started')
+            self.started = time.monotonic()
+        if len(self.cameras) == 0:
+            self.finished = self.started
+            return
+        executor = ThreadPoolExecutor(max_workers = min(self.max_workers, len(self.cameras)))
+        futures = [executor.submit(self.__test, camera) for camera in self.cameras]
+        try:
+            for future in as_completed(futures):
+                result = future.result()
+                self.results.append(result)
+                yield result
+            self.finished = time.monotonic()
+        finally:
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait = False)
+
+    def summary(self) -> OnboardingSummary:
+        """Return the totals of the run, first running it to completion where it has not been iterated"""
+        if self.started is None:
+            for _ in self:
+                pass
+        elif self.finished is None:
+            raise RuntimeError('Onboarding run not complete')
+        passed = [result for result in self.results if result.succeeded]
+        failed = [result for result in self.results if not result.succeeded]
+        errors = {}
+        for result in failed:
+            errors[result.description] = errors.get(result.description, 0) + 1
+        return OnboardingSummary(len(self.cameras), passed, failed, errors, self.finished - self.started)
@@ -48,12 +48,22 @@
 ###################################################################################################
 
 import base64
+import inspect
 import json
-import requests
+import threading
+import time
 from datetime import datetime
 from xml.etree import ElementTree
 from typing import List, Dict
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from .metrics import RequestMetric
+from .transport import Transport
+
 __API_VERSION: str = '1.1.0'
 __ERROR_CODES: dict = {
     '0xB1000000' : 'API version not support',
@@ -110,7 +120,7 @@ __URL_CAMERA_CAPABILITY: str = '{url}/qvrpro/camera/capability'
 __URL_CAMERA_SUPPORT: str = '{url}/qvrpro/camera/support'
 __URL_CAMERA_SNAPSHOT: str = '{url}/qvrpro/camera/snapshot/{guid}'
 __URL_CAMERA_RECORDING: str = '{url}/qvrpro/camera/mrec/{guid}/{action}'
-__URL_CAMERA_ALARM: str = '{url}/qvrpro/camera/alarm/{giod}/{action}'
+__URL_CAMERA_ALARM: str = '{url}/qvrpro/camera/alarm/{guid}/{action}'
 __URL_CAMERA_RECORDINGFILE: str = '{url}/qvrpro/camera/recordingfile/{guid}/{stream}'
 __URL_CAMERA_PTZ: str = '{url}​/qvrpro​/ptz​/v1​/channel_list​/{guid}​/ptz​/action_list​/{action_id}​/invoke'
 __URL_LOGS: str = '{url}/qvrpro/logs/logs'
@@ -118,61 +128,199 @@ __URL_CHANNEL_LIST: str = '{url}/qvrpro/qshare/StreamingOutput/channels'
 __URL_STREAM_LIST: str = '{url}/qvrpro/qshare/StreamingOutput/channel/{guid}/streams'
 __URL_LIVESTREAM: str = '{url}/qvrpro/qshare/StreamingOutput/channel/{guid}/stream/{stream}/liveStream'
 
-def __clean_json_response(value: str) -> str:
-    """Removes erroneous characters/bad form from JSON responses"""
-    return json.loads(value.replace('\n','').replace('\t','').replace('[}]','[]'))
+_AUTH_ERROR_CODES: List[str] = ['0xB1000001', '0xC4000005']
+
+class QVRError(Exception):
+    """An error response from QVR Pro, with its HTTP status and QVR Pro error code where one was given"""
+
+    def __init__(self, message: str, status_code: int = None, error_code: str = None):
+        super().__init__(message)
+        self.status_code: int = status_code
+        self.error_code: str = error_code
+
+    @property
+    def auth_failure(self) -> bool:
+        """Whether the request failed because the session is not, or is no longer, authorised"""
+        return self.error_code in _AUTH_ERROR_CODES or (self.error_code is None and self.status_code == 401)
+
+__DEFAULT_TRANSPORT: Transport = None
+__DEFAULT_TRANSPORT_LOCK: threading.Lock = threading.Lock()
+
+def __getTransport(transport: Transport) -> Transport:
+    """Return the given transport, or a shared module-level Transport where none is given"""
+    global __DEFAULT_TRANSPORT
+    if transport is not None:
+        return transport
+    with __DEFAULT_TRANSPORT_LOCK:
+        if __DEFAULT_TRANSPORT is None:
+            __DEFAULT_TRANSPORT = Transport()
+        return __DEFAULT_TRANSPORT
+
+def __clean_json_response(value: bytes) -> dict:
+    """Parse a JSON response body, tolerating the bad form QVR Pro is known to return
+
+    The body is decoded straight from bytes, with orjson where it is installed. Malformed empty
+    lists ([}]) are only rewritten where present, and raw tabs and newlines inside strings are
+    accepted rather than stripped from the whole body beforehand.
+    """
+    if type(value) == str:
+        value = value.encode('utf-8')
+    if b'[}]' in value:
+        value = value.replace(b'[}]', b'[]')
+    if orjson is not None:
+        try:
+            return orjson.loads(value)
+        except ValueError:
+            pass
+    return json.loads(value, strict = False)
+
+def __check_response(response, success_status: int = 200) -> None:
+    """Raise a QVRError for unsuccessful responses, decoding QVR Pro error codes where present"""
+    if response.status_code == success_status:
+        return
+    try:
+        error_code = __clean_json_response(response.content)['error_code']
+    except (ValueError, KeyError, TypeError):
+        error_code = None
+    if error_code in __ERROR_CODES:
+        raise QVRError('{0}: {1}'.format(error_code, __ERROR_CODES[error_code]), response.status_code, error_code)
+    raise QVRError('HTTP Status Code {0}'.format(response.status_code), response.status_code)
+
+def errorDescription(error_code: str) -> str:
+    """Return the description of a QVR Pro error code, or None where the code is not known"""
+    return __ERROR_CODES.get(error_code)
+
+def __json_response(response) -> dict:
+    """Handle a response carrying a JSON document"""
+    __check_response(response)
+    return __clean_json_response(response.content)
+
+def __content_response(response) -> bytes:
+    """Handle a response carrying binary content"""
+    __check_response(response)
+    return response.content
+
+def __empty_response(response) -> None:
+    """Handle a response carrying no content"""
+    __check_response(response)
+
+def __deleted_response(response) -> None:
+    """Handle a response to a DELETE request"""
+    __check_response(response, 204)
+
+def __streamed_response(response):
+    """Handle a streamed response, returning it open for the body to be read"""
+    if response.status_code in [206, 416]:
+        return response
+    try:
+        __check_response(response)
+    except Exception:
+        response.close()
+        raise
+    return response
+
+def __xml_response(response) -> dict:
+    """Handle a response carrying a flat XML document"""
+    __check_response(response)
+    tree = ElementTree.fromstring(response.text)
+    return {data.tag: tree.find(data.tag).text for data in tree}
+
+async def __await_response(response, handler):
+    return handler(await response)
+
+def __instrumented_response(instrumentation, endpoint: str, method: str, started: float, response, handler, streamed: bool):
+    """Handle a response, recording its metric whether or not the handler raises"""
+    duration = time.perf_counter() - started
+    error_code = None
+    try:
+        return handler(response)
+    except QVRError as e:
+        error_code = e.error_code
+        raise
+    finally:
+        if streamed:
+            bytes_received = int(response.headers.get('Content-Length') or 0)
+        else:
+            bytes_received = len(response.content or b'')
+        instrumentation.record(RequestMetric(endpoint, method, response.status_code, error_code, duration, bytes_received))
+
+async def __await_instrumented(instrumentation, endpoint: str, method: str, started: float, response, handler, streamed: bool):
+    try:
+        response = await response
+    except Exception as e:
+        instrumentation.record(RequestMetric(endpoint, method, None, None, time.perf_counter() - started, 0, e))
+        raise
+    return __instrumented_response(instrumentation, endpoint, method, started, response, handler, streamed)
+
+def __instrumented_request(instrumentation, transport: Transport, endpoint: str, method: str, url: str, handler, **kwargs):
+    """Perform a request as __request does, recording a RequestMetric with the transport's instrumentation"""
+    streamed = kwargs.get('stream', False)
+    started = time.perf_counter()
+    try:
+        response = transport.request(method, url, **kwargs)
+    except Exception as e:
+        instrumentation.record(RequestMetric(endpoint, method, None, None, time.perf_counter() - started, 0, e))
+        raise
+    if inspect.isawaitable(response):
+        return __await_instrumented(instrumentation, endpoint, method, started, response, handler, streamed)
+    return __instrumented_response(instrumentation, endpoint, method, started, response, handler, streamed)
+
+def __request(transport: Transport, endpoint: str, method: str, url: str, handler, **kwargs):
+    """Perform a request to the named endpoint over the transport and pass the response to the handler
+
+    Where the transport is asynchronous (its request method returns an awaitable), an awaitable
+    of the handled result is returned instead, so every function in this module serves both the
+    synchronous and asynchronous clients. Where the transport has instrumentation, a RequestMetric
+    is recorded for the request.
+    """
+    transport = __getTransport(transport)
+    instrumentation = getattr(transport, 'instrumentation', None)
+    if instrumentation is not None:
+        return __instrumented_request(instrumentation, transport, endpoint, method, url, handler, **kwargs)
+    response = transport.request(method, url, **kwargs)
+    if inspect.isawaitable(response):
+        return __await_response(response, handler)
+    return handler(response)
 
 
 # Documentation for this method is at
 # http://petstore.swagger.io/?url=https://download.qnap.com/apidoc/qvrpro/qvr_pro_api_1.1.0.yaml#/SDK%20Authorization/get_cgi_bin_authLogin_cgi
-def authLogin(url: str, user: str, password: str) -> dict:
+def authLogin(url: str, user: str, password: str, transport: Transport = None) -> dict:
     """Get SID and log in"""
     params = {
         'user' : user,
         'serviceKey' : 1,
         'pwd' : base64.standard_b64encode(bytes(password, 'utf-8'))
         }
-    response = requests.get(__URL_AUTH_LOGIN.format(url = url), params)
-    if response.status_code == 200:
-        tree = ElementTree.fromstring(response.text)
-        data = {data.tag: tree.find(data.tag).text for data in tree}
-        return data
-    else:
-        raise Exception('HTTP Status Code {0}'.format(response.status_code))
+    return __request(transport, 'authLogin', 'GET', __URL_AUTH_LOGIN.format(url = url), __xml_response, params = params)
 
 # Documentation for this method is at
 # http://petstore.swagger.io/?url=https://download.qnap.com/apidoc/qvrpro/qvr_pro_api_1.1.0.yaml#/SDK%20Authorization/get_cgi_bin_authLogout_cgi
-def authLogout(url: str, sid: str) -> None:
+def authLogout(url: str, sid: str, transport: Transport = None) -> None:
     """Use SID to log out"""
     params = {
         'sid' : sid,
         'logout' : 1
         }
-    response = requests.get(__URL_AUTH_LOGOUT.format(url = url), params)
-    if response.status_code != 200:
-        raise Exception('HTTP Status Code {0}'.format(response.status_code))
+    return __request(transport, 'authLogout', 'GET', __URL_AUTH_LOGOUT.format(url = url), __empty_response, params = params)
     
 # Documentation for this method is at
 # http://petstore.swagger.io/?url=https://download.qnap.com/apidoc/qvrpro/qvr_pro_api_1.1.0.yaml#/SDK%20Camera%20Settings/get_qvrpro_camera_search
-def cameraSearch(url: str, sid: str) -> dict:
+def cameraSearch(url: str, sid: str, transport: Transport = None) -> dict:
     """Search for new cameras on the LAN via upnp and udp."""
     params = {
         'sid' : sid,
         'ver' : __API_VERSION
         }
-    response = requests.get(__URL_CAMERA_SEARCH.format(url = url), params)
-    if response.status_code == 200:
-        return __clean_json_response(response.text)
-    elif response.status_code == 403:
-        error_code = __clean_json_response(response.text)['error_code']
-        raise Exception('{0}: {1}'.format(error_code, __ERROR_CODES[error_code]))
-    else:
-        raise Exception('HTTP Status Code {0}'.format(response.status_code))
+    return __request(transport, 'cameraSearch', 'GET', __URL_CAMERA_SEARCH.format(url = url), __json_response, params = params)
     
 # Documentation for this method is at
 # http://petstore.swagger.io/?url=https://download.qnap.com/apidoc/qvrpro/qvr_pro_api_1.1.0.yaml#/SDK%20Camera%20Settings/get_qvrpro_camera_test
-def cameraTest(url: str, sid: str, ipcam_umsid: str, ipcam_address: str, ipcam_port: int, ipcam_username: str, ipcam_password: str, ipcam_rtsp_port: int, ipcam_http_video_url: str, nvr_channel_id: int):
-    """Test the connection of a single camera"""
+def cameraTest(url: str, sid: str, ipcam_umsid: str, ipcam_address: str, ipcam_port: int, ipcam_username: str, ipcam_password: str, ipcam_rtsp_port: int, ipcam_http_video_url: str, nvr_channel_id: int, transport: Transport = None, timeout: float = None):
+    """Test the connection of a single camera
+
+    The test is never retried once sent, as QVR Pro probes the camera again for every request.
+    """
     params = {
         'sid' : sid,
         'ver' : __API_VERSION,
@@ -185,188 +333,140 @@ def cameraTest(url: str, sid: str, ipcam_umsid: str, ipcam_address: str, ipcam_p
         'ipcam_http_video_url' : ipcam_http_video_url,
         'nvr_channel_id' : nvr_channel_id
         }
-    response = requests.get(__URL_CAMERA_TEST.format(url = url), params)
-    if response.status_code == 200:
-        return __clean_json_response(response.text)
-    elif response.status_code == 403:
-        error_code = __clean_json_response(response.text)['error_code']
-        raise Exception('{0}: {1}'.format(error_code, __ERROR_CODES[error_code]))
-    else:
-        raise Exception('HTTP Status Code {0}'.format(response.status_code))
+    kwargs = {'retry' : False} if timeout is None else {'timeout' : timeout, 'retry' : False}
+    return __request(transport, 'cameraTest', 'GET', __URL_CAMERA_TEST.format(url = url), __json_response, params = params, **kwargs)
     
 # Documentation for this method is at
 # http://petstore.swagger.io/?url=https://download.qnap.com/apidoc/qvrpro/qvr_pro_api_1.1.0.yaml#/SDK%20Camera%20Settings/get_qvrpro_camera_list
-def __cameraList(url: str, sid: str, guid: str) -> dict:
+def __cameraList(url: str, sid: str, guid: str, transport: Transport = None) -> dict:
     """Get the connection status and recording status of one or all cameras"""
     params = {
         'sid' : sid,
         'ver' : __API_VERSION,
         'guid' : guid
         }
-    response = requests.get(__URL_CAMERA_LIST.format(url = url), params)
-    if response.status_code == 200:
-        return __clean_json_response(response.text)
-    elif response.status_code == 403:
-        error_code = __clean_json_response(response.text)['error_code']
-        raise Exception('{0}: {1}'.format(error_code, __ERROR_CODES[error_code]))
-    else:
-        raise Exception('HTTP Status Code {0}'.format(response.status_code))
-def cameraDetail(url: str, sid: str, guid: str) -> dict:
+    return __request(transport, 'cameraList', 'GET', __URL_CAMERA_LIST.format(url = url), __json_response, params = params)
+def cameraDetail(url: str, sid: str, guid: str, transport: Transport = None) -> dict:
     """Get the connection status and recording status of one camera"""
-    return __cameraList(url, sid, guid)
-def cameraList(url: str, sid: str) -> dict:
+    return __cameraList(url, sid, guid, transport)
+def cameraList(url: str, sid: str, transport: Transport = None) -> dict:
     """Get the connection status and recording status of all cameras"""
-    return __cameraList(url, sid, None)
+    return __cameraList(url, sid, None, transport)
     
 # Documentation for this method is at
 # http://petstore.swagger.io/?url=https://download.qnap.com/apidoc/qvrpro/qvr_pro_api_1.1.0.yaml#/SDK%20Camera%20Settings/get_qvrpro_camera_capability
-def __cameraCapability(url: str, sid: str, act: str) -> dict:
+def __cameraCapability(url: str, sid: str, act: str, transport: Transport = None) -> dict:
     """Get connection capability and recording status of one or all cameras"""
     params = {
         'sid' : sid,
         'ver' : __API_VERSION,
         'act' : act
         }
-    response = requests.get(__URL_CAMERA_CAPABILITY.format(url = url), params)
-    if response.status_code == 200:
-        return __clean_json_response(response.text)
-    elif response.status_code == 403:
-        error_code = __clean_json_response(response.text)['error_code']
-        raise Exception('{0}: {1}'.format(error_code, __ERROR_CODES[error_code]))
-    else:
-        raise Exception('HTTP Status Code {0}'.format(response.status_code))
-def cameraCapability(url: str, sid: str) -> dict:
+    return __request(transport, 'cameraCapability', 'GET', __URL_CAMERA_CAPABILITY.format(url = url), __json_response, params = params)
+def cameraCapability(url: str, sid: str, transport: Transport = None) -> dict:
     """Get connection capability and recording status of one or all cameras"""
-    return __cameraCapability(url, sid, 'get_camera_capability')
-def eventCapability(url: str, sid: str) -> dict:
+    return __cameraCapability(url, sid, 'get_camera_capability', transport)
+def eventCapability(url: str, sid: str, transport: Transport = None) -> dict:
     """Get connection capability and recording status of one or all cameras"""
-    return __cameraCapability(url, sid, 'get_event_capability')
+    return __cameraCapability(url, sid, 'get_event_capability', transport)
 
 # Documentation for this method is at
 # http://petstore.swagger.io/?url=https://download.qnap.com/apidoc/qvrpro/qvr_pro_api_1.1.0.yaml#/SDK%20Camera%20Settings/get_qvrpro_camera_support
-def cameraSupport(url: str, sid: str):
+def cameraSupport(url: str, sid: str, transport: Transport = None):
     """Get all the supported cameras sorted by their brand and model"""
     params = {
         'sid' : sid,
         'ver' : __API_VERSION
         }
-    response = requests.get(__URL_CAMERA_SUPPORT.format(url = url), params)
-    if response.status_code == 200:
-        return __clean_json_response(response.text)
-    elif response.status_code == 403:
-        error_code = __clean_json_response(response.text)['error_code']
-        raise Exception('{0}: {1}'.format(error_code, __ERROR_CODES[error_code]))
-    else:
-        raise Exception('HTTP Status Code {0}'.format(response.status_code))
+    return __request(transport, 'cameraSupport', 'GET', __URL_CAMERA_SUPPORT.format(url = url), __json_response, params = params)
     
 # Documentation for this method is at
 # http://petstore.swagger.io/?url=https://download.qnap.com/apidoc/qvrpro/qvr_pro_api_1.1.0.yaml#/SDK%20Camera%20Control/get_qvrpro_camera_snapshot__guid_
-def cameraSnapshot(url: str, sid: str, guid: str, image_timestamp: datetime):
+def cameraSnapshot(url: str, sid: str, guid: str, image_timestamp: datetime, transport: Transport = None, timeout: float = None):
     """Get a snapshot image from the camera."""
     params = {
         'sid' : sid,
         'ver' : __API_VERSION,
-        'image_ts' : image_timestamp.isoformat
+        'image_ts' : image_timestamp.isoformat()
         }
-    response = requests.get(__URL_CAMERA_SNAPSHOT.format(url = url, guid = guid), params)
-    if response.status_code == 200:
-        return response.content
-    elif response.status_code == 403:
-        error_code = __clean_json_response(response.text)['error_code']
-        raise Exception('{0}: {1}'.format(error_code, __ERROR_CODES[error_code]))
-    else:
-        raise Exception('HTTP Status Code {0}'.format(response.status_code))
+    kwargs = {} if timeout is None else {'timeout' : timeout, 'retry' : False}
+    return __request(transport, 'cameraSnapshot', 'GET', __URL_CAMERA_SNAPSHOT.format(url = url, guid = guid), __content_response, params = params, **kwargs)
     
 # Documentation for this method is at
 # http://petstore.swagger.io/?url=https://download.qnap.com/apidoc/qvrpro/qvr_pro_api_1.1.0.yaml#/SDK%20Camera%20Control/put_qvrpro_camera_mrec__guid___action_
-def __cameraRecording(url: str, sid: str, guid: str, action: str) -> None:
+def __cameraRecording(url: str, sid: str, guid: str, action: str, transport: Transport = None) -> None:
     """Start/stop recording the particular camera."""
     params = {
         'sid' : sid,
         'ver' : __API_VERSION
         }
-    response = requests.get(__URL_CAMERA_RECORDING.format(url = url, guid = guid, action = action), params)
-    if response.status_code == 200:
-        return
-    elif response.status_code == 403:
-        error_code = __clean_json_response(response.text)['error_code']
-        raise Exception('{0}: {1}'.format(error_code, __ERROR_CODES[error_code]))
-    else:
-        raise Exception('HTTP Status Code {0}'.format(response.status_code))
-def cameraRecordingStart(url: str, sid: str, guid: str) -> None:
+    return __request(transport, 'cameraRecording', 'PUT', __URL_CAMERA_RECORDING.format(url = url, guid = guid, action = action), __empty_response, params = params)
+def cameraRecordingStart(url: str, sid: str, guid: str, transport: Transport = None) -> None:
     """Start recording the particular camera."""
-    __cameraRecording(url, sid, guid, 'start')
-def cameraRecordingStop(url: str, sid: str, guid: str) -> None:
+    return __cameraRecording(url, sid, guid, 'start', transport)
+def cameraRecordingStop(url: str, sid: str, guid: str, transport: Transport = None) -> None:
     """Stop recording the particular camera."""
-    __cameraRecording(url, sid, guid, 'stop')
+    return __cameraRecording(url, sid, guid, 'stop', transport)
     
 # Documentation for this method is at
 # http://petstore.swagger.io/?url=https://download.qnap.com/apidoc/qvrpro/qvr_pro_api_1.1.0.yaml#/SDK%20Camera%20Control/put_qvrpro_camera_alarm__guid___action_
-def __cameraAlarm(url: str, sid: str, guid: str, action: str) -> None:
+def __cameraAlarm(url: str, sid: str, guid: str, action: str, transport: Transport = None) -> None:
     """Start/stop alarm output to a particular camera."""
     params = {
         'sid' : sid,
         'ver' : __API_VERSION
         }
-    response = requests.get(__URL_CAMERA_ALARM.format(url = url, guid = guid, action = action), params)
-    if response.status_code == 200:
-        return
-    elif response.status_code == 403:
-        error_code = __clean_json_response(response.text)['error_code']
-        raise Exception('{0}: {1}'.format(error_code, __ERROR_CODES[error_code]))
-    else:
-        raise Exception('HTTP Status Code {0}'.format(response.status_code))
-def cameraAlarmStart(url: str, sid: str, guid: str):
+    return __request(transport, 'cameraAlarm', 'PUT', __URL_CAMERA_ALARM.format(url = url, guid = guid, action = action), __empty_response, params = params)
+def cameraAlarmStart(url: str, sid: str, guid: str, transport: Transport = None):
     """Start alarm output to a particular camera."""
-    __cameraAlarm(url, sid, guid, 'start')
-def cameraAlarmStop(url: str ,sid: str, guid: str):
+    return __cameraAlarm(url, sid, guid, 'start', transport)
+def cameraAlarmStop(url: str ,sid: str, guid: str, transport: Transport = None):
     """Stop alarm output to a particular camera."""
-    __cameraAlarm(url, sid, guid, 'stop')
+    return __cameraAlarm(url, sid, guid, 'stop', transport)
     
 # Documentation for this method is at
 # http://petstore.swagger.io/?url=https://download.qnap.com/apidoc/qvrpro/qvr_pro_api_1.1.0.yaml#/SDK%20Camera%20Control/get_qvrpro_camera_recordingfile__guid___stream_
-def cameraRecordingFile(url: str, sid: str, guid : str, stream: int, time: datetime, pre_period: int, post_period: int):
-    """Get a recording file from a specific time range."""
-    params = {
+def __recordingFileParams(sid: str, time: datetime, pre_period: int, post_period: int) -> dict:
+    return {
         'sid' : sid,
-        'ver' : __API_VERSION
+        'ver' : __API_VERSION,
+        'time' : int(time.timestamp() * 1000),
+        'pre_period' : pre_period,
+        'post_period' : post_period
         }
-    response = requests.get(__URL_CAMERA_RECORDINGFILE.format(url = url, guid = guid, stream = stream), params)
-    if response.status_code == 200:
-        return response.content
-    elif response.status_code == 403:
-        error_code = __clean_json_response(response.text)['error_code']
-        raise Exception('{0}: {1}'.format(error_code, __ERROR_CODES[error_code]))
-    else:
-        raise Exception('HTTP Status Code {0}'.format(response.status_code))
+def cameraRecordingFile(url: str, sid: str, guid : str, stream: int, time: datetime, pre_period: int, post_period: int, transport: Transport = None):
+    """Get a recording file from a specific time range."""
+    params = __recordingFileParams(sid, time, pre_period, post_period)
+    return __request(transport, 'cameraRecordingFile', 'GET', __URL_CAMERA_RECORDINGFILE.format(url = url, guid = guid, stream = stream), __content_response, params = params)
+def cameraRecordingFileStream(url: str, sid: str, guid : str, stream: int, time: datetime, pre_period: int, post_period: int, offset: int = 0, transport: Transport = None):
+    """Get a recording file from a specific time range as an open streamed response, starting at the given byte offset."""
+    params = __recordingFileParams(sid, time, pre_period, post_period)
+    headers = {'Range' : 'bytes={0}-'.format(offset)} if offset > 0 else None
+    return __request(transport, 'cameraRecordingFile', 'GET', __URL_CAMERA_RECORDINGFILE.format(url = url, guid = guid, stream = stream), __streamed_response, params = params, headers = headers, stream = True)
     
 # Documentation for this method is at
 # http://petstore.swagger.io/?url=https://download.qnap.com/apidoc/qvrpro/qvr_pro_api_1.1.0.yaml#/SDK%20Camera%20PTZ/put_qvrpro_ptz_v1_channel_list__guid__ptz_action_list__action_id__invoke
-def __cameraPTZ(url: str, sid: str, guid: str, action: str, direction: str) -> dict:
+def __cameraPTZ(url: str, sid: str, guid: str, action: str, direction: str, transport: Transport = None) -> dict:
     """Move camera in different angles"""
     params = {
         'sid' : sid
         }
     if direction != None:
         params['direction'] = direction
-    response = requests.put(__URL_CAMERA_PTZ.format(url = url, guid = guid, action_id = action), params = params)
-    if response.status_code == 200:
-        return __clean_json_response(response.text)
-    else:
-        raise Exception('HTTP Status Code {0}'.format(response.status_code))
-def cameraPTZStartMove(url:str, sid: str, guid: str, direction: str) -> dict:
+    return __request(transport, 'cameraPTZ', 'PUT', __URL_CAMERA_PTZ.format(url = url, guid = guid, action_id = action), __json_response, params = params)
+def cameraPTZStartMove(url:str, sid: str, guid: str, direction: str, transport: Transport = None) -> dict:
     """Start moving camera in different angles"""
-    return __cameraPTZ(url, sid, guid, 'start_move', direction)
-def cameraPTZStopMove(url: str, sid: str, guid: str, direction: str) -> dict:
+    return __cameraPTZ(url, sid, guid, 'start_move', direction, transport)
+def cameraPTZStopMove(url: str, sid: str, guid: str, direction: str, transport: Transport = None) -> dict:
     """Stop moving camera in different angles"""
-    return __cameraPTZ(url, sid, guid, 'stop_move', direction)
-def cameraPTZ(url: str, sid: str, guid: str, action: str) -> dict:
+    return __cameraPTZ(url, sid, guid, 'stop_move', direction, transport)
+def cameraPTZ(url: str, sid: str, guid: str, action: str, transport: Transport = None) -> dict:
     """Start moving camera in different angles"""
-    return __cameraPTZ(url, sid, guid, action, None)
+    return __cameraPTZ(url, sid, guid, action, None, transport)
 
 # Documentation for this method is at
 # http://petstore.swagger.io/?url=https://download.qnap.com/apidoc/qvrpro/qvr_pro_api_1.1.0.yaml#/SDK%20Logs/get_qvrpro_logs_logs
-def logs(url: str, sid: str, log_type: int, level: str, user: str, source_ip: str, source_name: str, channel_id: str, global_channel_id: str, start_time: datetime, end_time: datetime, start_index: int, max_results: int, sort_field: str, sort_direction: str) -> dict:
+def logs(url: str, sid: str, log_type: int, level: str, user: str, source_ip: str, source_name: str, channel_id: str, global_channel_id: str, start_time: datetime, end_time: datetime, start_index: int, max_results: int, sort_field: str, sort_direction: str, transport: Transport = None) -> dict:
     """Get logs in QVR Pro"""
     params = {
         'sid' : sid,
@@ -384,47 +484,29 @@ def logs(url: str, sid: str, log_type: int, level: str, user: str, source_ip: st
         'sort_field' : sort_field,
         'dir' : sort_direction
         }
-    response = requests.get(__URL_LOGS.format(url = url), params)
-    if response.status_code == 200:
-        return __clean_json_response(response.text)
-    else:
-        raise Exception('HTTP Status Code {0}'.format(response.status_code))
+    return __request(transport, 'logs', 'GET', __URL_LOGS.format(url = url), __json_response, params = params)
 
 # Documentation for this method is at
 # http://petstore.swagger.io/?url=https://download.qnap.com/apidoc/qvrpro/qvr_pro_api_1.1.0.yaml#/Streaming%20Output:%20Channel%20list/get_qvrpro_qshare_StreamingOutput_channels
-def channelList(url: str, sid: str) -> dict:
+def channelList(url: str, sid: str, transport: Transport = None) -> dict:
     """Return a list of channel infomation in QVR Pro."""
     params = {
         'sid' : sid
         }
-    response = requests.get(__URL_CHANNEL_LIST.format(url = url), params = params)
-    if response.status_code == 200:
-        return __clean_json_response(response.text)
-    elif response.status_code in [401, 403]:
-        error_code = __clean_json_response(response.text)['error_code']
-        raise Exception('{0}: {1}'.format(error_code, __ERROR_CODES[error_code]))
-    else:
-        raise Exception('HTTP Status Code {0}'.format(response.status_code))
+    return __request(transport, 'channelList', 'GET', __URL_CHANNEL_LIST.format(url = url), __json_response, params = params)
 
 # Documentation for this method is at
 # http://petstore.swagger.io/?url=https://download.qnap.com/apidoc/qvrpro/qvr_pro_api_1.1.0.yaml#/Streaming%20Output:%20Streams/get_qvrpro_qshare_StreamingOutput_channel__guid__streams
-def streamList(url: str, sid: str, guid: str) -> dict:
+def streamList(url: str, sid: str, guid: str, transport: Transport = None) -> dict:
     """Return a list of stream information from a specific channel."""
     params = {
         'sid' : sid,
         }
-    response = requests.get(__URL_STREAM_LIST.format(url = url, guid = guid), params = params)
-    if response.status_code == 200:
-        return __clean_json_response(response.text)
-    elif response.status_code in [401, 403]:
-        error_code = __clean_json_response(response.text)['error_code']
-        raise Exception('{0}: {1}'.format(error_code, __ERROR_CODES[error_code]))
-    else:
-        raise Exception('HTTP Status Code {0}'.format(response.status_code))
+    return __request(transport, 'streamList', 'GET', __URL_STREAM_LIST.format(url = url, guid = guid), __json_response, params = params)
 
 # Documentation for this method is at
 # http://petstore.swagger.io/?url=https://download.qnap.com/apidoc/qvrpro/qvr_pro_api_1.1.0.yaml#/Streaming%20Output:%20Live%20stream/post_qvrpro_qshare_StreamingOutput_channel__guid__stream__stream__liveStream
-def liveStreamOpen(url: str, sid: str, guid: str, stream: int, protocol: str) -> dict:
+def liveStreamOpen(url: str, sid: str, guid: str, stream: int, protocol: str, transport: Transport = None) -> dict:
     """Open a livestream resource, a stream of a channel in QVR Pro, is available for users to access through RTMP, HLS, or RTSP."""
     params = {
         'sid' : sid,
@@ -432,16 +514,11 @@ def liveStreamOpen(url: str, sid: str, guid: str, stream: int, protocol: str) ->
     data = {
         'protocol' : protocol
         }
-    response = requests.post(__URL_LIVESTREAM.format(url = url, guid = guid, stream = stream), json = data, params = params)
-    if response.status_code == 200:
-        return __clean_json_response(response.text)
-    else:
-        raise Exception('HTTP Status Code {0}'.format(response.status_code))
-        print(str(response))
+    return __request(transport, 'liveStreamOpen', 'POST', __URL_LIVESTREAM.format(url = url, guid = guid, stream = stream), __json_response, json = data, params = params)
     
 # Documentation for this method is at
 # http://petstore.swagger.io/?url=https://download.qnap.com/apidoc/qvrpro/qvr_pro_api_1.1.0.yaml#/Streaming%20Output:%20Live%20stream/delete_qvrpro_qshare_StreamingOutput_channel__guid__stream__stream__liveStream
-def liveStreamDelete(url: str, sid: str, guid: str, stream: str, token: str) -> None:
+def liveStreamDelete(url: str, sid: str, guid: str, stream: str, token: str, transport: Transport = None) -> None:
     """Close a livestream resource, a stream of a channel in QVR Pro, is available for users to access through RTMP, HLS, or RTSP."""
     params = {
         'sid' : sid,
@@ -449,8 +526,4 @@ def liveStreamDelete(url: str, sid: str, guid: str, stream: str, token: str) ->
     data = {
         'token' : token
         }
-    response = requests.delete(__URL_LIVESTREAM.format(url = url, guid = guid, stream = stream), json = data, params = params)
-    if response.status_code == 204:
-        return
-    else:
-        raise Exception('HTTP Status Code {0}'.format(response.status_code))
\ No newline at end of file
+    return __request(transport, 'liveStreamDelete', 'DELETE', __URL_LIVESTREAM.format(url = url, guid = guid, stream = stream), __deleted_response, json = data, params = params)
\ No newline at end of file
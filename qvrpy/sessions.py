@@ -0,0 +1,218 @@
+"""
+Live stream session pool.
+
+Every Stream.openStream call creates a new live stream resource on QVR Pro. A StreamSessionPool
+instead shares one open resource per camera, stream and protocol between every consumer that
+acquires it, counting the StreamLeases handed out and closing the resource once it has been unused
+for an idle timeout. Sessions still open when their Instance disconnects, or when the interpreter
+exits, are closed, and so is the pool.
+"""
+import atexit
+import threading
+import time
+import weakref
+from typing import Dict, List, Tuple
+
+from .enums import QVRStreamingProtocol
+from .qvrapi import (
+    liveStreamOpen as api_liveStreamOpen,
+    liveStreamDelete as api_liveStreamDelete,
+    QVRError,
+    )
+from .stream import Stream, _closeStreamArgs, _streamURL
+
+class StreamSession:
+    """A live stream resource open on QVR Pro, shared by the consumers holding a lease on it"""
+
+    def __init__(self, guid: str, stream: int, protocol: QVRStreamingProtocol):
+        self.guid: str = guid
+        self.stream: int = stream
+        self.protocol: QVRStreamingProtocol = protocol
+        self.url: str = None
+        self.token: str = None
+        self.refcount: int = 0
+        self.released_at: float = None
+        self.closed: bool = False
+        self.error: Exception = None
+        self.opened: threading.Event = threading.Event()
+        self.expiry: threading.Timer = None
+
+    @property
+    def key(self) -> Tuple[str, int, QVRStreamingProtocol]:
+        return (self.guid, self.stream, self.protocol)
+
+class StreamLease:
+    """A consumer's hold on a shared StreamSession, released explicitly or on leaving a with block"""
+
+    def __init__(self, pool, session: StreamSession):
+        self._pool = pool
+        self.session: StreamSession = session
+        self.released: bool = False
+
+    @property
+    def url(self) -> str:
+        return self.session.url
+
+    @property
+    def token(self) -> str:
+        return self.session.token
+
+    def release(self) -> None:
+        """Release the lease, allowing the session to close once it has no other consumers"""
+        self._pool.release(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+_POOLS: weakref.WeakSet = weakref.WeakSet()
+
+def _closePools() -> None:
+    for pool in list(_POOLS):
+        pool.closeAll()
+
+atexit.register(_closePools)
+
+class StreamSessionPool:
+    """Shares open live stream resources between consumers of an Instance's streams"""
+
+    def __init__(self, instance, idle_timeout: float = 30.0):
+        """Initialise the pool
+
+        A session no longer held by any lease is closed after idle_timeout seconds, unless it is acquired
+        again first. An idle_timeout of 0 closes sessions as soon as their last lease is released.
+        """
+        self._instance = instance
+        self.idle_timeout: float = idle_timeout
+        self.close_errors: List[Exception] = []
+        self.__sessions: Dict[tuple, StreamSession] = {}
+        self.__closed: bool = False
+        self.__lock: threading.Lock = threading.Lock()
+        _POOLS.add(self)
+
+    def acquire(self, stream: Stream, protocol: QVRStreamingProtocol = QVRStreamingProtocol.RTSP) -> StreamLease:
+        """Return a lease on the stream opened with protocol, opening it only where no session is open
+
+        Raises a QVRError once the pool has been closed, including where it is closed while the stream
+        is being opened.
+        """
+        key = (stream._camera.guid, stream.stream, protocol)
+        with self.__lock:
+            if self.__closed:
+                raise QVRError('Stream pool closed')
+            session = self.__sessions.get(key)
+            owner = session is None
+            if owner:
+                session = StreamSession(*key)
+                self.__sessions[key] = session
+            session.refcount += 1
+            if session.expiry is not None:
+                session.expiry.cancel()
+                session.expiry = None
+        if owner:
+            try:
+                response = self._instance._call(api_liveStreamOpen, session.guid, session.stream, protocol.value)
+                session.url = _streamURL(protocol, response, stream._credentials())
+                session.token = response.get('streamingToken')
+            except Exception as e:
+                session.error = e
+                with self.__lock:
+                    if self.__sessions.get(key) is session:
+                        del self.__sessions[key]
+                session.opened.set()
+                raise
+            with self.__lock:
+                # closeAll closes only opened sessions, so one closed while being opened is closed here
+                closed = self.__closed
+                if closed:
+                    session.error = QVRError('Stream pool closed')
+                session.opened.set()
+            if closed:
+                self.__closeQuietly(session)
+                raise session.error
+        else:
+            session.opened.wait()
+            if session.error is not None:
+                raise session.error
+        return StreamLease(self, session)
+
+    def release(self, lease: StreamLease) -> None:
+        """Release a lease, closing its session after the idle timeout once it has no other consumers"""
+        session = lease.session
+        with self.__lock:
+            if lease.released:
+                return
+            lease.released = True
+            session.refcount -= 1
+            if session.refcount > 0 or session.closed:
+                return
+            session.released_at = time.monotonic()
+            if self.idle_timeout > 0:
+                session.expiry = threading.Timer(self.idle_timeout, self.__expire, (session,))
+                session.expiry.daemon = True
+                session.expiry.start()
+                return
+            self.__sessions.pop(session.key, None)
+        self.__close(session)
+
+    def __expire(self, session: StreamSession) -> None:
+        with self.__lock:
+            if session.refcount > 0 or self.__sessions.get(session.key) is not session:
+                return
+            del self.__sessions[session.key]
+        self.__closeQuietly(session)
+
+    def __close(self, session: StreamSession) -> None:
+        session.closed = True
+        self._instance._call(api_liveStreamDelete, session.guid, *_closeStreamArgs(session.protocol, session.stream, session.token))
+
+    def __closeQuietly(self, session: StreamSession) -> None:
+        """Close a session, keeping any error raised in close_errors"""
+        try:
+            self.__close(session)
+        except Exception as e:
+            self.close_errors.append(e)
+
+    def closeIdle(self) -> int:
+        """Close every session not held by a lease now, returning the number closed
+
+        Every idle session is closed even where closing another fails, the errors being kept in close_errors.
+        """
+        with self.__lock:
+            idle = [session for session in self.__sessions.values() if session.refcount == 0]
+            for session in idle:
+                del self.__sessions[session.key]
+        for session in idle:
+            if session.expiry is not None:
+                session.expiry.cancel()
+            self.__closeQuietly(session)
+        return len(idle)
+
+    def closeAll(self) -> List[Exception]:
+        """Close every session, held or not, and the pool, returning the errors raised closing them
+
+        Sessions still being opened are closed by their opener once open, and later acquires raise.
+        """
+        with self.__lock:
+            self.__closed = True
+            sessions = [session for session in self.__sessions.values() if session.opened.is_set() and session.error is None]
+            self.__sessions = {}
+        errors = []
+        for session in sessions:
+            if session.expiry is not None:
+                session.expiry.cancel()
+            try:
+                self.__close(session)
+            except Exception as e:
+                errors.append(e)
+        return errors
+
+    def sessions(self) -> List[StreamSession]:
+        """Return the sessions currently open"""
+        with self.__lock:
+            return list(self.__sessions.values())
+
+    def __len__(self) -> int:
+        return len(self.__sessions)
@@ -4,9 +4,11 @@ Camera and Stream objects.
 These represents a camera in QVR Pro, and video streams accessible for the Cameras
 """
 import re
-from typing import Sequence
+from functools import lru_cache
+from typing import Callable, Sequence, Tuple
 
 from .enums import  QVRCamStatus, QVRStreamingProtocol
+from .hls import HLSConsumer
 from .qvrapi import (
     liveStreamOpen as api_liveStreamOpen,
     liveStreamDelete as api_liveStreamDelete,
@@ -14,15 +16,18 @@ from .qvrapi import (
 
 _RESOLUTION_REGEX: re.Pattern = re.compile('(\d+)[xX*](\d+)')
 
+def _cleanValue(val):
+    """Return the value, or None where it is missing or a blank string"""
+    if type(val) == str and (len(val) == 0 or val.isspace()):
+        return None
+    return val
+
 def _checkValue(values: dict, key: str):
-    if key in values:
-        val = values[key]
-        if val != None and (type(val) != str or len(val.strip()) > 0):
-            return val
-    return None
-
-def _checkVideoResolution(values: dict, key: str) -> Sequence[int]:
-    val: str = _checkValue(values, key)
+    return _cleanValue(values.get(key))
+
+@lru_cache(maxsize = 256)
+def _parseVideoResolution(val) -> Sequence[int]:
+    val = _cleanValue(val)
     if val != None and type(val) == str:
        match = _RESOLUTION_REGEX.fullmatch(val.strip())
        if match != None:
@@ -30,40 +35,112 @@ def _checkVideoResolution(values: dict, key: str) -> Sequence[int]:
        else:
            raise Exception("Bad Resolution Data: {0}".format(val))
 
-def _checkVideoQuality(values: dict, key: str) -> str:
-    val: str = _checkValue(values, key)
+def _parseVideoQuality(val) -> str:
+    val = _cleanValue(val)
     if val != None:
         return val.replace(' ', '')
 
-class Stream:
-    """A representation of a Camera Stream in QVR Pro"""
+def _resolutionWidth(val) -> int:
+    return (_parseVideoResolution(val) or (None, None))[0]
+
+def _resolutionHeight(val) -> int:
+    return (_parseVideoResolution(val) or (None, None))[1]
+
+def _formatResolution(width: int, height: int) -> str:
+    """Return a resolution in QVR Pro's WxH form, taking a missing dimension as 0 unless both are missing"""
+    if width is None and height is None:
+        return None
+    return '{0}x{1}'.format(width or 0, height or 0)
+
+def _storeWidth(val, width: int) -> str:
+    return _formatResolution(width, _resolutionHeight(val))
+
+def _storeHeight(val, height: int) -> str:
+    return _formatResolution(_resolutionWidth(val), height)
+
+def _storeValue(val, new):
+    return new
+
+class _LazyField:
+    """An attribute parsed from the raw value held at index in its object's _raw tuple only when it is read
+
+    Setting the attribute stores the raw value returned by store, given the current raw value and the
+    new one.
+    """
+
+    __slots__ = ('index', 'parse', 'store')
+
+    def __init__(self, index: int, parse: Callable = _cleanValue, store: Callable = _storeValue):
+        self.index: int = index
+        self.parse: Callable = parse
+        self.store: Callable = store
+
+    def __get__(self, obj, objtype = None):
+        if obj is None:
+            return self
+        return self.parse(obj._raw[self.index])
+
+    def __set__(self, obj, value) -> None:
+        raw = list(obj._raw)
+        raw[self.index] = self.store(raw[self.index], value)
+        obj._raw = tuple(raw)
+
+def _streamURL(protocol: QVRStreamingProtocol, response: dict, credentials: tuple) -> str:
+    """Return the URL of a newly opened stream, with the credentials added to RTSP URLs"""
+    url = response['resourceUris']
+    if protocol == QVRStreamingProtocol.RTSP:
+        url = url.replace('rtsp://', 'rtsp://{username}:{password}@'.format(username = credentials[0], password = credentials[1]))
+    return url
+
+def _closeStreamArgs(protocol: QVRStreamingProtocol, stream: int, token: str) -> tuple:
+    """Return the stream and token arguments used to delete an open stream"""
+    if protocol == QVRStreamingProtocol.RTSP:
+        return ('rtsp', None)
+    return (stream, token)
+
+class _StreamBase:
+    """The state of a Camera Stream in QVR Pro, shared by Stream and the asyncio client's AsyncStream
+
+    Streams are slotted to keep large inventories compact. The resolution and quality are kept as
+    returned by QVR Pro and parsed only when read.
+    """
+
+    __slots__ = ('_camera', '_raw', 'stream', 'status', 'video_codec', 'frame_rate', '__username', '__password', '__stream_url', '__token', '__protocol')
+
+    _RAW_KEYS: Tuple[str, ...] = ('resolution', 'quality')
+    _FIELDS: Tuple[str, ...] = ('stream', 'status', 'video_codec', 'video_resolution_width', 'video_resolution_height', 'video_quality', 'frame_rate')
+
+    video_resolution_width: int = _LazyField(0, _resolutionWidth, _storeWidth)
+    video_resolution_height: int = _LazyField(0, _resolutionHeight, _storeHeight)
+    video_quality: str = _LazyField(1, _parseVideoQuality)
 
     def __init__(self, camera, values: dict, username: str = None, password: str = None):
+        """Initialise the stream, using the Camera's credentials where none are given"""
         self._camera = camera
         self.__username: str = username
         self.__password: str = password
 #       Some cameras do not return with a stream, so a default is created based off the Camera
         if values != None:
+            get = values.get
             self.stream: int = values['stream']
-            self.status: QVRCamStatus = _checkValue(values, 'status')
-            self.video_codec: str = _checkValue(values, 'videoCodec')
-            res = _checkVideoResolution(values, 'resolution')
-            self.video_resolution_width: int = res[0]
-            self.video_resolution_height: int = res[1]
-            self.video_quality: str = _checkVideoQuality(values, 'quality')
-            self.frame_rate: int = _checkValue(values, 'frameRate')
+            self.status: QVRCamStatus = _cleanValue(get('status'))
+            self.video_codec: str = _cleanValue(get('videoCodec'))
+            self.frame_rate: int = _cleanValue(get('frameRate'))
+            self._raw: tuple = tuple(map(get, self._RAW_KEYS))
         self.__stream_url: str = None
         self.__token: str = None
         self.__protocol: QVRStreamingProtocol = None
-            
-    def openStream(self, protocol: QVRStreamingProtocol = QVRStreamingProtocol.RTSP) -> str:
-        """Open a Stream using the selected protocol, the protocol defaults to RTSP"""
-        #Store the returned stream URL and authorisation token, and return the URL
-        response = api_liveStreamOpen(self._camera._instance.url, self._camera._instance.sid, self._camera.guid, self.stream, protocol.value)
+
+    def _values(self) -> dict:
+        """Return the stream list entry this Stream was created from"""
+        values = {'stream' : self.stream, 'status' : self.status, 'videoCodec' : self.video_codec, 'frameRate' : self.frame_rate}
+        values.update(zip(self._RAW_KEYS, self._raw))
+        return values
+
+    def _streamOpened(self, protocol: QVRStreamingProtocol, response: dict) -> str:
+        """Store the returned stream URL and authorisation token, and return the URL"""
         self.__protocol = protocol
-        self.__stream_url = response['resourceUris']
-        if self.__protocol == QVRStreamingProtocol.RTSP:
-            self.__stream_url = self.__stream_url.replace('rtsp://', 'rtsp://{username}:{password}@'.format(username = self.__username, password = self.__password))
+        self.__stream_url = _streamURL(protocol, response, self._credentials())
         if 'streamingToken' in response:
             self.__token = response['streamingToken']
         return self.__stream_url
@@ -72,20 +149,46 @@ class Stream:
     def streamURL(self) -> str:
         return self.__stream_url
 
-    def closeStream(self) -> None:
-        """Close the open stream"""
-        if self.__protocol == QVRStreamingProtocol.RTSP:
-            response = api_liveStreamDelete(self._camera._instance.url, self._camera._instance.sid, self._camera.guid, 'rtsp', None)
-        else:
-            response = api_liveStreamDelete(self._camera._instance.url, self._camera._instance.sid, self._camera.guid, self.stream, self.__token)
+    def _credentials(self) -> tuple:
+        if self.__username is None and self.__password is None:
+            return self._camera._credentials()
+        return (self.__username, self.__password)
+
+    def _closeStreamArgs(self) -> tuple:
+        """Return the stream and token arguments used to delete the open stream"""
+        return _closeStreamArgs(self.__protocol, self.stream, self.__token)
+
+    def _streamClosed(self) -> None:
         self.__stream_url = None
         self.__token = None
         
+    def toDict(self) -> dict:
+        """Return the public attributes of this Stream"""
+        return {name: getattr(self, name, None) for name in self._FIELDS}
+
     def __str__(self):
-        tempdict = self.__dict__.copy()
-        del tempdict['_camera']
-        del tempdict['_Stream__username']
-        del tempdict['_Stream__password']
-        del tempdict['_Stream__stream_url']
-        del tempdict['_Stream__token']
-        return tempdict
\ No newline at end of file
+        return self.toDict().__str__()
+
+class Stream(_StreamBase):
+    """A representation of a Camera Stream in QVR Pro"""
+
+    __slots__ = ()
+
+    def openStream(self, protocol: QVRStreamingProtocol = QVRStreamingProtocol.RTSP) -> str:
+        """Open a Stream using the selected protocol, the protocol defaults to RTSP"""
+        response = self._camera._instance._call(api_liveStreamOpen, self._camera.guid, self.stream, protocol.value)
+        return self._streamOpened(protocol, response)
+
+    def acquireStream(self, protocol: QVRStreamingProtocol = QVRStreamingProtocol.RTSP):
+        """Return a StreamLease on this Stream from the instance's stream pool, shared with other consumers"""
+        return self._camera._instance.getStreamPool().acquire(self, protocol)
+
+    def openHLS(self, max_workers: int = 4, queue_size: int = 8) -> HLSConsumer:
+        """Return an HLSConsumer following this Stream live, opened over HLS from the instance's stream pool"""
+        lease = self.acquireStream(QVRStreamingProtocol.HLS)
+        return HLSConsumer(self._camera._instance.transport, lease.url, max_workers, queue_size, lease = lease)
+
+    def closeStream(self) -> None:
+        """Close the open stream"""
+        self._camera._instance._call(api_liveStreamDelete, self._camera.guid, *self._closeStreamArgs())
+        self._streamClosed()
@@ -0,0 +1,78 @@
+"""
+HTTP transport used by the QVR Pro API functions.
+
+A Transport owns a pooled, keep-alive requests Session so that repeated calls to the same
+QVR Pro instance reuse their TCP (and TLS) connections instead of handshaking on every call.
+"""
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .metrics import Instrumentation
+
+def _pooledSession(pool_size: int, verify: bool, retry: Retry) -> requests.Session:
+    adapter = HTTPAdapter(pool_connections = pool_size, pool_maxsize = pool_size, max_retries = retry)
+    session = requests.Session()
+    session.verify = verify
+    session.headers['Connection'] = 'keep-alive'
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+class Transport:
+    """A pooled HTTP transport shared by every call made against a QVR Pro instance
+
+    Anything exposing a compatible request(method, url, **kwargs) method returning an object with
+    status_code, text, content and headers attributes may be used in its place, e.g. for testing.
+    """
+
+    def __init__(self, pool_size: int = 10, timeout: float = 30.0, retries: int = 3, backoff_factor: float = 0.5, verify: bool = True, instrumentation: Instrumentation = None):
+        """Initialise the Transport
+
+        pool_size is the number of keep-alive connections held per host, timeout is applied to every
+        request (in seconds) unless overridden, and idempotent requests failing at the connection level
+        or with a 502/503/504 are retried up to retries times with exponential backoff. Where
+        instrumentation is given, every API call made over the transport is recorded with it.
+        """
+        self.timeout: float = timeout
+        self.instrumentation: Instrumentation = instrumentation
+        retry = Retry(
+            total = retries,
+            connect = retries,
+            read = retries,
+            status = retries,
+            backoff_factor = backoff_factor,
+            status_forcelist = [502, 503, 504],
+            raise_on_status = False
+            )
+        # Requests that must not be sent twice, or that have a deadline, are only retried where no connection was made
+        single_retry = Retry(
+            total = retries,
+            connect = retries,
+            read = 0,
+            status = 0,
+            backoff_factor = backoff_factor,
+            raise_on_status = False
+            )
+        self.session: requests.Session = _pooledSession(pool_size, verify, retry)
+        self.single_session: requests.Session = _pooledSession(pool_size, verify, single_retry)
+
+    def request(self, method: str, url: str, retry: bool = True, **kwargs) -> requests.Response:
+        """Perform a request over the pooled session
+
+        Where retry is False, the request is not retried once it has been sent, whether it timed out or
+        failed with a 502/503/504.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        return (self.session if retry else self.single_session).request(method, url, **kwargs)
+
+    def close(self) -> None:
+        """Close all pooled connections"""
+        self.session.close()
+        self.single_session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
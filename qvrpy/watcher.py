@@ -0,0 +1,175 @@
+"""
+Camera status watcher.
+
+A StatusWatcher polls an Instance's camera list on a background thread, diffs the Cameras against
+its own record of the values it last saw and dispatches a CameraStatusEvent per change to every
+subscriber, so any number of consumers share a single poll. Because the watcher keeps its own
+record, it also reports changes applied by other callers of Instance.refreshStatus.
+"""
+import queue
+import threading
+from typing import Callable, Dict, Iterator, List, NamedTuple, Tuple
+
+from .camera import Camera
+from .enums import QVRCamStatus, QVRCameraChange, QVRRecordingStatus
+
+_ENUM_FIELDS: dict = {
+    'status' : QVRCamStatus,
+    'rec_state' : QVRRecordingStatus
+    }
+
+def _typedValue(field: str, val):
+    """Convert status values to their enumerated type, leaving unknown values as they are"""
+    if field in _ENUM_FIELDS and val is not None:
+        try:
+            return _ENUM_FIELDS[field](val)
+        except ValueError:
+            pass
+    return val
+
+class CameraStatusEvent(NamedTuple):
+    """A change to a Camera seen by a StatusWatcher
+
+    For CHANGED events field, old and new describe the changed attribute, with status and rec_state
+    given as QVRCamStatus and QVRRecordingStatus values. They are None for ADDED and REMOVED events.
+    """
+    change: QVRCameraChange
+    guid: str
+    camera: Camera
+    field: str = None
+    old: object = None
+    new: object = None
+
+class StatusWatcher:
+    """Polls an Instance for camera status changes on a background thread shared by all subscribers"""
+
+    def __init__(self, instance, interval: float = 10.0, max_interval: float = 300.0, backoff: float = 2.0, fields: List[str] = None):
+        """Initialise the watcher
+
+        The camera list is polled every interval seconds. Failed polls multiply the interval by backoff,
+        up to max_interval, and a successful poll restores it. Where fields is given only changes to those
+        Camera attributes are reported. Subscribers and error callbacks that raise are skipped, with the
+        exception kept in last_callback_error, and events that do not fit in a full events() queue are
+        counted in dropped_events.
+        """
+        self._instance = instance
+        self.interval: float = interval
+        self.max_interval: float = max_interval
+        self.backoff: float = backoff
+        self.fields: List[str] = fields
+        self.current_interval: float = interval
+        self.last_error: Exception = None
+        self.last_callback_error: Exception = None
+        self.dropped_events: int = 0
+        self.__seen: Dict[str, Tuple[Camera, dict]] = None
+        self.__callbacks: List[Callable[[CameraStatusEvent], None]] = []
+        self.__error_callbacks: List[Callable[[Exception], None]] = []
+        self.__lock: threading.Lock = threading.Lock()
+        self.__stopped: threading.Event = threading.Event()
+        self.__thread: threading.Thread = None
+
+    def subscribe(self, callback: Callable[[CameraStatusEvent], None], on_error: Callable[[Exception], None] = None) -> None:
+        """Call callback with every event, and on_error with any exception raised while polling"""
+        with self.__lock:
+            self.__callbacks.append(callback)
+            if on_error is not None:
+                self.__error_callbacks.append(on_error)
+
+    def unsubscribe(self, callback: Callable[[CameraStatusEvent], None]) -> None:
+        with self.__lock:
+            if callback in self.__callbacks:
+                self.__callbacks.remove(callback)
+
+    def events(self, maxsize: int = 0) -> Iterator[CameraStatusEvent]:
+        """Yield events as they occur, buffered in a queue of up to maxsize events, until the watcher stops"""
+        events = queue.Queue(maxsize)
+        def enqueue(event: CameraStatusEvent) -> None:
+            try:
+                events.put_nowait(event)
+            except queue.Full:
+                with self.__lock:
+                    self.dropped_events += 1
+        self.subscribe(enqueue)
+        try:
+            while not self.__stopped.is_set() or not events.empty():
+                try:
+                    yield events.get(timeout = 1.0)
+                except queue.Empty:
+                    continue
+        finally:
+            self.unsubscribe(enqueue)
+
+    def __snapshot(self) -> Dict[str, Tuple[Camera, dict]]:
+        """Return the watched attributes of every Camera of the instance, by GUID"""
+        fields = self.fields if self.fields is not None else Camera._FIELDS
+        return {camera.guid: (camera, {field: getattr(camera, field, None) for field in fields}) for camera in self._instance.getCameras()}
+
+    def poll(self) -> List[CameraStatusEvent]:
+        """Poll the instance once, dispatching and returning the events since the values last seen"""
+        if self.__seen is None:
+            self.__seen = self.__snapshot()
+        self._instance.refreshStatus()
+        seen, current = self.__seen, self.__snapshot()
+        events = []
+        for guid, (camera, values) in current.items():
+            if guid not in seen:
+                events.append(CameraStatusEvent(QVRCameraChange.ADDED, guid, camera))
+                continue
+            old_values = seen[guid][1]
+            for field, new in values.items():
+                old = old_values.get(field)
+                if old != new:
+                    events.append(CameraStatusEvent(QVRCameraChange.CHANGED, guid, camera, field, _typedValue(field, old), _typedValue(field, new)))
+        for guid, (camera, _) in seen.items():
+            if guid not in current:
+                events.append(CameraStatusEvent(QVRCameraChange.REMOVED, guid, camera))
+        self.__seen = current
+        with self.__lock:
+            callbacks = list(self.__callbacks)
+        for event in events:
+            for callback in callbacks:
+                try:
+                    callback(event)
+                except Exception as e:
+                    self.last_callback_error = e
+        return events
+
+    def __run(self) -> None:
+        while not self.__stopped.wait(self.current_interval):
+            try:
+                self.poll()
+                self.last_error = None
+                self.current_interval = self.interval
+            except Exception as e:
+                self.last_error = e
+                self.current_interval = min(self.current_interval * self.backoff, self.max_interval)
+                with self.__lock:
+                    error_callbacks = list(self.__error_callbacks)
+                for callback in error_callbacks:
+                    try:
+                        callback(e)
+                    except Exception as callback_error:
+                        self.last_callback_error = callback_error
+
+    @property
+    def running(self) -> bool:
+        return self.__thread is not None and self.__thread.is_alive()
+
+    def start(self) -> None:
+        """Start polling on a background daemon thread"""
+        with self.__lock:
+            if self.__thread is not None and self.__thread.is_alive():
+                return
+            self.__stopped.clear()
+            if self.__seen is None:
+                self.__seen = self.__snapshot()
+            self.__thread = threading.Thread(target = self.__run, name = 'qvrpy-status-watcher', daemon = True)
+            self.__thread.start()
+
+    def stop(self) -> None:
+        """Stop polling, waiting for any poll in progress to finish"""
+        self.__stopped.set()
+        thread = self.__thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self.__thread = None
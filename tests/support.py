@@ -0,0 +1,63 @@
+"""
+Shared test support.
+
+Tests run against benchmarks/simulator.py, a local QVR Pro simulator, so that no NVR is needed. Each
+SimulatorTestCase test gets a freshly started simulator, created with the class's simulator_options.
+"""
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from simulator import QVRSimulator
+
+from qvrpy import Instance, Transport
+
+_SIMULATOR_DEFAULTS: dict = {
+    'cameras' : 4,
+    'snapshot_size' : 4096,
+    'recording_size' : 256 * 1024,
+    'logs' : 1000,
+    'supported_models' : 200
+    }
+
+def runAsync(coroutine):
+    """Run a coroutine to completion on a new event loop"""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+class CountingTransport(Transport):
+    """A Transport recording the method and URL of every request made over it"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls: list = []
+
+    def request(self, method: str, url: str, retry: bool = True, **kwargs):
+        self.calls.append((method, url))
+        return super().request(method, url, retry, **kwargs)
+
+class SimulatorTestCase(unittest.TestCase):
+    """A test case served by a QVRSimulator started before, and stopped after, every test"""
+
+    simulator_options: dict = {}
+
+    def setUp(self):
+        options = dict(_SIMULATOR_DEFAULTS)
+        options.update(self.simulator_options)
+        self.simulator = QVRSimulator(**options)
+        self.simulator.start()
+        self.addCleanup(self.simulator.stop)
+
+    def instance(self, connect: bool = True, transport: Transport = None, **kwargs) -> Instance:
+        """Return an Instance of the simulator, connected unless connect is False"""
+        instance = Instance('admin', 'admin', self.simulator.host, self.simulator.port, transport = transport or Transport(retries = 0), **kwargs)
+        self.addCleanup(instance.transport.close)
+        if connect:
+            instance.connect()
+        return instance
@@ -0,0 +1,107 @@
+import unittest
+from datetime import datetime, timezone
+
+from qvrpy import QVRError
+from qvrpy.aio import AsyncCamera, AsyncInstance, AsyncResponse, AsyncStream, AsyncTransport, aiohttp
+from qvrpy.camera import Camera
+from qvrpy.enums import QVRStreamingProtocol
+from qvrpy.stream import Stream
+
+from .support import SimulatorTestCase, runAsync
+
+class FailingTransport(AsyncTransport):
+    """An AsyncTransport answering requests to the given paths with the given QVR Pro error codes"""
+
+    def __init__(self, failures: dict, **kwargs):
+        super().__init__(**kwargs)
+        self.failures: dict = failures
+
+    async def request(self, method: str, url: str, **kwargs) -> AsyncResponse:
+        for path, error_code in self.failures.items():
+            if path in url:
+                return AsyncResponse(500, '{{"error_code" : "{0}"}}'.format(error_code).encode('utf-8'), {}, 'utf-8')
+        return await super().request(method, url, **kwargs)
+
+@unittest.skipIf(aiohttp is None, 'aiohttp is not installed')
+class AsyncInstanceTest(SimulatorTestCase):
+
+    def run_instance(self, test, transport: AsyncTransport = None):
+        """Run test with a connected AsyncInstance of the simulator, closing its transport afterwards"""
+        async def run():
+            instance = AsyncInstance('admin', 'admin', self.simulator.host, self.simulator.port, transport = transport)
+            try:
+                await instance.connect()
+                return await test(instance)
+            finally:
+                await instance.transport.close()
+        return runAsync(run())
+
+    def test_connect_loads_cameras_streams_and_capabilities(self):
+        async def test(instance):
+            cameras = list(await instance.getCameras())
+            self.assertEqual([camera.guid for camera in cameras], [self.simulator.guid(index) for index in range(4)])
+            for camera in cameras:
+                self.assertIsInstance(camera, AsyncCamera)
+                self.assertEqual(len(camera.streams), 2)
+                self.assertIsInstance(camera.getStream(1), AsyncStream)
+            self.assertEqual(instance.camera_capability['act'], 'get_camera_capability')
+            self.assertEqual(instance.event_capability['act'], 'get_event_capability')
+        self.run_instance(test)
+
+    def test_async_model_does_not_inherit_the_synchronous_client(self):
+        self.assertFalse(issubclass(AsyncCamera, Camera))
+        self.assertFalse(issubclass(AsyncStream, Stream))
+        for name in ['iterRecording', 'downloadRecording']:
+            self.assertFalse(hasattr(AsyncCamera, name), name)
+        for name in ['acquireStream', 'openHLS']:
+            self.assertFalse(hasattr(AsyncStream, name), name)
+
+    def test_camera_and_stream_calls_are_awaitable(self):
+        async def test(instance):
+            camera = instance.getCamera(self.simulator.guid(1))
+            image = await camera.getSnapShot(datetime.now(timezone.utc))
+            self.assertEqual(len(image), self.simulator.snapshot_size)
+            recording = await camera.getRecording(datetime.now(timezone.utc), 5, 5)
+            self.assertEqual(len(recording), self.simulator.recording_size)
+            await camera.startAlarm()
+            self.assertEqual(self.simulator.alarms, [camera.guid])
+            stream = camera.getStream(0)
+            url = await stream.openStream(QVRStreamingProtocol.HLS)
+            self.assertEqual(url, stream.streamURL)
+            await stream.closeStream()
+            self.assertIsNone(stream.streamURL)
+        self.run_instance(test)
+
+    def test_expired_session_is_renewed(self):
+        async def test(instance):
+            instance.sid = 'expired'
+            self.assertEqual(len(await instance.getSupportedCameras()), 50)
+            return instance.sid
+        self.assertEqual(self.run_instance(test), 'qvrpy-simulator-sid')
+
+    def test_camera_list_error_is_raised_over_capability_errors(self):
+        async def run():
+            transport = FailingTransport({'/camera/list' : '0xC4000200', '/camera/capability' : '0xB1000008'})
+            instance = AsyncInstance('admin', 'admin', self.simulator.host, self.simulator.port, transport = transport)
+            try:
+                await instance.connect()
+            finally:
+                await transport.close()
+        with self.assertRaises(QVRError) as context:
+            runAsync(run())
+        self.assertEqual(context.exception.error_code, '0xC4000200')
+
+    def test_capability_error_is_raised_where_the_camera_list_succeeds(self):
+        async def run():
+            transport = FailingTransport({'/camera/capability' : '0xB1000008'})
+            instance = AsyncInstance('admin', 'admin', self.simulator.host, self.simulator.port, transport = transport)
+            try:
+                await instance.connect()
+            finally:
+                await transport.close()
+        with self.assertRaises(QVRError) as context:
+            runAsync(run())
+        self.assertEqual(context.exception.error_code, '0xB1000008')
+
+if __name__ == '__main__':
+    unittest.main()
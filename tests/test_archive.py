@@ -0,0 +1,84 @@
+import os
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from qvrpy import LogArchive
+from qvrpy.enums import QVRLogLevel, QVRLogType, QVRSortDirection
+
+from .support import SimulatorTestCase
+
+EPOCH: datetime = datetime.fromtimestamp(1700000000, timezone.utc)
+
+class LogArchiveTest(SimulatorTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.archive = LogArchive(settle_time = 0)
+        self.addCleanup(self.archive.close)
+
+    def logIds(self, instance, start: int, end: int, **kwargs) -> list:
+        logs = instance.iterLogs(QVRLogType.SURVEILLANCE_EVENTS, start_time = EPOCH + timedelta(seconds = start), end_time = EPOCH + timedelta(seconds = end), **kwargs)
+        return [record.log_id for record in logs]
+
+    def test_archived_ranges_are_answered_locally(self):
+        instance = self.instance(log_archive = self.archive)
+        self.assertEqual(self.logIds(instance, 0, 499), list(range(500)))
+        requests = self.simulator.requests
+        self.assertEqual(self.logIds(instance, 100, 199, page_size = 50), list(range(100, 200)))
+        self.assertEqual(self.logIds(instance, 0, 499, sort_direction = QVRSortDirection.DESCENDING), list(range(499, -1, -1)))
+        self.assertEqual(self.simulator.requests, requests)
+
+    def test_only_the_unarchived_remainder_is_fetched(self):
+        instance = self.instance(log_archive = self.archive)
+        self.logIds(instance, 0, 499)
+        requests = self.simulator.requests
+        self.assertEqual(self.logIds(instance, 0, 999), list(range(1000)))
+        # The remaining 500 logs fit in the archive's single page
+        self.assertEqual(self.simulator.requests, requests + 1)
+        self.assertEqual(self.archive.archivedUntil(QVRLogType.SURVEILLANCE_EVENTS.value, EPOCH.timestamp()), EPOCH.timestamp() + 999)
+
+    def test_filters_are_applied_to_archived_logs(self):
+        instance = self.instance(log_archive = self.archive)
+        self.logIds(instance, 0, 999)
+        requests = self.simulator.requests
+        ids = self.logIds(instance, 0, 999, level = [QVRLogLevel.WARNING], channel_id = [2])
+        self.assertEqual(ids, [index for index in range(1000) if index % 3 == 1 and index % 4 == 2])
+        self.assertEqual(self.simulator.requests, requests)
+
+    def test_naive_times_are_archived_as_utc(self):
+        instance = self.instance(log_archive = self.archive)
+        self.logIds(instance, 0, 499)
+        requests = self.simulator.requests
+        naive_start = EPOCH.replace(tzinfo = None)
+        logs = instance.iterLogs(QVRLogType.SURVEILLANCE_EVENTS, start_time = naive_start, end_time = naive_start + timedelta(seconds = 499))
+        self.assertEqual([record.log_id for record in logs], list(range(500)))
+        self.assertEqual(self.simulator.requests, requests)
+
+    def test_unsettled_ranges_are_fetched_again(self):
+        archive = LogArchive(settle_time = time.time() - EPOCH.timestamp())
+        self.addCleanup(archive.close)
+        instance = self.instance(log_archive = archive)
+        self.logIds(instance, 0, 499)
+        requests = self.simulator.requests
+        self.assertEqual(self.logIds(instance, 0, 499), list(range(500)))
+        self.assertEqual(self.simulator.requests, requests + 1)
+
+    def test_archive_persists_between_instances(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'logs.sqlite')
+            archive = LogArchive(path, settle_time = 0)
+            self.logIds(self.instance(log_archive = archive), 0, 499)
+            archive.close()
+            archive = LogArchive(path, settle_time = 0)
+            try:
+                requests = self.simulator.requests
+                self.assertEqual(self.logIds(self.instance(log_archive = archive), 0, 499), list(range(500)))
+                # Only the second instance's connection requests are made
+                self.assertEqual(self.simulator.requests, requests + 2)
+            finally:
+                archive.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import threading
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from qvrpy import SnapshotCache
+
+from .support import SimulatorTestCase
+
+class SnapshotCacheTest(SimulatorTestCase):
+
+    simulator_options = {'latency' : 0.2}
+
+    def setUp(self):
+        super().setUp()
+        self.time = datetime(2023, 11, 14, 22, 13, 20, tzinfo = timezone.utc)
+
+    def test_repeated_snapshots_are_served_from_the_cache(self):
+        cache = SnapshotCache()
+        camera = self.instance(snapshot_cache = cache).getCamera(self.simulator.guid(0))
+        requests = self.simulator.requests
+        image = camera.getSnapShot(self.time)
+        self.assertEqual(camera.getSnapShot(self.time + timedelta(milliseconds = 500)), image)
+        self.assertEqual(self.simulator.requests, requests + 1)
+        camera.getSnapShot(self.time + timedelta(seconds = 1))
+        self.assertEqual(self.simulator.requests, requests + 2)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_expired_snapshots_are_fetched_again(self):
+        instance = self.instance(snapshot_cache = SnapshotCache(ttl = 0.1))
+        requests = self.simulator.requests
+        instance.getSnapShot(self.simulator.guid(0), self.time)
+        time.sleep(0.15)
+        instance.getSnapShot(self.simulator.guid(0), self.time)
+        self.assertEqual(self.simulator.requests, requests + 2)
+
+    def test_least_recently_used_snapshots_are_evicted(self):
+        cache = SnapshotCache(max_bytes = 2 * self.simulator.snapshot_size)
+        instance = self.instance(snapshot_cache = cache)
+        guids = [self.simulator.guid(index) for index in range(3)]
+        instance.getSnapShot(guids[0], self.time)
+        instance.getSnapShot(guids[1], self.time)
+        instance.getSnapShot(guids[0], self.time)
+        instance.getSnapShot(guids[2], self.time)
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(cache.size, 2 * self.simulator.snapshot_size)
+        requests = self.simulator.requests
+        instance.getSnapShot(guids[0], self.time)
+        self.assertEqual(self.simulator.requests, requests)
+        instance.getSnapShot(guids[1], self.time)
+        self.assertEqual(self.simulator.requests, requests + 1)
+
+    def test_concurrent_requests_share_one_fetch(self):
+        cache = SnapshotCache()
+        instance = self.instance(snapshot_cache = cache)
+        requests = self.simulator.requests
+        images = []
+        threads = [threading.Thread(target = lambda: images.append(instance.getSnapShot(self.simulator.guid(0), self.time))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(images), 8)
+        self.assertEqual(self.simulator.requests, requests + 1)
+        self.assertEqual((cache.misses, cache.coalesced), (1, 7))
+
+class SnapshotCacheErrorTest(unittest.TestCase):
+
+    def test_errors_are_shared_but_not_cached(self):
+        cache = SnapshotCache()
+        image_time = datetime(2023, 11, 14, tzinfo = timezone.utc)
+        started = threading.Event()
+        def failingFetch():
+            started.set()
+            time.sleep(0.1)
+            raise ValueError('No image')
+        errors = []
+        def waiter():
+            started.wait()
+            try:
+                cache.get('guid', image_time, lambda: b'unused')
+            except ValueError as e:
+                errors.append(e)
+        thread = threading.Thread(target = waiter)
+        thread.start()
+        with self.assertRaises(ValueError):
+            cache.get('guid', image_time, failingFetch)
+        thread.join()
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.get('guid', image_time, lambda: b'image'), b'image')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+
+from qvrpy import Camera, Stream
+
+from .support import SimulatorTestCase
+
+# The benchmarks directory is on the path once .support is imported
+from camera_memory import LegacyCamera, cameraValues, measure, streamValues
+
+class CameraTest(unittest.TestCase):
+
+    def setUp(self):
+        self.values = cameraValues(7)
+        self.stream_values = [streamValues(stream) for stream in range(3)]
+        self.camera = Camera(None, self.values, self.stream_values)
+
+    def test_attributes_match_the_dict_based_camera(self):
+        legacy = LegacyCamera(None, self.values, self.stream_values)
+        for name in Camera._FIELDS:
+            self.assertEqual(getattr(self.camera, name), getattr(legacy, name), name)
+        for stream, legacy_stream in zip(self.camera.streams, legacy.streams):
+            for name in Stream._FIELDS:
+                self.assertEqual(getattr(stream, name), getattr(legacy_stream, name), name)
+        self.assertEqual((self.camera.video_resolution_width, self.camera.video_quality), (1920, 'VeryHigh'))
+
+    def test_cameras_and_streams_are_slotted(self):
+        self.assertFalse(hasattr(self.camera, '__dict__'))
+        self.assertFalse(hasattr(self.camera.getStream(0), '__dict__'))
+        with self.assertRaises(AttributeError):
+            self.camera.unknown = 1
+
+    def test_lazy_fields_can_be_set(self):
+        self.camera.video_resolution_width = 1280
+        self.camera.ip = '10.9.9.9'
+        self.assertEqual((self.camera.video_resolution_width, self.camera.video_resolution_height), (1280, 1080))
+        self.assertEqual(self.camera._values()['video_resolution_setting'], '1280x1080')
+        self.assertEqual(self.camera.ip, '10.9.9.9')
+        stream = self.camera.getStream(1)
+        stream.video_resolution_height = 480
+        self.assertEqual((stream.video_resolution_width, stream.video_resolution_height), (1280, 480))
+
+    def test_serialisation_leaves_out_credentials(self):
+        values = self.camera.toDict()
+        self.assertEqual(set(values), set(Camera._FIELDS) | {'streams'})
+        self.assertEqual(values['streams'][2], self.camera.getStream(2).toDict())
+        self.assertEqual(str(self.camera), str(values))
+        self.assertNotIn('secret', str(self.camera))
+
+    def test_inventory_is_smaller_than_the_dict_based_baseline(self):
+        camera_values = [cameraValues(index) for index in range(500)]
+        baseline = measure(LegacyCamera, camera_values, self.stream_values)
+        current = measure(Camera, camera_values, self.stream_values)
+        self.assertLess(current['retained'], baseline['retained'])
+
+class SimulatorCameraTest(SimulatorTestCase):
+
+    def test_cameras_are_built_from_the_camera_list(self):
+        camera = self.instance().getCamera(self.simulator.guid(2))
+        self.assertEqual((camera.name, camera.ip, camera.port), ('Camera 2', '10.0.0.2', 80))
+        self.assertEqual(camera._values(), {key: val for key, val in self.simulator.cameraValues(2).items() if key != 'events'})
+
+if __name__ == '__main__':
+    unittest.main()
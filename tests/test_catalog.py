@@ -0,0 +1,76 @@
+import tempfile
+import threading
+import unittest
+
+from qvrpy import CameraCatalog, CatalogCache, SupportedModel
+
+from .support import CountingTransport, SimulatorTestCase
+
+class CameraCatalogTest(SimulatorTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.catalog = CameraCatalog(self.simulator.supportValues())
+
+    def test_models_are_looked_up_regardless_of_case(self):
+        self.assertEqual(len(self.catalog), 200)
+        self.assertEqual(self.catalog.umsid('brand07', 'MODEL-00057'), 'BRAND07-MODEL00057')
+        self.assertEqual(self.catalog.get('Brand07', 'Model-00057'), SupportedModel('Brand07', 'Model-00057', 'BRAND07-MODEL00057'))
+        self.assertIsNone(self.catalog.umsid('Brand07', 'Model-00058'))
+        self.assertEqual(self.catalog.getByUmsid('BRAND08-MODEL00058').model, 'Model-00058')
+        self.assertEqual([model.model for model in self.catalog.models('Brand49')], ['Model-00049', 'Model-00099', 'Model-00149', 'Model-00199'])
+        self.assertEqual(len(self.catalog.brands), 50)
+
+    def test_models_are_searched_by_prefix(self):
+        self.assertEqual([model.model for model in self.catalog.search('model-0001')], ['Model-{0:05d}'.format(index) for index in range(10, 20)])
+        self.assertEqual([model.model for model in self.catalog.search('MODEL-000', brand = 'brand01')], ['Model-00001', 'Model-00051'])
+        self.assertEqual(len(self.catalog.search('model', limit = 5)), 5)
+        self.assertEqual(self.catalog.search('camera'), [])
+
+    def test_lists_keep_the_supported_cameras_format(self):
+        brands = self.catalog.toList()
+        self.assertEqual(brands[0]['brand'], 'Brand00')
+        self.assertEqual(brands[0]['models'][1], {'model' : 'Model-00050', 'umsid' : 'BRAND00-MODEL00050'})
+        # The index keeps the response as fetched, so listing it twice gives the same result
+        self.assertEqual(self.catalog.toList(), brands)
+
+class CatalogCacheTest(SimulatorTestCase):
+
+    def catalogInstance(self, cache: CatalogCache = None):
+        self.transport = CountingTransport(retries = 0)
+        return self.instance(transport = self.transport, catalog_cache = cache)
+
+    def supportCalls(self) -> int:
+        return len([url for method, url in self.transport.calls if '/camera/support' in url])
+
+    def test_the_catalog_is_downloaded_once(self):
+        instance = self.catalogInstance()
+        catalogs = []
+        threads = [threading.Thread(target = lambda: catalogs.append(instance.getCameraCatalog())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(all(catalog is catalogs[0] for catalog in catalogs))
+        self.assertEqual(instance.getSupportedCameras()[3]['brand'], 'Brand03')
+        self.assertEqual(self.supportCalls(), 1)
+        self.assertIsNot(instance.getCameraCatalog(refresh = True), catalogs[0])
+        self.assertEqual(self.supportCalls(), 2)
+
+    def test_expired_catalogs_are_downloaded_again(self):
+        instance = self.catalogInstance(CatalogCache(max_age = -1))
+        instance.getCameraCatalog()
+        instance.getCameraCatalog()
+        self.assertEqual(self.supportCalls(), 2)
+
+    def test_catalogs_are_kept_on_disk(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.catalogInstance(CatalogCache(directory = directory)).getCameraCatalog()
+            instance = self.catalogInstance(CatalogCache(directory = directory))
+            self.assertEqual(instance.getCameraCatalog().umsid('Brand02', 'Model-00102'), 'BRAND02-MODEL00102')
+            self.assertEqual(self.supportCalls(), 0)
+            CatalogCache(directory = directory).clear(instance.url)
+            self.assertIsNone(CatalogCache(directory = directory).get(instance.url))
+
+if __name__ == '__main__':
+    unittest.main()
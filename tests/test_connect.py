@@ -0,0 +1,35 @@
+import time
+import unittest
+
+from .support import SimulatorTestCase
+
+class ConnectTest(SimulatorTestCase):
+
+    simulator_options = {'cameras' : 16, 'latency' : 0.05}
+
+    def test_connect_loads_every_camera(self):
+        instance = self.instance()
+        guids = [camera.guid for camera in instance.getCameras()]
+        self.assertEqual(guids, [self.simulator.guid(index) for index in range(16)])
+        self.assertEqual(instance.getCamera(self.simulator.guid(3)).name, 'Camera 3')
+
+    def test_capabilities_are_kept_once_fetched(self):
+        instance = self.instance()
+        requests = self.simulator.requests
+        self.assertEqual(instance.camera_capability['act'], 'get_camera_capability')
+        self.assertEqual(instance.event_capability['act'], 'get_event_capability')
+        instance.camera_capability
+        instance.event_capability
+        self.assertEqual(self.simulator.requests, requests + 2)
+
+    def test_stream_lists_are_fetched_concurrently(self):
+        instance = self.instance(max_workers = 8)
+        started = time.monotonic()
+        self.assertEqual(instance.prefetchStreams(), {})
+        elapsed = time.monotonic() - started
+        # Fetched one at a time, the 16 stream lists would take at least 0.8 seconds
+        self.assertLess(elapsed, 0.6)
+        self.assertTrue(all(len(camera.streams) == 2 for camera in instance.getCameras()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+import requests
+
+from qvrpy import ControlResult, Transport
+from qvrpy.enums import QVRRecordingStatus
+
+from .support import SimulatorTestCase
+
+class FailingControlTransport(Transport):
+    """A Transport failing the control commands of the given cameras, and the camera list once failing_list is set"""
+
+    def __init__(self, failing_guids: list = None, **kwargs):
+        super().__init__(**kwargs)
+        self.failing_guids: list = failing_guids or []
+        self.failing_list: bool = False
+
+    def request(self, method: str, url: str, retry: bool = True, **kwargs):
+        if method == 'PUT' and any('/{0}/'.format(guid) in url for guid in self.failing_guids):
+            raise requests.exceptions.ConnectionError('Camera unavailable')
+        if self.failing_list and url.endswith('/camera/list'):
+            raise requests.exceptions.ConnectionError('Camera list unavailable')
+        return super().request(method, url, retry, **kwargs)
+
+class ControlTest(SimulatorTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.transport = FailingControlTransport([self.simulator.guid(1)], retries = 0)
+        self.qvr = self.instance(transport = self.transport)
+        self.guids = [self.simulator.guid(index) for index in range(4)]
+
+    def test_recording_is_stopped_and_verified(self):
+        results = self.qvr.stopRecording(verify = True)
+        self.assertEqual(sorted(results), self.guids)
+        self.assertEqual(results[self.guids[0]], ControlResult(self.guids[0], None, QVRRecordingStatus.NOT_RECORDING, True))
+        failed = results[self.guids[1]]
+        self.assertIsInstance(failed.error, requests.exceptions.ConnectionError)
+        self.assertEqual((failed.rec_state, failed.verified), (QVRRecordingStatus.RECORDING, False))
+        self.assertEqual([guid for guid, result in results.items() if result.succeeded], [self.guids[0]] + self.guids[2:])
+
+    def test_unverified_commands_do_not_list_cameras(self):
+        requests_before = self.simulator.requests
+        results = self.qvr.startAlarm(self.guids[2:])
+        self.assertEqual(self.simulator.requests, requests_before + 2)
+        self.assertEqual(self.simulator.alarms, sorted(self.guids[2:]))
+        self.assertTrue(all(result.succeeded and result.verified is None for result in results.values()))
+
+    def test_verification_errors_are_reported_for_every_camera(self):
+        self.transport.failing_list = True
+        results = self.qvr.startRecording(self.guids[:2], verify = True)
+        verification_error = results[self.guids[0]].error
+        self.assertIsInstance(verification_error, requests.exceptions.ConnectionError)
+        self.assertEqual(str(verification_error), 'Camera list unavailable')
+        self.assertEqual(str(results[self.guids[1]].error), 'Camera unavailable')
+        self.assertTrue(all(result.rec_state is None and result.verified is None for result in results.values()))
+        self.assertFalse(any(result.succeeded for result in results.values()))
+
+if __name__ == '__main__':
+    unittest.main()
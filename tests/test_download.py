@@ -0,0 +1,101 @@
+import io
+import os
+import tempfile
+import unittest
+from datetime import datetime, timezone
+
+import requests
+
+from qvrpy.download import download
+
+from .support import SimulatorTestCase
+
+class InterruptedResponse:
+    """A streamed response dropping its connection after the given number of bytes"""
+
+    def __init__(self, body: bytes, offset: int, interrupt_at: int):
+        self.status_code: int = 206 if offset > 0 else 200
+        self.headers: dict = {'Content-Range' : 'bytes {0}-{1}/{2}'.format(offset, len(body) - 1, len(body))}
+        self.__body: bytes = body[offset:]
+        self.__interrupt_at: int = interrupt_at
+
+    def iter_content(self, chunk_size: int):
+        for position in range(0, len(self.__body), chunk_size):
+            if position >= self.__interrupt_at:
+                raise requests.exceptions.ConnectionError('Connection dropped')
+            yield self.__body[position:position + chunk_size]
+
+    def close(self):
+        pass
+
+class DownloadTest(SimulatorTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.camera = self.instance().getCamera(self.simulator.guid(0))
+        self.time = datetime.now(timezone.utc)
+        self.recording = self.camera.getRecording(self.time, 5, 5)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'recording.mp4')
+
+    def test_iter_recording_yields_bounded_chunks(self):
+        chunks = list(self.camera.iterRecording(self.time, 5, 5, chunk_size = 16 * 1024))
+        self.assertEqual(b''.join(chunks), self.recording)
+        self.assertTrue(all(len(chunk) <= 16 * 1024 for chunk in chunks))
+        self.assertEqual(b''.join(self.camera.iterRecording(self.time, 5, 5, offset = 1000)), self.recording[1000:])
+
+    def test_download_to_a_path_reports_progress(self):
+        reported = []
+        size = self.camera.downloadRecording(self.path, self.time, 5, 5, chunk_size = 32 * 1024, progress = reported.append)
+        self.assertEqual(size, len(self.recording))
+        with open(self.path, 'rb') as fileobj:
+            self.assertEqual(fileobj.read(), self.recording)
+        self.assertEqual([progress.bytes_received for progress in reported], list(range(32 * 1024, len(self.recording) + 1, 32 * 1024)))
+        self.assertTrue(all(progress.total_bytes == len(self.recording) for progress in reported))
+
+    def test_download_to_a_file_object(self):
+        fileobj = io.BytesIO()
+        self.assertEqual(self.camera.downloadRecording(fileobj, self.time, 5, 5), len(self.recording))
+        self.assertEqual(fileobj.getvalue(), self.recording)
+
+    def test_partial_file_is_resumed(self):
+        with open(self.path, 'wb') as fileobj:
+            fileobj.write(self.recording[:100000])
+        self.assertEqual(self.camera.downloadRecording(self.path, self.time, 5, 5), len(self.recording))
+        with open(self.path, 'rb') as fileobj:
+            self.assertEqual(fileobj.read(), self.recording)
+
+    def test_complete_file_is_not_downloaded_again(self):
+        with open(self.path, 'wb') as fileobj:
+            fileobj.write(self.recording)
+        self.assertEqual(self.camera.downloadRecording(self.path, self.time, 5, 5), len(self.recording))
+        self.assertEqual(os.path.getsize(self.path), len(self.recording))
+
+    def test_download_without_resume_overwrites(self):
+        with open(self.path, 'wb') as fileobj:
+            fileobj.write(b'x' * 100)
+        self.camera.downloadRecording(self.path, self.time, 5, 5, resume = False)
+        with open(self.path, 'rb') as fileobj:
+            self.assertEqual(fileobj.read(), self.recording)
+
+class InterruptedDownloadTest(unittest.TestCase):
+
+    def test_interrupted_connections_are_resumed(self):
+        body = bytes(range(256)) * 64
+        offsets = []
+        def openResponse(offset: int):
+            offsets.append(offset)
+            return InterruptedResponse(body, offset, 4096)
+        fileobj = io.BytesIO()
+        self.assertEqual(download(openResponse, fileobj, chunk_size = 1024, retries = 5), len(body))
+        self.assertEqual(fileobj.getvalue(), body)
+        self.assertEqual(offsets, [0, 4096, 8192, 12288])
+
+    def test_retries_are_bounded(self):
+        body = bytes(1024 * 16)
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            download(lambda offset: InterruptedResponse(body, offset, 1024), io.BytesIO(), chunk_size = 1024, retries = 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import tempfile
+import time
+import unittest
+from datetime import datetime, timezone
+
+import requests
+
+from qvrpy import RecordingSpec, Transport
+
+from .support import SimulatorTestCase
+
+class UnreachableCameraTransport(Transport):
+    """A Transport failing every request for the given camera GUID with a connection error"""
+
+    def __init__(self, guid: str, **kwargs):
+        super().__init__(**kwargs)
+        self.guid: str = guid
+
+    def request(self, method: str, url: str, retry: bool = True, **kwargs):
+        if self.guid in url and '/recordingfile/' in url:
+            raise requests.exceptions.ConnectionError('Camera unreachable')
+        return super().request(method, url, retry, **kwargs)
+
+class ExportTest(SimulatorTestCase):
+
+    simulator_options = {'recording_size' : 64 * 1024, 'latency' : 0.2}
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = os.path.join(directory.name, 'export')
+        self.time = datetime(2023, 11, 14, 22, 13, 20, tzinfo = timezone.utc)
+        self.specs = [RecordingSpec(self.simulator.guid(index), self.time, 5, 5) for index in range(4)]
+
+    def test_recordings_are_exported_concurrently(self):
+        instance = self.instance()
+        started = time.monotonic()
+        manifest = instance.exportRecordings(self.specs, self.directory, max_workers = 4)
+        # Exported one at a time, the 4 recordings would take at least 0.8 seconds
+        self.assertLess(time.monotonic() - started, 0.6)
+        self.assertEqual([result.spec for result in manifest.results], self.specs)
+        self.assertEqual(len(manifest.succeeded), 4)
+        self.assertEqual(manifest.total_bytes, 4 * self.simulator.recording_size)
+        for result in manifest.results:
+            self.assertEqual(os.path.basename(result.path), result.spec.defaultFilename())
+            self.assertEqual(os.path.getsize(result.path), result.size)
+
+    def test_failures_are_reported_in_the_manifest(self):
+        instance = self.instance(transport = UnreachableCameraTransport(self.simulator.guid(2), retries = 0))
+        manifest = instance.exportRecordings(self.specs, self.directory, max_workers = 4, retries = 0)
+        self.assertEqual([result.spec.guid for result in manifest.failed], [self.simulator.guid(2)])
+        self.assertIsInstance(manifest.failed[0].error, requests.exceptions.ConnectionError)
+        self.assertFalse(os.path.exists(manifest.failed[0].path))
+        self.assertEqual(len(manifest.succeeded), 3)
+
+    def test_duplicate_filenames_are_refused_before_downloading(self):
+        instance = self.instance()
+        requests_made = self.simulator.requests
+        with self.assertRaises(ValueError):
+            instance.exportRecordings(self.specs + [self.specs[0]._replace(pre_period = 5)], self.directory)
+        self.assertEqual(self.simulator.requests, requests_made)
+        self.assertFalse(os.path.exists(self.directory))
+
+class ExportBandwidthTest(SimulatorTestCase):
+
+    simulator_options = {'recording_size' : 64 * 1024}
+
+    def test_bandwidth_cap_is_shared_by_every_download(self):
+        instance = self.instance()
+        specs = [RecordingSpec(self.simulator.guid(index), datetime.now(timezone.utc), 5, 5) for index in range(4)]
+        with tempfile.TemporaryDirectory() as directory:
+            started = time.monotonic()
+            manifest = instance.exportRecordings(specs, directory, max_workers = 4, max_bytes_per_second = 128 * 1024)
+            elapsed = time.monotonic() - started
+        self.assertEqual(manifest.total_bytes, 256 * 1024)
+        # The first second's allowance is available at once, the remaining 128KB take another second
+        self.assertGreater(elapsed, 0.8)
+
+if __name__ == '__main__':
+    unittest.main()
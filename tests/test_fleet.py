@@ -0,0 +1,97 @@
+import time
+import unittest
+from datetime import datetime, timezone
+
+from qvrpy import Fleet, Instance, QVRError, Transport
+
+from .support import SimulatorTestCase
+
+# The benchmarks directory is on the path once .support is imported
+from simulator import QVRSimulator
+
+class FailingPartWayInstance(Instance):
+    """An Instance whose snapshot fan-out fails once it has yielded the given number of results"""
+
+    def __init__(self, *args, fail_after: int = 2, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fail_after: int = fail_after
+
+    def getSnapshots(self, *args, **kwargs):
+        for count, result in enumerate(super().getSnapshots(*args, **kwargs)):
+            if count == self.fail_after:
+                raise QVRError('Host lost part way through')
+            yield result
+
+class SlowSnapshotTransport(Transport):
+    """A Transport delaying every snapshot request"""
+
+    def request(self, method: str, url: str, retry: bool = True, **kwargs):
+        if '/snapshot/' in url:
+            time.sleep(0.2)
+        return super().request(method, url, retry, **kwargs)
+
+class FleetTest(SimulatorTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.other = QVRSimulator(cameras = 2)
+        self.other.start()
+        self.addCleanup(self.other.stop)
+        self.time = datetime.now(timezone.utc)
+
+    def fleetInstance(self, simulator: QVRSimulator, instance_class = Instance, transport: Transport = None, **kwargs) -> Instance:
+        instance = instance_class('admin', 'admin', simulator.host, simulator.port, transport = transport or Transport(retries = 0), **kwargs)
+        self.addCleanup(instance.transport.close)
+        return instance
+
+    def test_unreachable_hosts_do_not_fail_the_fleet(self):
+        unreachable = QVRSimulator()
+        unreachable.start()
+        unreachable.stop()
+        fleet = Fleet([self.fleetInstance(self.simulator), self.fleetInstance(self.other), self.fleetInstance(unreachable)])
+        results = fleet.connect()
+        self.assertEqual(len(results), 3)
+        self.assertFalse(results['{0}:{1}'.format(unreachable.host, unreachable.port)].succeeded)
+        self.assertEqual(len(fleet.connected), 2)
+        cameras = fleet.getCameras()
+        self.assertEqual(len(cameras), 6)
+        host = fleet.connected[1]
+        self.assertIs(cameras[(host, self.other.guid(1))], fleet.getCamera(host, self.other.guid(1)))
+
+    def test_fleets_do_not_share_default_instances(self):
+        first = Fleet()
+        first.add(self.fleetInstance(self.simulator))
+        self.assertEqual(Fleet().hosts, [])
+
+    def test_snapshots_are_yielded_for_every_host(self):
+        fleet = Fleet([self.fleetInstance(self.simulator), self.fleetInstance(self.other)])
+        fleet.connect()
+        snapshots = list(fleet.getSnapshots(self.time))
+        self.assertEqual(sorted((snapshot.host, snapshot.guid) for snapshot in snapshots), sorted(fleet.getCameras()))
+        self.assertTrue(all(snapshot.error is None for snapshot in snapshots))
+
+    def test_hosts_failing_part_way_report_only_the_rest(self):
+        failing = self.fleetInstance(self.simulator, FailingPartWayInstance, max_workers = 1)
+        fleet = Fleet([failing, self.fleetInstance(self.other)])
+        fleet.connect()
+        host = fleet.hosts[0]
+        snapshots = [snapshot for snapshot in fleet.getSnapshots(self.time) if snapshot.host == host]
+        self.assertEqual(sorted(snapshot.guid for snapshot in snapshots), [self.simulator.guid(index) for index in range(4)])
+        self.assertEqual(len([snapshot for snapshot in snapshots if snapshot.error is None]), 2)
+        self.assertTrue(all(isinstance(snapshot.error, QVRError) for snapshot in snapshots if snapshot.image is None))
+
+    def test_stopping_early_stops_the_hosts(self):
+        fleet = Fleet([self.fleetInstance(self.simulator, transport = SlowSnapshotTransport(retries = 0))], per_host_workers = 1)
+        fleet.connect()
+        snapshots = fleet.getSnapshots(self.time)
+        next(snapshots)
+        snapshots.close()
+        time.sleep(0.5)
+        stopped_at = self.simulator.requests
+        time.sleep(0.5)
+        self.assertEqual(self.simulator.requests, stopped_at)
+        # Fetching every snapshot would make six requests with the login and camera list
+        self.assertLess(stopped_at, 6)
+
+if __name__ == '__main__':
+    unittest.main()
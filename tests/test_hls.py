@@ -0,0 +1,100 @@
+import io
+import time
+import unittest
+
+from qvrpy import HLSConsumer, QVRError
+from qvrpy.enums import QVRStreamingProtocol
+from qvrpy.hls import _parsePlaylist
+
+from .support import CountingTransport, SimulatorTestCase
+
+class PlaylistTest(unittest.TestCase):
+
+    def test_segments_are_numbered_from_the_media_sequence(self):
+        playlist = _parsePlaylist('#EXTM3U\n#EXT-X-TARGETDURATION:2\n#EXT-X-MEDIA-SEQUENCE:7\n#EXTINF:2.000,\n7.ts\n#EXTINF:1.5,\nhttp://other/8.ts\n#EXT-X-ENDLIST\n', 'http://nvr/hls/live.m3u8')
+        self.assertEqual(playlist.segments, [(7, 'http://nvr/hls/7.ts', 2.0), (8, 'http://other/8.ts', 1.5)])
+        self.assertEqual((playlist.target_duration, playlist.ended, playlist.variants), (2.0, True, []))
+
+    def test_variants_are_listed(self):
+        playlist = _parsePlaylist('#EXTM3U\n#EXT-X-STREAM-INF:BANDWIDTH=800000\nlow/live.m3u8\n', 'http://nvr/hls/master.m3u8')
+        self.assertEqual((playlist.variants, playlist.segments), (['http://nvr/hls/low/live.m3u8'], []))
+
+class HLSConsumerTest(SimulatorTestCase):
+
+    simulator_options = {'segment_duration' : 0.05, 'segment_size' : 4096}
+
+    def setUp(self):
+        super().setUp()
+        self.transport = CountingTransport(retries = 0)
+        self.qvr = self.instance(transport = self.transport)
+        self.playlist = '{0}/hls/{1}/0/live.m3u8'.format(self.simulator.url, self.simulator.guid(0))
+
+    def consumer(self, **kwargs) -> HLSConsumer:
+        consumer = HLSConsumer(self.transport, self.playlist, poll_interval = 0.02, **kwargs)
+        self.addCleanup(consumer.stop)
+        return consumer
+
+    def segmentCalls(self) -> int:
+        return len([url for method, url in self.transport.calls if url.endswith('.ts')])
+
+    def test_segments_are_delivered_in_order(self):
+        consumer = self.consumer()
+        segments = []
+        for segment in consumer:
+            segments.append(segment)
+            if len(segments) == 10:
+                break
+        sequences = [segment.sequence for segment in segments]
+        self.assertEqual(sequences, list(range(sequences[0], sequences[0] + 10)))
+        self.assertTrue(all(segment.data == b'\x47' * 4096 and segment.duration == 0.05 for segment in segments))
+        stats = consumer.stats()
+        self.assertEqual((stats.segments, stats.bytes_received, stats.errors), (10, 40960, 0))
+        self.assertGreater(stats.bytes_per_second, 0)
+
+    def test_recording_stops_after_the_limit(self):
+        destination = io.BytesIO()
+        self.assertEqual(self.consumer().record(destination, max_segments = 3), 3 * 4096)
+        self.assertEqual(len(destination.getvalue()), 3 * 4096)
+        # Four segments of 0.05 seconds make up 0.2 seconds of media
+        self.assertEqual(self.consumer().record(io.BytesIO(), max_duration = 0.2), 4 * 4096)
+
+    def test_slow_readers_hold_back_prefetching(self):
+        consumer = self.consumer(max_workers = 2, queue_size = 2)
+        segments = iter(consumer)
+        next(segments)
+        time.sleep(0.5)
+        # One segment delivered, two queued ahead of the reader and none fetched beyond them
+        self.assertLessEqual(self.segmentCalls(), 3)
+        for _ in range(3):
+            next(segments)
+        self.assertGreater(consumer.stats().skipped, 0)
+        segments.close()
+
+    def test_stopping_iteration_stops_fetching(self):
+        segments = iter(self.consumer())
+        next(segments)
+        segments.close()
+        time.sleep(0.1)
+        fetched = len(self.transport.calls)
+        time.sleep(0.2)
+        self.assertEqual(len(self.transport.calls), fetched)
+
+    def test_playlist_failures_end_iteration_with_the_error(self):
+        self.playlist = '{0}/hls/missing.m3u8'.format(self.simulator.url)
+        consumer = self.consumer(retries = 1)
+        with self.assertRaises(QVRError):
+            list(consumer)
+        self.assertEqual(consumer.stats().errors, 2)
+
+    def test_streams_open_hls_over_a_pooled_lease(self):
+        stream = self.qvr.getCamera(self.simulator.guid(1)).getStream(0)
+        consumer = stream.openHLS(max_workers = 2)
+        lease = stream.acquireStream(QVRStreamingProtocol.HLS)
+        self.assertEqual(consumer.url, lease.url)
+        lease.release()
+        for segment in consumer:
+            break
+        self.assertEqual(lease.session.refcount, 0)
+
+if __name__ == '__main__':
+    unittest.main()
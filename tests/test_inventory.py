@@ -0,0 +1,74 @@
+import json
+import os
+import tempfile
+import unittest
+
+from qvrpy import InventoryCache
+
+from .support import CountingTransport, SimulatorTestCase
+
+class InventoryCacheTest(SimulatorTestCase):
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache = InventoryCache(directory.name)
+
+    def cachedInstance(self, cache: InventoryCache = None):
+        self.transport = CountingTransport(retries = 0)
+        return self.instance(transport = self.transport, inventory_cache = cache or self.cache)
+
+    def paths(self) -> list:
+        return [url.split('?')[0][len(self.simulator.url):] for method, url in self.transport.calls]
+
+    def test_cold_connects_save_the_inventory(self):
+        instance = self.cachedInstance()
+        self.assertIsNone(instance.inventory_validation)
+        inventory = self.cache.load(instance.url)
+        self.assertEqual([camera['guid'] for camera in inventory['cameras']], [self.simulator.guid(index) for index in range(4)])
+        self.assertEqual(inventory['streams'], {})
+        instance.prefetchStreams()
+        self.assertEqual(len(self.cache.load(instance.url)['streams']), 4)
+
+    def test_warm_connects_validate_with_one_camera_list_request(self):
+        self.cachedInstance().prefetchStreams()
+        instance = self.cachedInstance()
+        changes = instance.inventory_validation.result(timeout = 2)
+        self.assertEqual((changes.added, changes.removed, changes.changed), ([], [], {}))
+        self.assertEqual(sorted(self.paths()), ['/cgi-bin/authLogin.cgi', '/qvrpro/camera/list'])
+        camera = instance.getCamera(self.simulator.guid(2))
+        self.assertEqual((camera.name, len(camera.streams)), ('Camera 2', 2))
+        self.assertEqual(len(self.transport.calls), 2)
+
+    def test_validation_adds_cameras_and_refetches_only_changed_streams(self):
+        self.cachedInstance().prefetchStreams()
+        path = self.cache.path(self.simulator.url)
+        with open(path) as f:
+            inventory = json.load(f)
+        inventory['cameras'][1]['video_resolution_setting'] = '1280x720'
+        with open(path, 'w') as f:
+            json.dump(inventory, f)
+        self.simulator.setCameras(5)
+        instance = self.cachedInstance()
+        changes = instance.inventory_validation.result(timeout = 2)
+        self.assertEqual([camera.guid for camera in changes.added], [self.simulator.guid(4)])
+        self.assertEqual(list(changes.changed), [self.simulator.guid(1)])
+        self.assertEqual([path for path in self.paths() if path.endswith('/streams')], ['/qvrpro/qshare/StreamingOutput/channel/{0}/streams'.format(self.simulator.guid(1))])
+        self.assertEqual(len(self.cache.load(instance.url)['cameras']), 5)
+
+    def test_expired_and_unreadable_inventories_are_ignored(self):
+        instance = self.cachedInstance()
+        self.assertIsNone(InventoryCache(self.cache.directory, max_age = -1).load(instance.url))
+        self.assertIsNone(self.cache.load('http://other:80'))
+        with open(self.cache.path(instance.url), 'w') as f:
+            f.write('{not json')
+        self.assertIsNone(self.cache.load(instance.url))
+        instance = self.cachedInstance()
+        self.assertIsNone(instance.inventory_validation)
+        self.assertIn('/qvrpro/camera/list', self.paths())
+        self.cache.clear(instance.url)
+        self.assertFalse(os.path.exists(self.cache.path(instance.url)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+
+import requests
+
+from qvrpy import Instance, LogQuery, LogRecord, LogTailer, Transport
+from qvrpy.enums import QVRLogLevel, QVRLogType, QVRSortDirection
+from qvrpy.logs import _utc
+
+from .support import SimulatorTestCase
+
+EPOCH: datetime = datetime.fromtimestamp(1700000000, timezone.utc)
+
+class FailingLogsTransport(Transport):
+    """A Transport failing every log search with a connection error"""
+
+    def request(self, method: str, url: str, retry: bool = True, **kwargs):
+        if url.endswith('/logs/logs'):
+            raise requests.exceptions.ConnectionError('Logs unavailable')
+        return super().request(method, url, retry, **kwargs)
+
+class LogIteratorTest(SimulatorTestCase):
+
+    def test_every_log_is_yielded_a_page_at_a_time(self):
+        instance = self.instance()
+        requests = self.simulator.requests
+        logs = instance.iterLogs(QVRLogType.SURVEILLANCE_EVENTS, page_size = 100)
+        records = list(logs)
+        self.assertEqual([record.log_id for record in records], list(range(1000)))
+        self.assertEqual(self.simulator.requests, requests + 10)
+        self.assertEqual(logs.total, 1000)
+        self.assertEqual(records[5].time, datetime.fromtimestamp(1700000005, timezone.utc))
+        self.assertEqual(records[5].level, QVRLogLevel(2))
+        self.assertEqual(records[5].message, 'Motion detected')
+
+    def test_iteration_resumes_from_a_checkpoint(self):
+        instance = self.instance()
+        logs = instance.iterLogs(QVRLogType.SURVEILLANCE_EVENTS, page_size = 100)
+        for record in logs:
+            if record.log_id == 249:
+                break
+        self.assertEqual(logs.checkpoint.index, 250)
+        resumed = instance.iterLogs(QVRLogType.SURVEILLANCE_EVENTS, page_size = 100, checkpoint = logs.checkpoint)
+        self.assertEqual([record.log_id for record in resumed], list(range(250, 1000)))
+
+    def test_descending_iteration_resumes_past_newer_logs(self):
+        instance = self.instance()
+        logs = instance.iterLogs(QVRLogType.SURVEILLANCE_EVENTS, sort_direction = QVRSortDirection.DESCENDING, page_size = 100)
+        for record in logs:
+            if record.log_id == 950:
+                break
+        # Ten newer logs push the records already read ten places further down
+        self.simulator.logs += 10
+        resumed = instance.iterLogs(QVRLogType.SURVEILLANCE_EVENTS, sort_direction = QVRSortDirection.DESCENDING, page_size = 100, checkpoint = logs.checkpoint)
+        self.assertEqual([record.log_id for record in resumed][:3], [949, 948, 947])
+
+    def test_queries_do_not_share_criteria_lists(self):
+        self.assertTrue(all(type(default) != list for default in Instance.iterLogs.__defaults__))
+        query = LogQuery(QVRLogType.SURVEILLANCE_EVENTS)
+        self.assertEqual((query.level, query.channel_id, query.global_channel_id), (None, None, None))
+
+    def test_time_range_is_applied_by_the_server(self):
+        instance = self.instance()
+        logs = instance.iterLogs(QVRLogType.SURVEILLANCE_EVENTS, start_time = EPOCH + timedelta(seconds = 100), end_time = datetime(2023, 11, 14, 22, 18, 19), page_size = 100)
+        self.assertEqual([record.log_id for record in logs], list(range(100, 300)))
+        self.assertEqual(logs.total, 200)
+
+class LogTailerTest(SimulatorTestCase):
+
+    def test_tailing_returns_only_new_logs(self):
+        instance = self.instance()
+        end_time = EPOCH + timedelta(seconds = 2000)
+        records = instance.tailLogs(QVRLogType.SURVEILLANCE_EVENTS, start_time = EPOCH, end_time = end_time)
+        self.assertEqual([record.log_id for record in records], list(range(1000)))
+        self.assertEqual(instance.tailLogs(QVRLogType.SURVEILLANCE_EVENTS, end_time = end_time), [])
+        self.simulator.logs += 5
+        self.assertEqual([record.log_id for record in instance.tailLogs(QVRLogType.SURVEILLANCE_EVENTS, end_time = end_time)], list(range(1000, 1005)))
+
+    def test_shards_are_merged_in_order_without_duplicates(self):
+        tailer = LogTailer(self.instance(), shard_duration = timedelta(seconds = 60), max_shards = 8, page_size = 50)
+        query = LogQuery(QVRLogType.SURVEILLANCE_EVENTS, start_time = EPOCH, end_time = EPOCH + timedelta(seconds = 999))
+        self.assertEqual([record.log_id for record in tailer.fetch(query)], list(range(1000)))
+        descending = query._replace(sort_direction = QVRSortDirection.DESCENDING)
+        self.assertEqual([record.log_id for record in tailer.fetch(descending)], list(range(999, -1, -1)))
+
+    def test_shard_errors_are_raised(self):
+        tailer = LogTailer(self.instance(transport = FailingLogsTransport(retries = 0)), shard_duration = timedelta(seconds = 100))
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            list(tailer.fetch(LogQuery(QVRLogType.SURVEILLANCE_EVENTS, start_time = EPOCH, end_time = EPOCH + timedelta(seconds = 999))))
+
+class LogTailerStreamingTest(SimulatorTestCase):
+
+    simulator_options = {'latency' : 0.05}
+
+    def setUp(self):
+        super().setUp()
+        self.tailer = LogTailer(self.instance(), shard_duration = timedelta(seconds = 500), max_shards = 2, page_size = 50)
+        self.query = LogQuery(QVRLogType.SURVEILLANCE_EVENTS, start_time = EPOCH, end_time = EPOCH + timedelta(seconds = 999))
+
+    def test_records_are_yielded_as_shards_arrive(self):
+        requests_made = self.simulator.requests
+        started = time.monotonic()
+        records = self.tailer.fetch(self.query)
+        self.assertEqual(next(records).log_id, 0)
+        # Each shard takes ten pages, so a shard read in full first would take at least half a second
+        self.assertLess(time.monotonic() - started, 0.3)
+        self.assertLess(self.simulator.requests - requests_made, 10)
+        self.assertEqual(len(list(records)), 999)
+
+    def test_stopping_early_stops_the_shards(self):
+        requests_made = self.simulator.requests
+        records = self.tailer.fetch(self.query)
+        next(records)
+        records.close()
+        time.sleep(0.5)
+        stopped_at = self.simulator.requests
+        time.sleep(0.3)
+        self.assertEqual(self.simulator.requests, stopped_at)
+        self.assertLess(stopped_at - requests_made, 10)
+
+class LogTimeTest(unittest.TestCase):
+
+    def test_naive_times_are_taken_as_utc(self):
+        naive = datetime(2023, 11, 14, 22, 13, 20)
+        aware = datetime(2023, 11, 14, 22, 13, 20, tzinfo = timezone.utc)
+        self.assertEqual(_utc(naive), aware)
+        self.assertEqual(_utc(aware.astimezone(timezone(timedelta(hours = 8)))), aware)
+        self.assertEqual(LogRecord({'UTC_time' : '2023-11-14 22:13:20'}).time, _utc(naive))
+        self.assertEqual(LogRecord({'UTC_time_s' : '1700000000'}).time, _utc(naive))
+
+if __name__ == '__main__':
+    unittest.main()
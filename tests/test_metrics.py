@@ -0,0 +1,73 @@
+import io
+import unittest
+from datetime import datetime, timezone
+
+import requests
+
+from qvrpy import Instrumentation, Transport
+
+from .support import SimulatorTestCase
+
+class InstrumentationTest(SimulatorTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.instrumentation = Instrumentation(buckets = (0.1, 1.0))
+        self.metrics = []
+        self.instrumentation.subscribe(self.metrics.append)
+        self.qvr = self.instance(transport = Transport(retries = 0, instrumentation = self.instrumentation))
+
+    def test_calls_are_counted_by_endpoint(self):
+        camera = self.qvr.getCamera(self.simulator.guid(0))
+        camera.getSnapShot(datetime.now(timezone.utc))
+        camera.downloadRecording(io.BytesIO(), datetime.now(timezone.utc), 5, 5)
+        stats = self.instrumentation.stats()
+        self.assertEqual(stats['authLogin']['count'], 1)
+        self.assertEqual(stats['cameraList']['status_codes'], {'200' : 1})
+        self.assertEqual(stats['cameraSnapshot']['bytes_received'], self.simulator.snapshot_size)
+        streamed = [metric for metric in self.metrics if metric.endpoint not in ('authLogin', 'cameraList', 'cameraSnapshot')]
+        self.assertEqual([(metric.method, metric.bytes_received) for metric in streamed], [('GET', self.simulator.recording_size)])
+        self.assertEqual(len(self.metrics), 4)
+
+    def test_error_codes_are_counted(self):
+        self.qvr.sid = 'expired'
+        self.qvr.getCamera(self.simulator.guid(1)).getStreamList()
+        stats = self.instrumentation.stats()['streamList']
+        self.assertEqual((stats['count'], stats['status_codes'], stats['error_codes']), (2, {'200' : 1, '401' : 1}, {'0xC4000005' : 1}))
+        self.assertEqual(self.instrumentation.stats()['authLogin']['count'], 2)
+
+    def test_raising_callbacks_do_not_fail_requests(self):
+        error = ValueError('Callback failed')
+        def failing(metric):
+            raise error
+        self.instrumentation.subscribe(failing)
+        self.assertEqual(len(self.qvr.getCamera(self.simulator.guid(2)).getStreamList()), 2)
+        self.assertIs(self.instrumentation.last_callback_error, error)
+        self.instrumentation.unsubscribe(failing)
+
+    def test_prometheus_export(self):
+        self.qvr.getCamera(self.simulator.guid(0)).getSnapShot(datetime.now(timezone.utc))
+        lines = self.instrumentation.prometheus().splitlines()
+        self.assertIn('qvrpy_requests_total{endpoint="cameraSnapshot",status="200"} 1', lines)
+        self.assertIn('qvrpy_response_bytes_total{endpoint="cameraSnapshot"} 4096', lines)
+        self.assertIn('qvrpy_request_duration_seconds_bucket{endpoint="cameraList",le="+Inf"} 1', lines)
+        self.assertIn('qvrpy_request_duration_seconds_count{endpoint="authLogin"} 1', lines)
+        self.assertIn('# TYPE qvrpy_request_duration_seconds histogram', lines)
+        self.instrumentation.reset()
+        self.assertEqual(self.instrumentation.stats(), {})
+
+class InstrumentationFailureTest(SimulatorTestCase):
+
+    simulator_options = {'latency' : 0.3}
+
+    def test_requests_without_a_response_are_failures(self):
+        instrumentation = Instrumentation()
+        instance = self.instance(connect = False, transport = Transport(timeout = 0.05, retries = 0, instrumentation = instrumentation))
+        with self.assertRaises(requests.exceptions.RequestException):
+            instance.connect()
+        stats = instrumentation.stats()['authLogin']
+        self.assertEqual((stats['count'], stats['failures'], stats['status_codes']), (1, 1, {'none' : 1}))
+        self.assertIn('qvrpy_request_failures_total{endpoint="authLogin"} 1', instrumentation.prometheus().splitlines())
+
+if __name__ == '__main__':
+    unittest.main()
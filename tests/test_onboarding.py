@@ -0,0 +1,63 @@
+import time
+import unittest
+
+from qvrpy import OnboardingRun
+
+from .support import CountingTransport, SimulatorTestCase
+
+class OnboardingTest(SimulatorTestCase):
+
+    simulator_options = {'discovered' : 8, 'test_time' : 0.2}
+
+    def setUp(self):
+        super().setUp()
+        self.transport = CountingTransport(retries = 0)
+        self.qvr = self.instance(transport = self.transport)
+
+    def cameraTestCalls(self) -> int:
+        return len([url for method, url in self.transport.calls if '/camera/test' in url])
+
+    def test_searches_find_cameras_with_their_credentials(self):
+        cameras = self.qvr.doCameraSearch('installer', 'secret')
+        self.assertEqual([camera.ip for camera in cameras], ['10.1.0.{0}'.format(index) for index in range(8)])
+        self.assertEqual(cameras[2]._credentials(), ('installer', 'secret'))
+        self.assertEqual(cameras[2].streams, [])
+
+    def test_cameras_are_tested_concurrently_and_summarised(self):
+        started = time.monotonic()
+        summary = self.qvr.onboardCameras('admin', 'admin', max_workers = 4).summary()
+        # Eight tests of 0.2 seconds, four at a time
+        self.assertLess(time.monotonic() - started, 0.7)
+        self.assertEqual((summary.discovered, len(summary.passed), len(summary.failed)), (8, 5, 3))
+        self.assertEqual(summary.errors, {'RTSP DESCRIBE fail' : 2, 'RTSP SETUP fail' : 1})
+        self.assertEqual(sorted(result.camera.ip for result in summary.failed), ['10.1.0.3', '10.1.0.6', '10.1.0.7'])
+        self.assertEqual(summary.passed[0].response['umsid'], 'BRAND{0:02d}-MODEL{0:05d}'.format(int(summary.passed[0].camera.ip.split('.')[-1])))
+        self.assertEqual(self.cameraTestCalls(), 8)
+
+    def test_results_are_yielded_as_tests_finish(self):
+        run = self.qvr.onboardCameras(max_workers = 8)
+        started = time.monotonic()
+        first = next(iter(run))
+        self.assertLess(time.monotonic() - started, 0.4)
+        self.assertIsNotNone(first.duration)
+        with self.assertRaises(RuntimeError):
+            run.summary()
+
+    def test_stopping_early_cancels_tests_not_started(self):
+        run = self.qvr.onboardCameras(max_workers = 1)
+        results = iter(run)
+        failed = next(result for result in results if not result.succeeded)
+        self.assertEqual((failed.error_code, failed.description), ('0xB1000019', 'RTSP DESCRIBE fail'))
+        results.close()
+        time.sleep(0.5)
+        self.assertLess(self.cameraTestCalls(), 6)
+
+    def test_unsupported_models_fail_without_a_test(self):
+        camera = self.qvr.doCameraSearch()[0]
+        camera.model = 'Unknown'
+        result = list(OnboardingRun(self.qvr, [camera]))[0]
+        self.assertIsInstance(result.error, ValueError)
+        self.assertEqual(self.cameraTestCalls(), 0)
+
+if __name__ == '__main__':
+    unittest.main()
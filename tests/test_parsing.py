@@ -0,0 +1,49 @@
+import unittest
+from unittest import mock
+
+from qvrpy import qvrapi
+
+from .support import SimulatorTestCase
+
+# Module-level names with two leading underscores are not mangled, but would be if named in a class body
+parseResponse = getattr(qvrapi, '__clean_json_response')
+
+QUIRKY_BODY: bytes = b'{\n\t"name" : "Front\tDoor\nGate",\n\t"events" : [}],\n\t"streams" : [{"stream" : 0, "tags" : [}]}]\n}'
+PARSED: dict = {'name' : 'Front\tDoor\nGate', 'events' : [], 'streams' : [{'stream' : 0, 'tags' : []}]}
+
+class ResponseParsingTest(unittest.TestCase):
+
+    def test_qvr_quirks_are_tolerated(self):
+        self.assertEqual(parseResponse(QUIRKY_BODY), PARSED)
+
+    def test_quirks_are_tolerated_without_orjson(self):
+        with mock.patch.object(qvrapi, 'orjson', None):
+            self.assertEqual(parseResponse(QUIRKY_BODY), PARSED)
+
+    def test_text_bodies_are_parsed(self):
+        self.assertEqual(parseResponse(QUIRKY_BODY.decode('utf-8')), PARSED)
+        self.assertEqual(parseResponse('{"name" : "Caméra"}'.encode('utf-8')), {'name' : 'Caméra'})
+
+    def test_invalid_bodies_raise_value_errors(self):
+        with self.assertRaises(ValueError):
+            parseResponse(b'<html>Not JSON</html>')
+
+class SimulatorParsingTest(SimulatorTestCase):
+
+    def test_camera_and_stream_lists_are_parsed(self):
+        instance = self.instance()
+        cameras = qvrapi.cameraList(instance.url, instance.sid, transport = instance.transport)['datas']
+        self.assertEqual(cameras[1]['events'], [])
+        camera = instance.getCamera(self.simulator.guid(1))
+        self.assertEqual((camera.name, camera.video_resolution_height, camera.video_quality), ('Camera 1', 1080, 'VeryHigh'))
+        self.assertEqual(len(camera.streams), 2)
+
+    def test_error_codes_are_decoded(self):
+        instance = self.instance()
+        with self.assertRaises(qvrapi.QVRError) as context:
+            qvrapi.cameraList(instance.url, 'expired', transport = instance.transport)
+        self.assertEqual((context.exception.status_code, context.exception.error_code), (401, '0xC4000005'))
+        self.assertEqual(str(context.exception), '0xC4000005: authorization failed')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import threading
+import unittest
+
+from qvrpy import QVRError
+
+from .support import CountingTransport, SimulatorTestCase
+
+class SessionRenewalTest(SimulatorTestCase):
+
+    def test_expired_session_is_renewed_without_reloading_cameras(self):
+        transport = CountingTransport(retries = 0)
+        instance = self.instance(transport = transport)
+        camera = instance.getCamera(self.simulator.guid(0))
+        instance.sid = 'expired'
+        del transport.calls[:]
+        self.assertEqual(len(camera.getStreamList()), 2)
+        paths = [url[len(instance.url):] for _, url in transport.calls]
+        stream_list = '/qvrpro/qshare/StreamingOutput/channel/{0}/streams'.format(camera.guid)
+        self.assertEqual(paths, [stream_list, '/cgi-bin/authLogin.cgi', stream_list])
+        self.assertIs(instance.getCamera(camera.guid), camera)
+
+    def test_concurrent_failures_log_in_once(self):
+        transport = CountingTransport(retries = 0, pool_size = 50)
+        instance = self.instance(transport = transport)
+        cameras = list(instance.getCameras())
+        instance.sid = 'expired'
+        del transport.calls[:]
+        barrier = threading.Barrier(50)
+        errors = []
+        def renew(camera):
+            barrier.wait()
+            try:
+                camera.getStreamList()
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target = renew, args = (cameras[index % len(cameras)],)) for index in range(50)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(len([url for _, url in transport.calls if url.endswith('/authLogin.cgi')]), 1)
+
+    def test_calls_before_connecting_are_not_renewed(self):
+        transport = CountingTransport(retries = 0)
+        instance = self.instance(connect = False, transport = transport)
+        with self.assertRaises(QVRError) as context:
+            instance.getSupportedCameras()
+        self.assertTrue(context.exception.auth_failure)
+        self.assertEqual(len(transport.calls), 1)
+
+if __name__ == '__main__':
+    unittest.main()
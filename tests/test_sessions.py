@@ -0,0 +1,96 @@
+import threading
+import time
+import unittest
+
+from qvrpy import QVRError, StreamSessionPool
+from qvrpy.enums import QVRStreamingProtocol
+
+from .support import CountingTransport, SimulatorTestCase
+
+class SlowStreamTransport(CountingTransport):
+    """A CountingTransport delaying stream opens, and failing to close the streams of the given cameras"""
+
+    def __init__(self, open_delay: float = 0.0, failing_closes: list = None, **kwargs):
+        super().__init__(**kwargs)
+        self.open_delay: float = open_delay
+        self.failing_closes: list = failing_closes or []
+
+    def request(self, method: str, url: str, retry: bool = True, **kwargs):
+        if url.endswith('/liveStream'):
+            if method == 'POST':
+                time.sleep(self.open_delay)
+            elif method == 'DELETE' and any('/channel/{0}/'.format(guid) in url for guid in self.failing_closes):
+                raise ConnectionError('Stream close failed')
+        return super().request(method, url, retry, **kwargs)
+
+    def streamCalls(self, method: str) -> list:
+        return [url for call_method, url in self.calls if call_method == method and url.endswith('/liveStream')]
+
+class StreamSessionPoolTest(SimulatorTestCase):
+
+    def pool(self, idle_timeout: float = 30.0, **kwargs) -> StreamSessionPool:
+        self.transport = SlowStreamTransport(retries = 0, **kwargs)
+        self.qvr = self.instance(transport = self.transport)
+        return self.qvr.getStreamPool(idle_timeout)
+
+    def stream(self, index: int, stream: int = 0):
+        return self.qvr.getCamera(self.simulator.guid(index)).getStream(stream)
+
+    def test_consumers_share_an_open_session(self):
+        pool = self.pool()
+        with pool.acquire(self.stream(0)) as first, pool.acquire(self.stream(0)) as second:
+            self.assertIs(first.session, second.session)
+            self.assertTrue(first.url.endswith('@{0}:554/{1}/0'.format(self.simulator.host, self.simulator.guid(0))))
+        self.assertEqual(len(self.transport.streamCalls('POST')), 1)
+        self.assertEqual(self.transport.streamCalls('DELETE'), [])
+
+    def test_idle_sessions_are_closed_after_the_timeout(self):
+        pool = self.pool(idle_timeout = 0.1)
+        pool.acquire(self.stream(1), QVRStreamingProtocol.HLS).release()
+        time.sleep(0.3)
+        self.assertEqual(len(self.transport.streamCalls('DELETE')), 1)
+
+    def test_close_idle_closes_past_errors(self):
+        pool = self.pool(failing_closes = [self.simulator.guid(1)])
+        for index in range(3):
+            pool.acquire(self.stream(index)).release()
+        held = pool.acquire(self.stream(3))
+        self.assertEqual(pool.closeIdle(), 3)
+        self.assertEqual(len(self.transport.streamCalls('DELETE')), 2)
+        self.assertEqual([type(error) for error in pool.close_errors], [ConnectionError])
+        self.assertFalse(held.session.closed)
+
+    def test_sessions_opened_during_close_all_are_closed(self):
+        pool = self.pool(open_delay = 0.3)
+        stream = self.stream(2)
+        errors = []
+        def acquire():
+            try:
+                pool.acquire(stream)
+            except QVRError as e:
+                errors.append(e)
+        acquirers = [threading.Thread(target = acquire) for _ in range(2)]
+        for acquirer in acquirers:
+            acquirer.start()
+        time.sleep(0.1)
+        self.assertEqual(pool.closeAll(), [])
+        for acquirer in acquirers:
+            acquirer.join()
+        self.assertEqual(len(errors), 2)
+        self.assertEqual((len(self.transport.streamCalls('POST')), len(self.transport.streamCalls('DELETE'))), (1, 1))
+        with self.assertRaises(QVRError):
+            pool.acquire(stream)
+
+    def test_disconnect_closes_sessions_and_the_pool(self):
+        pool = self.pool()
+        lease = pool.acquire(self.stream(0))
+        self.qvr.disconnect()
+        self.assertTrue(lease.session.closed)
+        self.assertEqual(len(self.transport.streamCalls('DELETE')), 1)
+        self.qvr.connect()
+        self.assertIsNot(self.qvr.getStreamPool(), pool)
+        with self.qvr.openStream(self.simulator.guid(0)) as reopened:
+            self.assertFalse(reopened.session.closed)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import time
+import unittest
+from datetime import datetime, timezone
+
+import requests
+
+from qvrpy import Transport
+
+from .support import SimulatorTestCase
+
+class CameraFaultTransport(Transport):
+    """A Transport delaying, or failing, snapshot requests for the given camera GUIDs"""
+
+    def __init__(self, delays: dict = None, failures: list = None, **kwargs):
+        super().__init__(**kwargs)
+        self.delays: dict = delays or {}
+        self.failures: list = failures or []
+
+    def request(self, method: str, url: str, retry: bool = True, **kwargs):
+        if '/snapshot/' in url:
+            for guid, delay in self.delays.items():
+                if guid in url:
+                    time.sleep(delay)
+            if any(guid in url for guid in self.failures):
+                raise requests.exceptions.ConnectionError('Camera unreachable')
+        return super().request(method, url, retry, **kwargs)
+
+class SnapshotsTest(SimulatorTestCase):
+
+    simulator_options = {'cameras' : 8}
+
+    def setUp(self):
+        super().setUp()
+        self.time = datetime.now(timezone.utc)
+
+    def test_snapshots_are_yielded_as_they_complete(self):
+        slow = self.simulator.guid(0)
+        instance = self.instance(transport = CameraFaultTransport({slow : 0.5}, retries = 0))
+        results = []
+        started = time.monotonic()
+        for result in instance.getSnapshots(None, self.time):
+            results.append((result, time.monotonic() - started))
+        self.assertEqual(sorted(result.guid for result, _ in results), sorted(camera.guid for camera in instance.getCameras()))
+        self.assertEqual(results[-1][0].guid, slow)
+        # Every other camera is yielded before the slow camera answers
+        self.assertLess(results[-2][1], 0.4)
+        self.assertTrue(all(len(result.image) == self.simulator.snapshot_size for result, _ in results))
+
+    def test_concurrency_is_limited(self):
+        delays = {self.simulator.guid(index) : 0.2 for index in range(8)}
+        instance = self.instance(transport = CameraFaultTransport(delays, retries = 0))
+        started = time.monotonic()
+        results = list(instance.getSnapshots(list(delays), self.time, max_workers = 4))
+        elapsed = time.monotonic() - started
+        self.assertEqual(len(results), 8)
+        self.assertGreater(elapsed, 0.4)
+        self.assertLess(elapsed, 0.6)
+
+    def test_failing_cameras_yield_their_error(self):
+        failing = self.simulator.guid(2)
+        instance = self.instance(transport = CameraFaultTransport(failures = [failing], retries = 0))
+        results = {result.guid : result for result in instance.getSnapshots(None, self.time)}
+        self.assertEqual(len(results), 8)
+        self.assertIsInstance(results[failing].error, requests.exceptions.ConnectionError)
+        self.assertIsNone(results[failing].image)
+        self.assertEqual(len([result for result in results.values() if result.error is None]), 7)
+
+    def test_slow_cameras_time_out(self):
+        slow = self.simulator.guid(1)
+        instance = self.instance(transport = CameraFaultTransport({slow : 1.0}, retries = 0))
+        started = time.monotonic()
+        results = {result.guid : result for result in instance.getSnapshots(None, self.time, timeout = 0.3)}
+        self.assertLess(time.monotonic() - started, 0.8)
+        self.assertIsInstance(results[slow].error, TimeoutError)
+        self.assertEqual(len([result for result in results.values() if result.error is None]), 7)
+
+class SnapshotTimeoutTest(SimulatorTestCase):
+
+    simulator_options = {'latency' : 0.3}
+
+    def test_timed_out_snapshot_is_sent_once(self):
+        instance = self.instance(transport = Transport(retries = 2, backoff_factor = 0))
+        requests_made = self.simulator.requests
+        with self.assertRaises(requests.exceptions.RequestException):
+            instance.getSnapShot(self.simulator.guid(0), datetime.now(timezone.utc), timeout = 0.05)
+        self.assertEqual(self.simulator.requests, requests_made + 1)
+
+if __name__ == '__main__':
+    unittest.main()
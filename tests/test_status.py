@@ -0,0 +1,48 @@
+import unittest
+
+from qvrpy import QVRError
+
+from .support import SimulatorTestCase
+
+class RefreshStatusTest(SimulatorTestCase):
+
+    def test_changed_cameras_are_updated_in_place(self):
+        instance = self.instance()
+        camera = instance.getCamera(self.simulator.guid(1))
+        streams = camera.streams
+        camera.stopRecording()
+        requests = self.simulator.requests
+        changes = instance.refreshStatus()
+        self.assertEqual(self.simulator.requests, requests + 1)
+        self.assertEqual(changes.changed, {camera.guid : {'rec_state' : ('RECORDING', 'NOT_RECORDING')}})
+        self.assertEqual((changes.added, changes.removed), ([], []))
+        self.assertIs(instance.getCamera(camera.guid), camera)
+        self.assertEqual(camera.rec_state, 'NOT_RECORDING')
+        self.assertIs(camera.streams, streams)
+
+    def test_listed_cameras_are_added_and_removed(self):
+        instance = self.instance()
+        self.simulator.setCameras(5)
+        changes = instance.refreshStatus()
+        self.assertEqual([camera.guid for camera in changes.added], [self.simulator.guid(4)])
+        self.assertIs(instance.getCamera(self.simulator.guid(4)), changes.added[0])
+        self.simulator.setCameras(3)
+        changes = instance.refreshStatus()
+        self.assertEqual(sorted(camera.guid for camera in changes.removed), [self.simulator.guid(3), self.simulator.guid(4)])
+        self.assertEqual(len(list(instance.getCameras())), 3)
+        self.assertEqual(instance.refreshStatus(), ([], [], {}))
+
+    def test_disconnected_instance_raises_a_qvr_error(self):
+        instance = self.instance()
+        watcher = instance.getWatcher()
+        watcher.poll()
+        instance.disconnect()
+        requests = self.simulator.requests
+        with self.assertRaises(QVRError):
+            instance.refreshStatus()
+        with self.assertRaises(QVRError):
+            watcher.poll()
+        self.assertEqual(self.simulator.requests, requests)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import threading
+import time
+import unittest
+
+import requests
+
+from qvrpy import Transport
+
+from .support import SimulatorTestCase
+
+class SlowStreamListTransport(Transport):
+    """A Transport delaying stream list requests, and failing those of the given cameras"""
+
+    def __init__(self, delay: float = 0.0, failing_guids: list = None, **kwargs):
+        super().__init__(**kwargs)
+        self.delay: float = delay
+        self.failing_guids: list = failing_guids or []
+        self.stream_lists: int = 0
+
+    def request(self, method: str, url: str, retry: bool = True, **kwargs):
+        if url.endswith('/streams'):
+            self.stream_lists += 1
+            time.sleep(self.delay)
+            if any('/channel/{0}/'.format(guid) in url for guid in self.failing_guids):
+                raise requests.exceptions.ConnectionError('Stream list unavailable')
+        return super().request(method, url, retry, **kwargs)
+
+class LazyStreamTest(SimulatorTestCase):
+
+    def lazyInstance(self, **kwargs):
+        self.transport = SlowStreamListTransport(retries = 0, **kwargs)
+        return self.instance(transport = self.transport)
+
+    def test_connecting_fetches_no_stream_lists(self):
+        instance = self.lazyInstance()
+        self.assertEqual(self.simulator.requests, 2)
+        cameras = list(instance.getCameras())
+        self.assertEqual(len(cameras), 4)
+        self.assertFalse(any(camera.streams_loaded for camera in cameras))
+        self.assertIsNone(cameras[0].toDict()['streams'])
+
+    def test_streams_are_fetched_once_on_first_use(self):
+        camera = self.lazyInstance(delay = 0.1).getCamera(self.simulator.guid(1))
+        streams = []
+        threads = [threading.Thread(target = lambda: streams.append(camera.streams)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.transport.stream_lists, 1)
+        self.assertTrue(all(result is streams[0] for result in streams))
+        self.assertEqual(camera.getStream(1).video_resolution_height, 720)
+        self.assertIs(camera.getStreamList(), streams[0])
+        self.assertEqual(self.transport.stream_lists, 1)
+
+    def test_streams_are_prefetched_in_bulk(self):
+        instance = self.lazyInstance(delay = 0.2, failing_guids = [self.simulator.guid(3)])
+        instance.getCamera(self.simulator.guid(0)).streams
+        started = time.monotonic()
+        errors = instance.prefetchStreams()
+        self.assertLess(time.monotonic() - started, 0.4)
+        self.assertEqual(list(errors), [self.simulator.guid(3)])
+        self.assertEqual(self.transport.stream_lists, 4)
+        self.assertEqual([camera.streams_loaded for camera in instance.getCameras()], [True, True, True, False])
+        self.assertEqual(instance.prefetchStreams([self.simulator.guid(1), self.simulator.guid(2)]), {})
+        self.assertEqual(self.transport.stream_lists, 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import io
+import json
+import os
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stdout
+
+from qvrpy import Instance
+
+from .support import SimulatorTestCase
+
+# The benchmarks directory is on the path once .support is imported
+import suite
+from simulator import QVRSimulator
+
+SMALL_RUN: list = ['--cameras', '4', '--snapshot-size', '1024', '--recording-size', '65536', '--logs', '200', '--page-size', '50', '--latency', '0', '--repeat', '1']
+
+class CompareTest(unittest.TestCase):
+
+    def setUp(self):
+        self.baseline = {'connect' : {'seconds' : 1.0}, 'logs' : {'seconds' : 2.0}}
+
+    def compare(self, results: dict, tolerance: float = 0.1) -> tuple:
+        output = io.StringIO()
+        with redirect_stdout(output):
+            passed = suite.compare(results, self.baseline, tolerance)
+        return passed, output.getvalue()
+
+    def test_slowdowns_within_the_tolerance_pass(self):
+        passed, output = self.compare({'connect' : {'seconds' : 1.05}, 'logs' : {'seconds' : 1.5}, 'recording' : {'seconds' : 9.0}})
+        self.assertTrue(passed)
+        self.assertNotIn('REGRESSED', output)
+        self.assertNotIn('recording', output)
+
+    def test_slowdowns_beyond_the_tolerance_regress(self):
+        passed, output = self.compare({'connect' : {'seconds' : 1.0}, 'logs' : {'seconds' : 2.5}})
+        self.assertFalse(passed)
+        self.assertEqual([line.split()[0] for line in output.splitlines() if 'REGRESSED' in line], ['logs'])
+
+class SuiteTest(unittest.TestCase):
+
+    def test_results_are_saved_and_compared(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'baseline.json')
+            with redirect_stdout(io.StringIO()):
+                self.assertEqual(suite.main(SMALL_RUN + ['--save', path]), 0)
+            with open(path) as f:
+                results = json.load(f)
+            self.assertEqual(set(results), {'connect', 'snapshots', 'logs', 'recording'})
+            self.assertTrue(all(result['seconds'] > 0 for result in results.values()))
+            # Compared with a baseline infinitely slower, nothing can regress
+            with open(path, 'w') as f:
+                json.dump({name: {'seconds' : float('inf')} for name in results}, f)
+            with redirect_stdout(io.StringIO()):
+                self.assertEqual(suite.main(SMALL_RUN + ['--compare', path]), 0)
+
+class SimulatorTest(SimulatorTestCase):
+
+    def test_simulator_counts_requests_and_injects_latency(self):
+        with QVRSimulator(cameras = 2, latency = 0.1) as simulator:
+            instance = Instance('admin', 'admin', simulator.host, simulator.port)
+            self.addCleanup(instance.transport.close)
+            started = time.monotonic()
+            instance.connect()
+            self.assertGreaterEqual(time.monotonic() - started, 0.2)
+            self.assertEqual(simulator.requests, 2)
+            self.assertEqual(len(list(instance.getCameras())), 2)
+
+    def test_unknown_paths_are_not_found(self):
+        instance = self.instance()
+        response = instance.transport.request('GET', self.simulator.url + '/qvrpro/unknown')
+        self.assertEqual(response.status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
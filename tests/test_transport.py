@@ -0,0 +1,52 @@
+import unittest
+
+import requests
+
+from qvrpy import Instance, Transport, qvrapi
+
+from .support import CountingTransport, SimulatorTestCase
+
+class TransportTest(SimulatorTestCase):
+
+    def test_calls_reuse_pooled_connections(self):
+        instance = self.instance()
+        for camera in instance.getCameras():
+            camera.getStreamList()
+            camera.startRecording()
+        instance.refreshStatus()
+        self.assertGreater(self.simulator.requests, 10)
+        self.assertEqual(self.simulator.connections, 1)
+
+    def test_injected_transport_carries_every_call(self):
+        transport = CountingTransport()
+        instance = self.instance(transport = transport)
+        instance.getCamera(self.simulator.guid(0)).getStreamList()
+        instance.disconnect()
+        paths = [url[len(instance.url):] for _, url in transport.calls]
+        self.assertEqual(paths, ['/cgi-bin/authLogin.cgi', '/qvrpro/camera/list', '/qvrpro/qshare/StreamingOutput/channel/{0}/streams'.format(self.simulator.guid(0)), '/cgi-bin/authLogout.cgi'])
+        self.assertEqual(len(transport.calls), self.simulator.requests)
+
+    def test_api_functions_default_to_a_shared_transport(self):
+        sid = qvrapi.authLogin(self.simulator.url, 'admin', 'admin')['authSid']
+        self.assertEqual(len(qvrapi.cameraList(self.simulator.url, sid)['datas']), 4)
+
+class TransportTimeoutTest(SimulatorTestCase):
+
+    simulator_options = {'latency' : 0.3}
+
+    def test_timeout_applies_to_every_request(self):
+        instance = Instance('admin', 'admin', self.simulator.host, self.simulator.port, transport = Transport(timeout = 0.05, retries = 0))
+        self.addCleanup(instance.transport.close)
+        with self.assertRaises(requests.exceptions.RequestException):
+            instance.connect()
+        self.assertEqual(self.simulator.requests, 1)
+
+    def test_idempotent_requests_are_retried(self):
+        transport = Transport(timeout = 0.05, retries = 2, backoff_factor = 0)
+        self.addCleanup(transport.close)
+        with self.assertRaises(requests.exceptions.RequestException):
+            qvrapi.cameraList(self.simulator.url, 'sid', transport = transport)
+        self.assertEqual(self.simulator.requests, 3)
+
+if __name__ == '__main__':
+    unittest.main()
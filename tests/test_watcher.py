@@ -0,0 +1,110 @@
+import threading
+import time
+import unittest
+
+import requests
+
+from qvrpy import StatusWatcher, Transport
+from qvrpy.enums import QVRCameraChange, QVRRecordingStatus
+
+from .support import SimulatorTestCase
+
+class FlakyCameraListTransport(Transport):
+    """A Transport failing camera list requests with a connection error while failing is set"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.failing: threading.Event = threading.Event()
+
+    def request(self, method: str, url: str, retry: bool = True, **kwargs):
+        if self.failing.is_set() and url.endswith('/camera/list'):
+            raise requests.exceptions.ConnectionError('Camera list unavailable')
+        return super().request(method, url, retry, **kwargs)
+
+def waitFor(condition, timeout: float = 2.0) -> bool:
+    """Wait up to timeout seconds for condition to hold"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+class StatusWatcherTest(SimulatorTestCase):
+
+    def test_poll_dispatches_typed_changes(self):
+        instance = self.instance()
+        watcher = StatusWatcher(instance, fields = ['rec_state'])
+        received = []
+        watcher.subscribe(received.append)
+        watcher.poll()
+        camera = instance.getCamera(self.simulator.guid(2))
+        camera.stopRecording()
+        events = watcher.poll()
+        self.assertEqual(events, [(QVRCameraChange.CHANGED, camera.guid, camera, 'rec_state', QVRRecordingStatus.RECORDING, QVRRecordingStatus.NOT_RECORDING)])
+        self.assertEqual(received, events)
+        self.assertEqual(watcher.poll(), [])
+
+    def test_poll_reports_added_and_removed_cameras(self):
+        instance = self.instance()
+        watcher = StatusWatcher(instance)
+        watcher.poll()
+        self.simulator.setCameras(5)
+        self.assertEqual([(event.change, event.guid) for event in watcher.poll()], [(QVRCameraChange.ADDED, self.simulator.guid(4))])
+        self.simulator.setCameras(4)
+        self.assertEqual([(event.change, event.guid) for event in watcher.poll()], [(QVRCameraChange.REMOVED, self.simulator.guid(4))])
+
+    def test_raising_subscribers_do_not_stop_dispatch(self):
+        instance = self.instance()
+        watcher = StatusWatcher(instance)
+        error = ValueError('Subscriber failed')
+        def failing(event):
+            raise error
+        received = []
+        watcher.subscribe(failing)
+        watcher.subscribe(received.append)
+        watcher.poll()
+        instance.getCamera(self.simulator.guid(0)).stopRecording()
+        watcher.poll()
+        self.assertEqual(len(received), 1)
+        self.assertIs(watcher.last_callback_error, error)
+
+    def test_raising_error_callbacks_do_not_stop_polling(self):
+        transport = FlakyCameraListTransport(retries = 0)
+        instance = self.instance(transport = transport)
+        watcher = StatusWatcher(instance, interval = 0.02, max_interval = 0.08)
+        errors = []
+        def onError(e):
+            errors.append(e)
+            raise RuntimeError('Error callback failed')
+        watcher.subscribe(lambda event: None, onError)
+        transport.failing.set()
+        watcher.start()
+        self.addCleanup(watcher.stop)
+        self.assertTrue(waitFor(lambda: len(errors) >= 3))
+        self.assertTrue(watcher.running)
+        self.assertIsInstance(watcher.last_error, requests.exceptions.ConnectionError)
+        self.assertIsInstance(watcher.last_callback_error, RuntimeError)
+        self.assertEqual(watcher.current_interval, 0.08)
+        transport.failing.clear()
+        self.assertTrue(waitFor(lambda: watcher.last_error is None))
+        self.assertEqual(watcher.current_interval, 0.02)
+
+    def test_events_are_yielded_until_the_watcher_stops(self):
+        instance = self.instance()
+        watcher = instance.getWatcher(interval = 0.02)
+        watcher.start()
+        self.addCleanup(watcher.stop)
+        events = watcher.events()
+        # The change is made once the generator has started, and so subscribed
+        timer = threading.Timer(0.1, instance.getCamera(self.simulator.guid(3)).stopRecording)
+        timer.start()
+        event = next(events)
+        timer.join()
+        self.assertEqual((event.guid, event.field), (self.simulator.guid(3), 'rec_state'))
+        watcher.stop()
+        self.assertEqual(list(events), [])
+        self.assertFalse(watcher.running)
+
+if __name__ == '__main__':
+    unittest.main()